@@ -0,0 +1,29 @@
+# Configuración de gunicorn (se carga sola al correr `gunicorn` en esta carpeta).
+# Workers e hilos salen de las mismas variables que usa prjJobSwipe/basedatos.py
+# para repartir DB_MAX_CONEXIONES: si se cambian aquí, el pool se ajusta solo.
+#
+# WSGI (por defecto): workers sync con GUNICORN_THREADS hilos cada uno; un
+# request que espera a la base o a una API ocupa su hilo mientras tanto.
+#
+# ASGI (VISTAS_ASYNC=True): la misma app en prjJobSwipe/asgi.py con workers
+# de uvicorn. Cada worker atiende muchos requests a la vez en su event loop;
+# home y matches son async (jobswipe/vistas_async.py) y el resto corre en un
+# pool de hilos (ASGI_THREADS, por defecto el de Python). Conviene DB_POOL=True
+# en Postgres: el pool acota las conexiones por worker aunque haya más
+# requests en vuelo que conexiones (esperan hasta DB_POOL_TIMEOUT).
+#   VISTAS_ASYNC=True gunicorn                      # gunicorn + UvicornWorker
+#   VISTAS_ASYNC=True uvicorn prjJobSwipe.asgi:application --workers 2 --lifespan off
+# Para comparar ambos modos: `python manage.py benchmark --url ... --url-asgi ...`.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+if os.environ.get('VISTAS_ASYNC') == 'True':
+    wsgi_app = 'prjJobSwipe.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'prjJobSwipe.wsgi:application'
+    threads = int(os.environ.get('GUNICORN_THREADS', 1))
+# Reciclar workers de a poco evita que crezca la memoria (y reparte el reinicio)
+max_requests = 2000
+max_requests_jitter = 200
@@ -1,7 +1,16 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
-from .models import Perfil, OfertaDeEmpleo, Solicitud, Mensaje, CategoriaDeServicio
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .api import invalidar_api
+from .busqueda import buscar_ofertas
+from .chat import reconstruir_resumenes
+from .dashboard import tocar_ofertas
+from .models import Perfil, OfertaDeEmpleo, Solicitud, Mensaje, CategoriaDeServicio, Tarea, Descarte
+from .relevancia import invalidar_colas, invalidar_ofertas
 
 # Configuración para ver el Perfil dentro del Usuario
 class PerfilInline(admin.StackedInline):
@@ -19,6 +28,170 @@ admin.site.register(User, CustomUserAdmin)
 
 # Registros simples
 admin.site.register(CategoriaDeServicio)
-admin.site.register(OfertaDeEmpleo)
-admin.site.register(Solicitud)
-admin.site.register(Mensaje)
\ No newline at end of file
+
+
+# -----------------------------------------------------------------
+# TABLAS GRANDES (ofertas, solicitudes, mensajes, descartes)
+# -----------------------------------------------------------------
+# - Sin filtros, el total del paginador sale de las estadísticas del
+#   motor (PaginadorEstimado) en vez de un COUNT(*) sobre millones de filas.
+# - show_full_result_count = False: sin el segundo COUNT(*) del total.
+# - list_select_related cubre lo que muestran list_display y __str__.
+# - raw_id_fields: el formulario no carga un <select> con todas las filas.
+# - Orden por id y filtros solo por columnas indexadas.
+# - Las acciones masivas son un solo UPDATE; lo que harían las señales
+#   (cachés, resúmenes del chat) se hace a mano.
+
+UMBRAL_ESTIMACION = 100_000  # Bajo esto el COUNT(*) es barato y exacto
+
+
+def filas_estimadas(modelo, alias='default'):
+    """
+    Filas de la tabla según las estadísticas del motor (sin recorrerla).
+    None si el motor no las entrega (SQLite) o aún no hay estadísticas.
+    """
+    conexion = connections[alias]
+    tabla = modelo._meta.db_table
+    if conexion.vendor == 'postgresql':
+        sql, params = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [conexion.ops.quote_name(tabla)]
+    elif conexion.vendor == 'mysql':
+        sql = 'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+        params = [tabla]
+    else:
+        return None
+    with conexion.cursor() as cursor:
+        cursor.execute(sql, params)
+        fila = cursor.fetchone()
+    # reltuples es -1 en una tabla que nunca se analizó
+    return fila[0] if fila and fila[0] is not None and fila[0] >= 0 else None
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Paginator con el total estimado cuando el listado no tiene filtros
+    y la tabla es grande; con filtros (acotados por índice) cuenta de verdad.
+    """
+
+    @cached_property
+    def count(self):
+        consulta = getattr(self.object_list, 'query', None)
+        if consulta is not None and not consulta.where:
+            estimado = filas_estimadas(self.object_list.model, self.object_list.db)
+            if estimado is not None and estimado >= UMBRAL_ESTIMACION:
+                return estimado
+        return super().count
+
+
+class TablaGrandeAdmin(admin.ModelAdmin):
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    ordering = ('-id',)
+    list_per_page = 50
+
+
+@admin.register(OfertaDeEmpleo)
+class OfertaDeEmpleoAdmin(TablaGrandeAdmin):
+    list_display = ('id', 'titulo', 'perfil_empleador', 'categoria', 'estado', 'es_inclusion', 'fecha_publicacion')
+    list_select_related = ('perfil_empleador__user', 'categoria')
+    list_filter = ('estado', 'es_inclusion')  # oferta_estado_*_idx
+    raw_id_fields = ('perfil_empleador',)
+    search_fields = ('titulo',)
+    readonly_fields = ('fecha_publicacion', 'fecha_actualizacion', 'sueldo_normalizado')
+    actions = ('activar', 'pausar', 'cerrar')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Índice de texto completo (busqueda.py) en vez de LIKE sobre toda la tabla
+        texto = search_term.strip()
+        if not texto:
+            return queryset, False
+        if texto.isdigit():
+            return queryset.filter(id=int(texto)), False
+        return buscar_ofertas(texto, queryset), False
+
+    def _cambiar_estado(self, request, queryset, estado):
+        # Un UPDATE que también renueva las tarjetas y el dashboard de cada empleador
+        cambiadas = tocar_ofertas(queryset.exclude(estado=estado), estado=estado)
+        invalidar_api()
+        invalidar_ofertas()
+        self.message_user(request, f'{cambiadas} ofertas quedaron en estado "{estado}".')
+
+    @admin.action(description='Activar ofertas seleccionadas')
+    def activar(self, request, queryset):
+        self._cambiar_estado(request, queryset, 'activa')
+
+    @admin.action(description='Pausar ofertas seleccionadas')
+    def pausar(self, request, queryset):
+        self._cambiar_estado(request, queryset, 'pausada')
+
+    @admin.action(description='Cerrar ofertas seleccionadas')
+    def cerrar(self, request, queryset):
+        self._cambiar_estado(request, queryset, 'cerrada')
+
+
+@admin.register(Solicitud)
+class SolicitudAdmin(TablaGrandeAdmin):
+    list_display = ('id', 'User_candidato', 'oferta', 'estado', 'fecha_postulacion', 'ultimo_mensaje_fecha')
+    list_select_related = ('User_candidato', 'oferta')
+    list_filter = ('estado',)  # solicitud_actividad_idx
+    raw_id_fields = ('oferta', 'User_candidato', 'ultimo_mensaje')
+    search_fields = ('=User_candidato__username',)
+    readonly_fields = (
+        'fecha_postulacion', 'no_leidos_candidato', 'no_leidos_empleador',
+        'ultimo_mensaje_texto', 'ultimo_mensaje_fecha',
+    )
+    actions = ('rechazar_pendientes',)
+
+    @admin.action(description='Rechazar las pendientes seleccionadas')
+    def rechazar_pendientes(self, request, queryset):
+        # Solo pendientes: un match aceptado no se deshace desde aquí
+        pendientes = queryset.filter(estado='pendiente')
+        ofertas = set(pendientes.values_list('oferta_id', flat=True))
+        rechazadas = pendientes.update(estado='rechazada')
+        invalidar_colas(ofertas)  # update() no dispara señales
+        self.message_user(request, f'{rechazadas} solicitudes rechazadas.')
+
+
+@admin.register(Mensaje)
+class MensajeAdmin(TablaGrandeAdmin):
+    TEXTO_MODERADO = '[Mensaje eliminado por moderación]'
+
+    list_display = ('id', 'solicitud_id', 'User_origen', 'User_destino', 'fecha', 'leido')
+    list_select_related = ('User_origen', 'User_destino')
+    raw_id_fields = ('solicitud', 'User_origen', 'User_destino')
+    search_fields = ('=User_origen__username',)
+    readonly_fields = ('fecha',)
+    actions = ('moderar', 'marcar_leidos')
+
+    @admin.action(description='Ocultar el contenido (moderación)')
+    def moderar(self, request, queryset):
+        moderados = queryset.update(contenido=self.TEXTO_MODERADO)
+        # El resumen de la bandeja de matches puede estar mostrando uno de ellos
+        Solicitud.objects.filter(ultimo_mensaje__in=queryset.values('id')).update(
+            ultimo_mensaje_texto=self.TEXTO_MODERADO
+        )
+        self.message_user(request, f'{moderados} mensajes moderados.')
+
+    @admin.action(description='Marcar como leídos')
+    def marcar_leidos(self, request, queryset):
+        solicitudes = list(queryset.filter(leido=False).values_list('solicitud_id', flat=True).distinct())
+        leidos = queryset.filter(leido=False).update(leido=True)
+        # Contadores de no leídos de los matches afectados, un UPDATE
+        reconstruir_resumenes(Solicitud.objects.filter(id__in=solicitudes))
+        self.message_user(request, f'{leidos} mensajes marcados como leídos.')
+
+
+@admin.register(Descarte)
+class DescarteAdmin(TablaGrandeAdmin):
+    list_display = ('id', 'User_candidato', 'oferta', 'fecha')
+    list_select_related = ('User_candidato', 'oferta')
+    raw_id_fields = ('User_candidato', 'oferta')
+    search_fields = ('=User_candidato__username',)
+
+
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nombre', 'estado', 'intentos', 'ejecutar_despues', 'actualizada')
+    list_filter = ('estado', 'nombre')
+    search_fields = ('clave',)
+    readonly_fields = ('creada', 'actualizada', 'ultimo_error')
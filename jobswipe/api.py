@@ -0,0 +1,313 @@
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import UserRateThrottle
+
+from .busqueda import buscar_ofertas, filtrar_ofertas
+from .chat import crear_mensaje, marcar_leidos, matches_de, notificar_mensaje, participantes
+from .feed import DecisionInvalida
+from .models import Mensaje, OfertaDeEmpleo, Perfil, Solicitud
+from .replicas import LecturaEnReplicaMixin
+from .revision import ACCIONES, aplicar_decisiones
+from .serializers import MatchSerializer, MensajeSerializer, OfertaSerializer, SolicitudSerializer
+
+# -----------------------------------------------------------------
+# API REST DE OFERTAS (/api/ofertas/)
+# -----------------------------------------------------------------
+# - Paginación por cursor (keyset sobre fecha_publicacion, id)
+# - ?campos=id,titulo para pedir solo algunos campos
+# - Filtros: categoria, es_inclusion, moneda, sueldo_min, sueldo_max,
+#   publicada_desde y ?q= (búsqueda de texto completo)
+# - GET condicional (ETag / Last-Modified) y caché de la respuesta por
+#   consulta; la versión de la caché cambia al escribir una oferta
+#   (ver signals.py), así nunca se sirve una lista vieja.
+# Last-Modified es la fecha_publicacion más reciente, salvo que la
+# última escritura (cierre o edición de una oferta) sea posterior.
+# La caché y su versión solo con CACHE_COMPARTIDA: con la caché de cada
+# worker, la versión cambiaría solo en el que escribió. Sin ella la lista
+# se calcula en cada request, el ETag es la huella del contenido y
+# Last-Modified la publicación o edición más reciente de las ofertas.
+
+CLAVE_VERSION_API = 'api:ofertas:version'
+
+
+def _nueva_version():
+    return f'{int(time.time())}.{uuid.uuid4().hex[:12]}'
+
+
+def version_api():
+    return cache.get_or_set(CLAVE_VERSION_API, _nueva_version, timeout=None)
+
+
+def invalidar_api():
+    cache.set(CLAVE_VERSION_API, _nueva_version(), timeout=None)
+
+
+class OfertaCursorPagination(CursorPagination):
+    ordering = ('-fecha_publicacion', '-id')
+    page_size = 20
+    page_size_query_param = 'tamano'
+    max_page_size = 100
+    # ?orden=sueldo / sueldo_asc: por sueldo en pesos (índice oferta_estado_sueldo_idx)
+    ordenes = {
+        'sueldo': ('-sueldo_normalizado', '-id'),
+        'sueldo_asc': ('sueldo_normalizado', 'id'),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordenes.get(request.query_params.get('orden'), self.ordering)
+
+
+class OfertaViewSet(LecturaEnReplicaMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = OfertaDeEmpleo.objects.filter(estado='activa')
+    serializer_class = OfertaSerializer
+    pagination_class = OfertaCursorPagination
+
+    def campos(self):
+        campos = self.request.query_params.get('campos', '')
+        return [campo.strip() for campo in campos.split(',') if campo.strip()]
+
+    def get_serializer_context(self):
+        contexto = super().get_serializer_context()
+        contexto['campos'] = self.campos()
+        return contexto
+
+    def get_queryset(self):
+        params = self.request.query_params
+        ofertas = filtrar_ofertas(super().get_queryset(), params)
+        if params.get('orden') in OfertaCursorPagination.ordenes:
+            # El cursor no puede avanzar sobre NULL: sin sueldo quedan fuera
+            ofertas = ofertas.filter(sueldo_normalizado__isnull=False)
+        campos = [c for c in self.campos() if c in OfertaSerializer.Meta.fields]
+        if campos:
+            # fecha_publicacion, sueldo_normalizado e id siempre: los usa el cursor
+            ofertas = ofertas.only(*{*campos, 'id', 'fecha_publicacion', 'sueldo_normalizado'})
+        return ofertas
+
+    def _clave_cache(self, version):
+        # Host y esquema: los enlaces next/previous del cursor son absolutos
+        consulta = [self.request.scheme, self.request.get_host(), sorted(self.request.query_params.lists())]
+        huella = hashlib.sha1(repr(consulta).encode()).hexdigest()
+        return f'api:ofertas:lista:{version}:{huella}'
+
+    def _calcular_lista(self):
+        ofertas = self.get_queryset()
+        texto = self.request.query_params.get('q', '').strip()
+        if texto:
+            # La búsqueda ya viene acotada (LIMITE_RESULTADOS) y en orden de
+            # relevancia, que no es un orden que el cursor pueda continuar.
+            resultados = self.get_serializer(buscar_ofertas(texto, ofertas), many=True).data
+            datos = {'next': None, 'previous': None, 'results': resultados}
+        else:
+            pagina = self.paginate_queryset(ofertas)
+            datos = self.get_paginated_response(self.get_serializer(pagina, many=True).data).data
+        # Datos planos (sin referencias al serializer) para poder guardarlos en la caché
+        return {
+            'next': datos['next'],
+            'previous': datos['previous'],
+            'results': [dict(fila) for fila in datos['results']],
+        }
+
+    def _lista_cacheada(self):
+        version = version_api()
+        clave = self._clave_cache(version)
+        guardado = cache.get(clave)
+        if guardado is None:
+            datos = self._calcular_lista()
+            ultima = self.get_queryset().aggregate(ultima=Max('fecha_publicacion'))['ultima']
+            etag = hashlib.sha1(f'{clave}:{ultima}'.encode()).hexdigest()
+            escritura = int(version.split('.')[0])
+            # Segundos enteros: If-Modified-Since no tiene fracciones
+            guardado = (datos, etag, max(int(ultima.timestamp()) if ultima else 0, escritura))
+            cache.set(clave, guardado, timeout=settings.API_OFERTAS_CACHE_TTL)
+        return guardado
+
+    def list(self, request, *args, **kwargs):
+        if getattr(settings, 'CACHE_COMPARTIDA', False):
+            datos, etag, ultima = self._lista_cacheada()
+        else:
+            datos = self._calcular_lista()
+            contenido = json.dumps(datos, sort_keys=True, default=str)
+            etag = hashlib.sha1(contenido.encode()).hexdigest()
+            # Sin la versión compartida, la última escritura visible es la edición más
+            # reciente; una oferta cerrada sale de la lista y eso lo detecta el ETag
+            fechas = self.get_queryset().aggregate(
+                publicada=Max('fecha_publicacion'), editada=Max('fecha_actualizacion')
+            )
+            ultima = max((int(f.timestamp()) for f in fechas.values() if f), default=None)
+
+        no_modificado = get_conditional_response(request, etag=quote_etag(etag), last_modified=ultima)
+        respuesta = no_modificado or Response(datos)
+        respuesta['ETag'] = quote_etag(etag)
+        if ultima is not None:
+            respuesta['Last-Modified'] = http_date(ultima)
+        patch_cache_control(respuesta, max_age=0, must_revalidate=True)
+        return respuesta
+
+
+# -----------------------------------------------------------------
+# API MÓVIL: POSTULACIONES, MATCHES Y MENSAJES
+# -----------------------------------------------------------------
+# Lo mismo que las vistas HTML (postular, aceptar/rechazar, matches,
+# chat) pero en JSON y sin redirecciones: una acción = un request.
+# Reutiliza los servicios de revision.py y chat.py, así ambos caminos
+# se comportan igual. El límite de requests por usuario (throttling)
+# se cuenta en la caché compartida (ver REST_FRAMEWORK en settings).
+
+
+class MensajesThrottle(UserRateThrottle):
+    """
+    Límite aparte para ENVIAR mensajes; leer el historial no cuenta.
+    """
+    scope = 'mensajes'
+
+    def allow_request(self, request, view):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return True
+        return super().allow_request(request, view)
+
+
+class TienePerfil(BasePermission):
+    """
+    Postulaciones y matches dependen del rol del Perfil: sin él (p. ej. un
+    staff creado con createsuperuser) se responde 403 y no un 500.
+    """
+    message = 'No se encontró tu perfil. Contacta a soporte.'
+
+    def has_permission(self, request, view):
+        try:
+            request.user.perfil
+        except Perfil.DoesNotExist:
+            return False
+        return True
+
+
+class SolicitudCursorPagination(CursorPagination):
+    ordering = ('-fecha_postulacion', '-id')
+    page_size = 20
+    page_size_query_param = 'tamano'
+    max_page_size = 100
+
+
+class MatchCursorPagination(SolicitudCursorPagination):
+    ordering = ('-actividad', '-id')
+
+
+class MensajeCursorPagination(SolicitudCursorPagination):
+    ordering = ('-id',)
+    page_size = 30
+
+
+class SolicitudViewSet(LecturaEnReplicaMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                       mixins.CreateModelMixin, viewsets.GenericViewSet):
+    """
+    Candidato: sus postulaciones y POST {"oferta": id} para postular.
+    Empleador: las postulaciones a sus ofertas y POST .../decidir/.
+    Filtros: ?estado= y ?oferta=.
+    """
+    serializer_class = SolicitudSerializer
+    permission_classes = [IsAuthenticated, TienePerfil]
+    pagination_class = SolicitudCursorPagination
+
+    def get_queryset(self):
+        perfil = self.request.user.perfil
+        if perfil.tipo == 'empleador':
+            solicitudes = Solicitud.objects.filter(oferta__perfil_empleador=perfil)
+        else:
+            solicitudes = Solicitud.objects.filter(User_candidato=self.request.user)
+
+        params = self.request.query_params
+        if params.get('estado') in dict(Solicitud.ESTADO_CHOICES):
+            solicitudes = solicitudes.filter(estado=params['estado'])
+        if params.get('oferta', '').isdigit():
+            solicitudes = solicitudes.filter(oferta_id=int(params['oferta']))
+        return solicitudes.select_related('oferta__perfil_empleador', 'User_candidato')
+
+    def create(self, request, *args, **kwargs):
+        if request.user.perfil.tipo != 'candidato':
+            raise PermissionDenied('Solo los candidatos pueden postular.')
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        oferta = serializer.validated_data['oferta']
+        if oferta.estado != 'activa':
+            raise ValidationError({'oferta': 'La oferta no está activa.'})
+
+        # Idempotente: repetir la postulación (reintento de la app) devuelve la misma
+        solicitud, creada = Solicitud.objects.get_or_create(oferta=oferta, User_candidato=request.user)
+        return Response(
+            self.get_serializer(solicitud).data,
+            status=status.HTTP_201_CREATED if creada else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=['post'])
+    def decidir(self, request, pk=None):
+        """
+        {"accion": "aceptar"|"rechazar"}. 409 si otro reclutador ya la procesó.
+        """
+        solicitud = self.get_object()
+        if solicitud.oferta.perfil_empleador.user_id != request.user.id:
+            raise PermissionDenied('No tienes permiso para revisar esta oferta.')
+        accion = request.data.get('accion')
+        try:
+            _, conflictos = aplicar_decisiones(solicitud.oferta, [{'solicitud': solicitud.id, 'accion': accion}])
+        except DecisionInvalida as e:
+            raise ValidationError({'accion': str(e)})
+        if conflictos:
+            return Response({'detail': 'La solicitud ya fue procesada.'}, status=status.HTTP_409_CONFLICT)
+        solicitud.estado = ACCIONES[accion]
+        return Response(self.get_serializer(solicitud).data)
+
+
+class MatchViewSet(LecturaEnReplicaMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                   viewsets.GenericViewSet):
+    """
+    Bandeja de matches (actividad reciente primero) y su chat:
+      GET/POST /api/matches/<id>/mensajes/   historial paginado / enviar
+      POST     /api/matches/<id>/leidos/     {"hasta": id} opcional
+    """
+    serializer_class = MatchSerializer
+    permission_classes = [IsAuthenticated, TienePerfil]
+    pagination_class = MatchCursorPagination
+    throttle_classes = [UserRateThrottle, MensajesThrottle]
+
+    def get_queryset(self):
+        return matches_de(self.request.user)
+
+    @action(detail=True, methods=['get', 'post'])
+    def mensajes(self, request, pk=None):
+        solicitud = self.get_object()
+        if request.method == 'POST':
+            serializer = MensajeSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            mensaje = crear_mensaje(
+                solicitud, request.user, participantes(solicitud, request.user),
+                serializer.validated_data['contenido']
+            )
+            notificar_mensaje(mensaje)
+            return Response(MensajeSerializer(mensaje).data, status=status.HTTP_201_CREATED)
+
+        paginador = MensajeCursorPagination()
+        pagina = paginador.paginate_queryset(Mensaje.objects.filter(solicitud=solicitud), request, view=self)
+        return paginador.get_paginated_response(MensajeSerializer(pagina, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def leidos(self, request, pk=None):
+        solicitud = self.get_object()
+        hasta = request.data.get('hasta')
+        if hasta is not None and not str(hasta).isdigit():
+            raise ValidationError({'hasta': 'Debe ser un id de mensaje.'})
+        leidos = marcar_leidos(solicitud.id, request.user, int(hasta) if hasta is not None else None)
+        return Response({'leidos': leidos})
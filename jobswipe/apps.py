@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class JobswipeConfig(AppConfig): 
     default_auto_field = 'django.db.models.BigAutoField'
     # 2. Renombramos el 'name' para que coincida con la carpeta
-    name = 'jobswipe'
\ No newline at end of file
+    name = 'jobswipe'
+
+    def ready(self):
+        # Conecta los receivers (índice de búsqueda) y registra las tareas
+        from . import signals, notificaciones, chat, imagenes, sueldos, relevancia  # noqa: F401
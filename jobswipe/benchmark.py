@@ -0,0 +1,442 @@
+import asyncio
+import http.cookiejar
+import json
+import math
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from itertools import cycle
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .feed import ofertas_disponibles
+from .models import Perfil, Solicitud
+
+# -----------------------------------------------------------------
+# BENCHMARK DE LOS FLUJOS PRINCIPALES (swipe, matches, chat, API)
+# -----------------------------------------------------------------
+# Cada escenario repite un request como un usuario real (candidato o
+# empleador) y mide latencia, consultas SQL por request y requests por
+# segundo. Dos modos:
+#   - 'cliente': Django test client en este proceso; las consultas se
+#     cuentan con CaptureQueriesContext y los cambios (postulaciones) se
+#     deshacen al terminar.
+#   - 'http': contra un servidor corriendo (--url), con varios hilos
+#     concurrentes; las consultas salen de la cabecera Server-Timing
+#     (requiere METRICAS_SERVER_TIMING en el servidor) y los cambios quedan.
+#     Con dos URLs compara un servidor WSGI con uno ASGI (mismos escenarios).
+# Los resultados se comparan con una línea base guardada en JSON.
+
+RUTA_BASELINE = settings.BASE_DIR / 'benchmarks' / 'baseline.json'
+PERCENTILES = (50, 95, 99)
+
+
+class SinDatos(Exception):
+    pass
+
+
+# --- Estadística ---
+def percentil(valores, p):
+    """
+    Percentil por rango más cercano (sin interpolar): siempre es un valor observado.
+    """
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def resumir(nombre, latencias, consultas, duracion_total, errores=0):
+    resultado = {
+        'escenario': nombre,
+        'requests': len(latencias),
+        'errores': errores,
+        'rps': round(len(latencias) / duracion_total, 1) if duracion_total else None,
+        'consultas': round(sum(consultas) / len(consultas), 1) if consultas else None,
+        'consultas_max': max(consultas) if consultas else None,
+    }
+    for p in PERCENTILES:
+        valor = percentil(latencias, p)
+        resultado[f'p{p}_ms'] = round(valor * 1000, 2) if valor is not None else None
+    return resultado
+
+
+# --- Escenarios ---
+def preparar_contexto(prefijo=None):
+    """
+    Elige un candidato con ofertas disponibles, un empleador y un match
+    entre usuarios (de preferencia generados con `generar_datos`).
+    """
+    perfiles = Perfil.objects.select_related('user').filter(user__is_active=True)
+    if prefijo:
+        perfiles = perfiles.filter(user__username__startswith=f'{prefijo}_')
+    match = (
+        Solicitud.objects.filter(estado='aceptada', User_candidato__perfil__in=perfiles)
+        .select_related('User_candidato', 'oferta__perfil_empleador__user')
+        .order_by('-id').first()
+    )
+    if match is None:
+        raise SinDatos('No hay matches: corre antes `python manage.py generar_datos`.')
+
+    candidato = match.User_candidato
+    empleador = match.oferta.perfil_empleador.user
+    disponibles = list(ofertas_disponibles(candidato).values_list('id', flat=True)[:500])
+    return {
+        'candidato': candidato,
+        'empleador': empleador,
+        'match': match.id,
+        'ofertas_disponibles': cycle(disponibles) if disponibles else None,
+    }
+
+
+def escenarios(contexto):
+    """
+    nombre -> (usuario, función que retorna (método, url)).
+    """
+    candidato, empleador = contexto['candidato'], contexto['empleador']
+    chat = reverse('chat', args=[contexto['match']])
+    definidos = {
+        'home': (candidato, lambda: ('GET', reverse('home'))),
+        'matches': (empleador, lambda: ('GET', reverse('matches'))),
+        'chat': (candidato, lambda: ('GET', chat)),
+        'api_ofertas': (candidato, lambda: ('GET', reverse('ofertadeempleo-list'))),
+    }
+    # Cada iteración postula a una oferta distinta (como un swipe real)
+    if contexto['ofertas_disponibles'] is not None:
+        ofertas = contexto['ofertas_disponibles']
+        definidos['postular'] = (
+            candidato, lambda: ('POST', reverse('postular_oferta', args=[next(ofertas)]))
+        )
+    return definidos
+
+
+def _limpiar_throttle(user):
+    # Que las repeticiones no choquen con los límites de la API (caché local)
+    cache.delete_many([f'throttle_user_{user.id}', f'throttle_mensajes_{user.id}'])
+
+
+# --- Modo cliente ---
+def correr_cliente(nombres, iteraciones, calentamiento=3, prefijo=None):
+    resultados = []
+    with transaction.atomic():
+        contexto = preparar_contexto(prefijo)
+        definidos = escenarios(contexto)
+        for nombre in nombres:
+            if nombre not in definidos:
+                continue
+            user, siguiente = definidos[nombre]
+            cliente = Client()
+            cliente.force_login(user)
+            _limpiar_throttle(user)
+
+            for _ in range(calentamiento):
+                metodo, url = siguiente()
+                cliente.generic(metodo, url)
+
+            latencias, consultas, errores = [], [], 0
+            inicio_total = time.perf_counter()
+            for _ in range(iteraciones):
+                metodo, url = siguiente()
+                with CaptureQueriesContext(connection) as capturadas:
+                    inicio = time.perf_counter()
+                    respuesta = cliente.generic(metodo, url)
+                    latencias.append(time.perf_counter() - inicio)
+                consultas.append(len(capturadas))
+                errores += respuesta.status_code >= 400
+            resultados.append(resumir(nombre, latencias, consultas, time.perf_counter() - inicio_total, errores))
+        # Nada de lo creado (postulaciones, sesiones) queda en la base
+        transaction.set_rollback(True)
+    return resultados
+
+
+# --- Modo HTTP ---
+def _cookie_sesion(user):
+    # Sesión creada directamente en el backend: no hace falta pasar por el login
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store[SESSION_KEY] = str(user.pk)
+    store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    store.save()
+    return store.session_key
+
+
+def _abridor():
+    # Sin seguir redirecciones: se mide la vista, no la página a la que redirige
+    class SinRedirecciones(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+    return urllib.request.build_opener(SinRedirecciones)
+
+
+def _csrf(base, sesion):
+    # Un GET cualquiera entrega la cookie csrftoken para los POST
+    jar = http.cookiejar.CookieJar()
+    abridor = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    peticion = urllib.request.Request(base + reverse('home'), headers={'Cookie': f'{settings.SESSION_COOKIE_NAME}={sesion}'})
+    try:
+        abridor.open(peticion, timeout=30).read()
+    except urllib.error.HTTPError:
+        pass
+    return next((c.value for c in jar if c.name == settings.CSRF_COOKIE_NAME), None)
+
+
+_CONSULTAS_SERVER_TIMING = re.compile(r'desc="(\d+) consultas"')
+
+
+def _un_request(abridor, base, metodo, url, cabeceras):
+    peticion = urllib.request.Request(base + url, method=metodo, headers=cabeceras, data=b'' if metodo == 'POST' else None)
+    inicio = time.perf_counter()
+    try:
+        respuesta = abridor.open(peticion, timeout=30)
+        respuesta.read()
+        estado, timing = respuesta.status, respuesta.headers.get('Server-Timing', '')
+    except urllib.error.HTTPError as error:
+        estado, timing = error.code, error.headers.get('Server-Timing', '')
+    duracion = time.perf_counter() - inicio
+    coincidencia = _CONSULTAS_SERVER_TIMING.search(timing or '')
+    return duracion, int(coincidencia.group(1)) if coincidencia else None, estado
+
+
+def correr_http(base, nombres, iteraciones, concurrencia=4, calentamiento=3, prefijo=None):
+    base = base.rstrip('/')
+    contexto = preparar_contexto(prefijo)
+    definidos = escenarios(contexto)
+    abridor = _abridor()
+    resultados = []
+    for nombre in nombres:
+        if nombre not in definidos:
+            continue
+        user, siguiente = definidos[nombre]
+        sesion = _cookie_sesion(user)
+        cookies = f'{settings.SESSION_COOKIE_NAME}={sesion}'
+        cabeceras = {'Cookie': cookies, 'Referer': base + '/'}
+        token = _csrf(base, sesion)
+        if token:
+            cabeceras.update({'Cookie': f'{cookies}; {settings.CSRF_COOKIE_NAME}={token}', 'X-CSRFToken': token})
+
+        for _ in range(calentamiento):
+            _un_request(abridor, base, *siguiente(), cabeceras)
+
+        # Las URLs se arman antes: next() sobre el ciclo de ofertas no es seguro entre hilos
+        peticiones = [siguiente() for _ in range(iteraciones)]
+        inicio_total = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            medidas = list(pool.map(lambda p: _un_request(abridor, base, p[0], p[1], cabeceras), peticiones))
+        duracion_total = time.perf_counter() - inicio_total
+
+        latencias = [m[0] for m in medidas]
+        consultas = [m[1] for m in medidas if m[1] is not None]
+        errores = sum(1 for m in medidas if m[2] >= 400)
+        resultados.append(resumir(nombre, latencias, consultas, duracion_total, errores))
+    return resultados
+
+
+# --- Línea base ---
+def cargar_baseline(ruta=RUTA_BASELINE):
+    """
+    (modo, {escenario: resultado}) de la línea base, o None si no existe.
+    Solo se comparan corridas del mismo modo: las latencias del cliente de
+    pruebas no son comparables con las de un servidor HTTP.
+    """
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+    except FileNotFoundError:
+        return None
+    return datos.get('modo'), {r['escenario']: r for r in datos['resultados']}
+
+
+def guardar_baseline(resultados, modo, ruta=RUTA_BASELINE):
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({'modo': modo, 'resultados': resultados}, archivo, indent=2, ensure_ascii=False)
+
+
+def comparar(resultados, baseline, tolerancia=0.2):
+    """
+    Regresiones respecto de la línea base: p95 más de `tolerancia` peor,
+    RPS más de `tolerancia` menor, o más consultas por request (exacto:
+    una consulta extra suele ser un N+1 nuevo).
+    """
+    regresiones = []
+    for actual in resultados:
+        base = baseline.get(actual['escenario'])
+        if not base:
+            continue
+        nombre = actual['escenario']
+        # None: sin requests o una corrida de duración 0 (resumir no calcula el valor)
+        if base.get('p95_ms') and actual['p95_ms'] is not None \
+                and actual['p95_ms'] > base['p95_ms'] * (1 + tolerancia):
+            regresiones.append(f"{nombre}: p95 {actual['p95_ms']} ms (base {base['p95_ms']} ms)")
+        if base.get('rps') and actual['rps'] is not None and actual['rps'] < base['rps'] * (1 - tolerancia):
+            regresiones.append(f"{nombre}: {actual['rps']} req/s (base {base['rps']} req/s)")
+        if base.get('consultas') is not None and actual['consultas'] is not None \
+                and actual['consultas'] > base['consultas']:
+            regresiones.append(f"{nombre}: {actual['consultas']} consultas/request (base {base['consultas']})")
+    return regresiones
+
+
+# --- Conexiones a la base ---
+def comparar_conexiones(iteraciones=50, alias='default'):
+    """
+    Latencia de un SELECT 1 abriendo una conexión nueva en cada request
+    (o tomándola del pool, si está configurado) vs. reutilizando la
+    persistente: lo que ahorra CONN_MAX_AGE / el pool por request.
+    """
+    nuevas, reutilizadas = [], []
+    inicio_total = time.perf_counter()
+    for _ in range(iteraciones):
+        conexion = connections.create_connection(alias)
+        inicio = time.perf_counter()
+        with conexion.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        nuevas.append(time.perf_counter() - inicio)
+        conexion.close()
+    duracion_nuevas = time.perf_counter() - inicio_total
+
+    persistente = connections[alias]
+    persistente.ensure_connection()
+    inicio_total = time.perf_counter()
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        with persistente.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        reutilizadas.append(time.perf_counter() - inicio)
+    duracion_reutilizadas = time.perf_counter() - inicio_total
+
+    con_pool = 'pool' in persistente.settings_dict.get('OPTIONS', {})
+    return [
+        resumir('conexion_pool' if con_pool else 'conexion_nueva', nuevas, [1] * iteraciones, duracion_nuevas),
+        resumir('conexion_reutilizada', reutilizadas, [1] * iteraciones, duracion_reutilizadas),
+    ]
+
+
+# --- WSGI vs. ASGI con un upstream lento ---
+def comparar_servidores(urls, nombres, iteraciones, concurrencia=4, calentamiento=3, prefijo=None):
+    """
+    Corre los mismos escenarios HTTP contra cada servidor de `urls`
+    ({'wsgi': url, 'asgi': url}); los escenarios quedan como 'wsgi:home'.
+    """
+    resultados = []
+    for modo, url in urls.items():
+        for fila in correr_http(url, nombres, iteraciones, concurrencia, calentamiento, prefijo):
+            fila['escenario'] = f'{modo}:{fila["escenario"]}'
+            resultados.append(fila)
+    return resultados
+
+
+class ProxyLento:
+    """
+    Proxy TCP que retrasa `demora` segundos cada respuesta del destino:
+    puesto entre la app y la base simula una base remota (cada consulta
+    paga un viaje de ida y vuelta). Corre en un hilo con su event loop.
+    """
+
+    def __init__(self, destino_host, destino_puerto, demora, puerto=0, host='127.0.0.1'):
+        self.destino = (destino_host, destino_puerto)
+        self.demora = demora
+        self.host, self.puerto = host, puerto
+        self._loop = None
+        self._servidor = None
+        self._hilo = None
+        self._escritores = set()
+        self._error = None
+        self._listo = threading.Event()
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._correr, daemon=True, name='proxy-lento')
+        self._hilo.start()
+        self._listo.wait(timeout=5)
+        if self._error is not None:
+            self._hilo.join(timeout=5)
+            raise self._error
+        return self.puerto
+
+    def detener(self):
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._cerrar(), self._loop)
+        if self._hilo is not None:
+            self._hilo.join(timeout=5)
+
+    async def _cerrar(self):
+        # Cierra el servidor y las conexiones abiertas: las copias terminan solas al
+        # leer EOF. Las que sigan (p. ej. en plena demora) se cancelan y se esperan
+        # antes de detener el loop, así no quedan CancelledError ni sockets sueltos.
+        await asyncio.sleep(0)  # termina los accept en curso: en 3.11 fallan con el servidor cerrado
+        self._servidor.close()
+        while True:
+            await asyncio.sleep(0)  # conexiones ya aceptadas cuya tarea aún no empieza
+            for escritor in list(self._escritores):
+                escritor.close()
+            pendientes = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            if not pendientes:
+                break
+            _, pendientes = await asyncio.wait(pendientes, timeout=1)
+            for tarea in pendientes:
+                tarea.cancel()
+            await asyncio.gather(*pendientes, return_exceptions=True)
+        await self._servidor.wait_closed()
+        asyncio.get_running_loop().stop()
+
+    def _correr(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._servidor = loop.run_until_complete(asyncio.start_server(self._atender, self.host, self.puerto))
+        except OSError as e:
+            # Puerto ocupado o inválido: se reporta en iniciar() en vez de morir en el hilo
+            self._error = e
+            self._listo.set()
+            loop.close()
+            return
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        self._listo.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _atender(self, lector, escritor):
+        escritores = {escritor}
+        self._escritores.add(escritor)
+        try:
+            lector_destino, escritor_destino = await asyncio.open_connection(*self.destino)
+            escritores.add(escritor_destino)
+            self._escritores.add(escritor_destino)
+            await asyncio.gather(
+                self._copiar(lector, escritor_destino, 0),
+                self._copiar(lector_destino, escritor, self.demora),
+            )
+        except (OSError, asyncio.CancelledError):
+            # Destino caído, o cancelada al detener el proxy (en Python 3.11 asyncio
+            # registra como error la cancelación de un callback de start_server)
+            pass
+        finally:
+            for abierto in escritores:
+                abierto.close()
+            self._escritores.difference_update(escritores)
+
+    async def _copiar(self, origen, destino, demora):
+        try:
+            while datos := await origen.read(65536):
+                if demora:
+                    await asyncio.sleep(demora)
+                destino.write(datos)
+                await destino.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            destino.close()
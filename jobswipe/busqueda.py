@@ -0,0 +1,220 @@
+import re
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.module_loading import import_string
+
+from .models import OfertaDeEmpleo
+
+# -----------------------------------------------------------------
+# BÚSQUEDA DE TEXTO COMPLETO SOBRE OFERTAS
+# -----------------------------------------------------------------
+# El índice vive en una tabla auxiliar que se mantiene al guardar o
+# borrar una oferta (ver signals.py):
+#   - PostgreSQL: tsvector ponderado (título > descripción > categoría) + índice GIN
+#   - SQLite:     tabla virtual FTS5 con ranking bm25
+#   - Otros (MySQL): sin índice, búsqueda con icontains
+# El backend se elige por motor de base de datos o con BUSQUEDA_BACKEND.
+
+LIMITE_RESULTADOS = 200
+TABLA_PG = 'jobswipe_oferta_busqueda'
+TABLA_FTS = 'jobswipe_oferta_fts'
+
+
+def _textos(oferta):
+    categoria = oferta.categoria.nombre if oferta.categoria_id else ''
+    return oferta.titulo or '', oferta.descripcion or '', categoria
+
+
+def _terminos(texto):
+    return re.findall(r'\w+', texto.lower())
+
+
+class BackendBusqueda:
+    """
+    Interfaz de los backends. `buscar` recibe un queryset ya filtrado
+    y retorna [(id_oferta, relevancia)] ordenado de mayor a menor.
+    """
+
+    def indexar(self, oferta):
+        pass
+
+    def eliminar(self, oferta_id):
+        pass
+
+    def reindexar_todo(self):
+        for oferta in OfertaDeEmpleo.objects.select_related('categoria').iterator(chunk_size=500):
+            self.indexar(oferta)
+
+    def buscar(self, texto, queryset, limite=LIMITE_RESULTADOS):
+        raise NotImplementedError
+
+
+class BackendPostgres(BackendBusqueda):
+
+    def indexar(self, oferta):
+        titulo, descripcion, categoria = _textos(oferta)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {TABLA_PG} (oferta_id, documento)
+                VALUES (%s,
+                    setweight(to_tsvector('spanish', %s), 'A') ||
+                    setweight(to_tsvector('spanish', %s), 'B') ||
+                    setweight(to_tsvector('spanish', %s), 'C'))
+                ON CONFLICT (oferta_id) DO UPDATE SET documento = EXCLUDED.documento
+                """,
+                [oferta.id, titulo, descripcion, categoria],
+            )
+
+    def eliminar(self, oferta_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_PG} WHERE oferta_id = %s', [oferta_id])
+
+    def buscar(self, texto, queryset, limite=LIMITE_RESULTADOS):
+        sql_filtro, params_filtro = queryset.order_by().values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT b.oferta_id, ts_rank(b.documento, q) AS relevancia
+                FROM {TABLA_PG} b, websearch_to_tsquery('spanish', %s) q
+                WHERE b.documento @@ q AND b.oferta_id IN ({sql_filtro})
+                ORDER BY relevancia DESC, b.oferta_id DESC
+                LIMIT %s
+                """,
+                [texto, *params_filtro, limite],
+            )
+            return cursor.fetchall()
+
+
+class BackendSQLite(BackendBusqueda):
+
+    def indexar(self, oferta):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_FTS} WHERE rowid = %s', [oferta.id])
+            cursor.execute(
+                f'INSERT INTO {TABLA_FTS} (rowid, titulo, descripcion, categoria) VALUES (%s, %s, %s, %s)',
+                [oferta.id, *_textos(oferta)],
+            )
+
+    def eliminar(self, oferta_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_FTS} WHERE rowid = %s', [oferta_id])
+
+    def buscar(self, texto, queryset, limite=LIMITE_RESULTADOS):
+        terminos = _terminos(texto)
+        if not terminos:
+            return []
+        # Cada palabra entre comillas (sin operadores FTS del usuario) y como prefijo
+        consulta = ' '.join(f'"{termino}"*' for termino in terminos)
+        sql_filtro, params_filtro = queryset.order_by().values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT rowid, -bm25({TABLA_FTS}, 10.0, 3.0, 1.0) AS relevancia
+                FROM {TABLA_FTS}
+                WHERE {TABLA_FTS} MATCH %s AND rowid IN ({sql_filtro})
+                ORDER BY relevancia DESC, rowid DESC
+                LIMIT %s
+                """,
+                [consulta, *params_filtro, limite],
+            )
+            return cursor.fetchall()
+
+
+class BackendSimple(BackendBusqueda):
+    """
+    Sin índice de texto: todas las palabras deben aparecer (icontains).
+    """
+
+    def buscar(self, texto, queryset, limite=LIMITE_RESULTADOS):
+        for termino in _terminos(texto):
+            queryset = queryset.filter(
+                Q(titulo__icontains=termino) | Q(descripcion__icontains=termino) |
+                Q(categoria__nombre__icontains=termino)
+            )
+        ids = queryset.order_by('-fecha_publicacion', '-id').values_list('id', flat=True)[:limite]
+        return [(id_oferta, 0) for id_oferta in ids]
+
+
+BACKENDS_POR_MOTOR = {
+    'postgresql': BackendPostgres,
+    'sqlite': BackendSQLite,
+}
+
+_backend = None
+
+
+def obtener_backend():
+    global _backend
+    if _backend is None:
+        ruta = getattr(settings, 'BUSQUEDA_BACKEND', None)
+        clase = import_string(ruta) if ruta else BACKENDS_POR_MOTOR.get(connection.vendor, BackendSimple)
+        _backend = clase()
+    return _backend
+
+
+# --- Filtros comunes (UI y API) ---
+def _fecha_desde(valor):
+    try:
+        fecha = parse_datetime(valor) or parse_date(valor)
+    except ValueError:
+        return None
+    if fecha is None:
+        return None
+    if not isinstance(fecha, datetime):
+        fecha = datetime.combine(fecha, time.min)
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+def filtrar_ofertas(queryset, params):
+    """
+    Aplica los filtros categoria, es_inclusion, moneda, sueldo_min, sueldo_max
+    (monto publicado), sueldo_clp_min, sueldo_clp_max (en pesos, entre monedas)
+    y publicada_desde (fecha o fecha y hora ISO). Los valores inválidos se ignoran.
+    """
+    if params.get('categoria', '').isdigit():
+        queryset = queryset.filter(categoria_id=int(params['categoria']))
+    if params.get('es_inclusion') in ('1', 'true', 'True'):
+        queryset = queryset.filter(es_inclusion=True)
+    elif params.get('es_inclusion') in ('0', 'false', 'False'):
+        queryset = queryset.filter(es_inclusion=False)
+    if params.get('moneda') in ('CLP', 'USD'):
+        queryset = queryset.filter(moneda=params['moneda'])
+    if params.get('sueldo_min', '').isdigit():
+        queryset = queryset.filter(sueldo__gte=int(params['sueldo_min']))
+    if params.get('sueldo_max', '').isdigit():
+        queryset = queryset.filter(sueldo__lte=int(params['sueldo_max']))
+    if params.get('sueldo_clp_min', '').isdigit():
+        queryset = queryset.filter(sueldo_normalizado__gte=int(params['sueldo_clp_min']))
+    if params.get('sueldo_clp_max', '').isdigit():
+        queryset = queryset.filter(sueldo_normalizado__lte=int(params['sueldo_clp_max']))
+    desde = _fecha_desde(params.get('publicada_desde', ''))
+    if desde is not None:
+        queryset = queryset.filter(fecha_publicacion__gte=desde)
+    return queryset
+
+
+def buscar_ofertas(texto, queryset=None, limite=LIMITE_RESULTADOS):
+    """
+    Retorna un queryset con las ofertas que calzan con `texto`, ordenadas
+    por relevancia (anotada en `posicion`, 0 = la más relevante).
+    """
+    if queryset is None:
+        queryset = OfertaDeEmpleo.objects.filter(estado='activa')
+    resultados = obtener_backend().buscar(texto, queryset, limite)
+    ids = [id_oferta for id_oferta, _ in resultados]
+    if not ids:
+        return queryset.none()
+    return queryset.filter(id__in=ids).annotate(
+        posicion=Case(
+            *[When(id=id_oferta, then=Value(i)) for i, id_oferta in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+    ).order_by('posicion')
@@ -0,0 +1,192 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Substr
+
+from .models import ACTIVIDAD_SOLICITUD, Mensaje, OfertaDeEmpleo, Solicitud
+from .notificaciones import agendar_aviso_mensaje
+from .tareas import tarea
+
+TAMANO_PAGINA = 30
+TAMANO_PAGINA_MAXIMO = 100
+LARGO_RESUMEN = 120  # Igual a Solicitud.ultimo_mensaje_texto
+
+# -----------------------------------------------------------------
+# SERVICIO DE CHAT
+# -----------------------------------------------------------------
+# Lógica compartida por la vista HTML (chat_view) y el WebSocket
+# (consumers.ChatConsumer), para que ambos caminos se comporten igual.
+
+
+def nombre_grupo(solicitud_id):
+    return f'chat_{solicitud_id}'
+
+
+def participantes(solicitud, user):
+    """
+    Retorna el otro usuario del match, o None si `user` no participa.
+    `solicitud` debe venir con select_related('oferta__perfil_empleador__user').
+    """
+    empleador = solicitud.oferta.perfil_empleador.user
+    if user.id == solicitud.User_candidato_id:
+        return empleador
+    if user.id == empleador.id:
+        return solicitud.User_candidato
+    return None
+
+
+def matches_de(user):
+    """
+    Bandeja de matches de `user`, actividad reciente primero. Se filtra por
+    el lado que corresponde a su rol (sin OR): así cada lado se sirve de su
+    índice (solicitud_cand_actividad_idx / solicitud_oferta_actividad_idx).
+    """
+    perfil = user.perfil
+    if perfil.tipo == 'empleador':
+        # IN (ofertas del empleador) y no un JOIN: el motor recorre el índice oferta por oferta
+        matches = Solicitud.objects.filter(oferta__in=OfertaDeEmpleo.objects.filter(perfil_empleador=perfil).values('id'))
+    else:
+        matches = Solicitud.objects.filter(User_candidato=user)
+    # select_related: la plantilla recorre oferta -> empleador -> user y el candidato.
+    # El resumen del chat (no leídos, último mensaje) ya viene en la misma fila.
+    return matches.filter(estado='aceptada').select_related(
+        'oferta__perfil_empleador__user', 'User_candidato'
+    ).annotate(actividad=ACTIVIDAD_SOLICITUD).order_by('-actividad', '-id')
+
+
+def serializar_mensaje(mensaje):
+    return {
+        'id': mensaje.id,
+        'origen': mensaje.User_origen_id,
+        'destino': mensaje.User_destino_id,
+        'contenido': mensaje.contenido,
+        'fecha': mensaje.fecha.isoformat(),
+        'leido': mensaje.leido,
+    }
+
+
+def pagina_mensajes(solicitud_id, antes=None, despues=None, tamano=TAMANO_PAGINA):
+    """
+    Paginación por cursor (id) del historial de un match.
+      - sin cursor: la página más reciente
+      - antes=<id>: la página anterior a ese mensaje (scroll hacia arriba)
+      - despues=<id>: lo nuevo desde ese mensaje (polling incremental)
+    Retorna (mensajes en orden cronológico, hay_mas).
+    """
+    tamano = max(1, min(tamano, TAMANO_PAGINA_MAXIMO))
+    mensajes = Mensaje.objects.filter(solicitud_id=solicitud_id)
+
+    if despues is not None:
+        pagina = list(mensajes.filter(id__gt=despues).order_by('id')[:tamano + 1])
+        hay_mas = len(pagina) > tamano
+        return pagina[:tamano], hay_mas
+
+    if antes is not None:
+        mensajes = mensajes.filter(id__lt=antes)
+    pagina = list(mensajes.order_by('-id')[:tamano + 1])
+    hay_mas = len(pagina) > tamano
+    return pagina[:tamano][::-1], hay_mas
+
+
+def version_chat(solicitud):
+    """
+    Huella del estado del chat (último mensaje y no leídos de cada lado),
+    usada como ETag para responder 304 sin leer el historial. Sale del
+    resumen desnormalizado de la Solicitud (crear_mensaje y marcar_leidos
+    lo mantienen), que la vista ya cargó: no recorre los mensajes.
+    """
+    return f'{solicitud.ultimo_mensaje_id or 0}-{solicitud.no_leidos_candidato}-{solicitud.no_leidos_empleador}'
+
+
+def crear_mensaje(solicitud, origen, destino, contenido):
+    """
+    Crea el mensaje y actualiza el resumen del match (no leídos del
+    destinatario y último mensaje) en la misma transacción. El aviso por
+    correo queda encolado (se envía solo si el mensaje sigue sin leer).
+    """
+    with transaction.atomic():
+        mensaje = Mensaje.objects.create(
+            solicitud=solicitud,
+            User_origen=origen,
+            User_destino=destino,
+            contenido=contenido
+        )
+        if destino.id == solicitud.User_candidato_id:
+            contador = {'no_leidos_candidato': F('no_leidos_candidato') + 1}
+        else:
+            contador = {'no_leidos_empleador': F('no_leidos_empleador') + 1}
+        Solicitud.objects.filter(id=solicitud.id).update(
+            ultimo_mensaje=mensaje,
+            ultimo_mensaje_texto=contenido[:LARGO_RESUMEN],
+            ultimo_mensaje_fecha=mensaje.fecha,
+            **contador
+        )
+        agendar_aviso_mensaje(solicitud, destino)
+    return mensaje
+
+
+def marcar_leidos(solicitud_id, user, hasta_id=None):
+    """
+    Marca como leídos (en un solo UPDATE) los mensajes recibidos por `user`.
+    Retorna la cantidad de mensajes actualizados.
+    """
+    pendientes = Mensaje.objects.filter(solicitud_id=solicitud_id, User_destino=user, leido=False)
+    if hasta_id is not None:
+        pendientes = pendientes.filter(id__lte=hasta_id)
+
+    with transaction.atomic():
+        leidos = pendientes.update(leido=True)
+        if leidos:
+            match = Solicitud.objects.filter(id=solicitud_id)
+            # Un UPDATE si es el candidato; si no, es el empleador
+            if not match.filter(User_candidato=user).update(
+                no_leidos_candidato=Greatest(F('no_leidos_candidato') - leidos, 0)
+            ):
+                match.update(no_leidos_empleador=Greatest(F('no_leidos_empleador') - leidos, 0))
+    return leidos
+
+
+def reconstruir_resumenes(solicitudes=None):
+    """
+    Recalcula desde cero los contadores y el último mensaje de cada match,
+    con un único UPDATE (subconsultas correlacionadas) por lote.
+    """
+    if solicitudes is None:
+        solicitudes = Solicitud.objects.all()
+
+    mensajes = Mensaje.objects.filter(solicitud=OuterRef('pk'))
+    no_leidos = mensajes.filter(leido=False).values('solicitud').annotate(n=Count('id')).values('n')
+    no_leidos_candidato = no_leidos.filter(User_destino=OuterRef('User_candidato'))
+    no_leidos_empleador = no_leidos.exclude(User_destino=OuterRef('User_candidato'))
+    ultimo = mensajes.order_by('-id')
+
+    return solicitudes.update(
+        no_leidos_candidato=Coalesce(Subquery(no_leidos_candidato), Value(0)),
+        no_leidos_empleador=Coalesce(Subquery(no_leidos_empleador), Value(0)),
+        ultimo_mensaje=Subquery(ultimo.values('id')[:1]),
+        ultimo_mensaje_texto=Coalesce(
+            Substr(Subquery(ultimo.values('contenido')[:1]), 1, LARGO_RESUMEN), Value('')
+        ),
+        ultimo_mensaje_fecha=Subquery(ultimo.values('fecha')[:1]),
+    )
+
+
+@tarea('reconstruir_resumenes_chat')
+def reconstruir_resumenes_rango(desde_id, hasta_id):
+    # Versión encolable (argumentos JSON) de reconstruir_resumenes
+    return reconstruir_resumenes(Solicitud.objects.filter(id__gt=desde_id, id__lte=hasta_id))
+
+
+def notificar_mensaje(mensaje):
+    """
+    Empuja el mensaje a los WebSockets abiertos del match.
+    """
+    capa = get_channel_layer()
+    if capa is None:
+        return
+    async_to_sync(capa.group_send)(
+        nombre_grupo(mensaje.solicitud_id),
+        {'type': 'chat.mensaje', 'mensaje': serializar_mensaje(mensaje)}
+    )
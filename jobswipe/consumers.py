@@ -0,0 +1,96 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from . import chat
+from .models import Solicitud
+
+# -----------------------------------------------------------------
+# CHAT EN TIEMPO REAL (WebSocket por match)
+# -----------------------------------------------------------------
+# Protocolo (JSON):
+#   cliente -> {"tipo": "mensaje", "contenido": "...", "id_cliente": "abc"}
+#   servidor -> {"tipo": "ack", "id_cliente": "abc", "mensaje": {...}}
+#   servidor -> {"tipo": "mensaje", "mensaje": {...}}   (a ambos lados)
+#   cliente -> {"tipo": "leido", "hasta": 123}
+#   servidor -> {"tipo": "leidos", "lector": 7, "hasta": 123}
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+        self.solicitud_id = self.scope['url_route']['kwargs']['solicitud_id']
+
+        if self.user is None or not self.user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.otro_usuario = await self._obtener_otro_usuario()
+        if self.otro_usuario is None:
+            await self.close(code=4403)
+            return
+
+        self.grupo = chat.nombre_grupo(self.solicitud_id)
+        await self.channel_layer.group_add(self.grupo, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'grupo'):
+            await self.channel_layer.group_discard(self.grupo, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        tipo = content.get('tipo')
+
+        if tipo == 'mensaje':
+            contenido = (content.get('contenido') or '').strip()
+            if not contenido:
+                await self.send_json({'tipo': 'error', 'id_cliente': content.get('id_cliente'),
+                                      'error': 'Mensaje vacío.'})
+                return
+            mensaje = await self._crear_mensaje(contenido)
+            datos = chat.serializar_mensaje(mensaje)
+            # Ack al emisor antes de difundir, para que confirme su burbuja
+            await self.send_json({'tipo': 'ack', 'id_cliente': content.get('id_cliente'), 'mensaje': datos})
+            await self.channel_layer.group_send(self.grupo, {
+                'type': 'chat.mensaje', 'mensaje': datos, 'excluir': self.channel_name,
+            })
+
+        elif tipo == 'leido':
+            hasta = content.get('hasta')
+            await self._marcar_leidos(hasta)
+            await self.channel_layer.group_send(self.grupo, {
+                'type': 'chat.leidos', 'lector': self.user.id, 'hasta': hasta,
+            })
+
+    # --- Eventos del channel layer ---
+    async def chat_mensaje(self, event):
+        if event.get('excluir') == self.channel_name:
+            return
+        await self.send_json({'tipo': 'mensaje', 'mensaje': event['mensaje']})
+
+    async def chat_leidos(self, event):
+        await self.send_json({'tipo': 'leidos', 'lector': event['lector'], 'hasta': event['hasta']})
+
+    # --- Acceso a la base de datos ---
+    @database_sync_to_async
+    def _obtener_otro_usuario(self):
+        solicitud = Solicitud.objects.select_related(
+            'oferta__perfil_empleador__user', 'User_candidato'
+        ).filter(id=self.solicitud_id, estado='aceptada').first()
+        if solicitud is None:
+            return None
+        self.solicitud = solicitud
+        return chat.participantes(solicitud, self.user)
+
+    @database_sync_to_async
+    def _crear_mensaje(self, contenido):
+        return chat.crear_mensaje(self.solicitud, self.user, self.otro_usuario, contenido)
+
+    @database_sync_to_async
+    def _marcar_leidos(self, hasta):
+        if hasta is not None:
+            try:
+                hasta = int(hasta)
+            except (TypeError, ValueError):
+                hasta = None
+        return chat.marcar_leidos(self.solicitud_id, self.user, hasta_id=hasta)
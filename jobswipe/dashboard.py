@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OfertaDeEmpleo
+
+# -----------------------------------------------------------------
+# CACHÉ DEL DASHBOARD (home.html)
+# -----------------------------------------------------------------
+# Dos niveles:
+#   - La lista de ofertas del empleador se cachea por perfil_empleador
+#     y se borra cuando una de sus ofertas cambia (signals.py). Solo con
+#     CACHE_COMPARTIDA: con la caché de cada worker el borrado no llega a
+#     los demás y mostrarían la lista vieja hasta el TTL.
+#   - Cada tarjeta de oferta es un fragmento {% cache %} con clave
+#     (id, fecha_actualizacion): guardar la oferta genera una clave nueva,
+#     así una tarjeta vieja nunca se muestra. Lo que la tarjeta pinta de
+#     otros modelos (empleador, categoría) "toca" la oferta al cambiar.
+# Los fragmentos no incluyen los formularios: {% csrf_token %} es por usuario.
+
+CAMPOS_TARJETA_EMPLEADOR = (
+    'id', 'titulo', 'descripcion', 'fecha_publicacion', 'fecha_actualizacion',
+    'estado', 'es_inclusion', 'moneda', 'sueldo',
+)
+
+
+def _clave_empleador(perfil_id):
+    return f'dashboard:empleador:{perfil_id}'
+
+
+def ofertas_del_empleador(perfil):
+    """
+    Ofertas del dashboard del empleador, solo con las columnas que pinta la tarjeta.
+    """
+    def consultar():
+        return list(
+            OfertaDeEmpleo.objects.filter(perfil_empleador=perfil)
+            .only(*CAMPOS_TARJETA_EMPLEADOR)
+            .order_by('-fecha_publicacion')
+        )
+    if not getattr(settings, 'CACHE_COMPARTIDA', False):
+        return consultar()
+    return cache.get_or_set(
+        _clave_empleador(perfil.id), consultar, timeout=getattr(settings, 'CACHE_DASHBOARD_TTL', 60 * 10),
+    )
+
+
+def invalidar_empleador(perfil_id):
+    # Después del commit: antes, otro request podría volver a cachear la lista vieja
+    transaction.on_commit(lambda: cache.delete(_clave_empleador(perfil_id)))
+
+
+def tocar_ofertas(ofertas, **cambios):
+    """
+    Renueva fecha_actualizacion (y con ello la clave de sus tarjetas) de
+    las ofertas de un queryset, en un solo UPDATE. Para cambios en modelos
+    relacionados que la tarjeta también muestra, o para aplicar `cambios`
+    masivos a las ofertas mismas (acciones del admin).
+    """
+    perfiles = set(ofertas.values_list('perfil_empleador_id', flat=True).distinct())
+    if not perfiles:
+        return 0
+    tocadas = ofertas.update(fecha_actualizacion=timezone.now(), **cambios)
+    for perfil_id in perfiles:
+        invalidar_empleador(perfil_id)
+    return tocadas
@@ -0,0 +1,171 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Descarte, OfertaDeEmpleo, Solicitud
+
+# -----------------------------------------------------------------
+# FEED DE OFERTAS PARA CANDIDATOS (swipe)
+# -----------------------------------------------------------------
+# Las tarjetas se sirven en lotes de tamaño fijo con paginación por
+# cursor (keyset): cada lote continúa desde la última oferta del lote
+# anterior, sin OFFSET y sin materializar todas las ofertas activas.
+
+TAMANO_LOTE = 10
+TAMANO_LOTE_MAXIMO = 50
+DECISIONES_MAXIMAS = 100  # Por request del endpoint de swipes en lote
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def campos_de_orden(perfil, orden=None):
+    """
+    Campos del keyset según el perfil y el orden pedido (todos descendentes).
+    Ley 21.015: para usuarios PcD primero las ofertas inclusivas.
+    orden='sueldo': mejor pagadas primero (sueldo en CLP, ver sueldos.py).
+    """
+    principal = 'sueldo_normalizado' if orden == 'sueldo' else 'fecha_publicacion'
+    if perfil.es_pcd:
+        return ['es_inclusion', principal, 'id']
+    return [principal, 'id']
+
+
+def codificar_cursor(oferta, campos):
+    valores = []
+    for campo in campos:
+        valor = getattr(oferta, campo)
+        if isinstance(valor, datetime):
+            valor = valor.isoformat()
+        valores.append(valor)
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+
+def decodificar_cursor(cursor, campos):
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise CursorInvalido('Cursor inválido.')
+    if not isinstance(valores, list) or len(valores) != len(campos):
+        raise CursorInvalido('El cursor no corresponde al orden actual del feed.')
+
+    decodificados = []
+    for campo, valor in zip(campos, valores):
+        if campo == 'fecha_publicacion':
+            try:
+                valor = datetime.fromisoformat(valor)
+            except (TypeError, ValueError):
+                raise CursorInvalido('Cursor inválido.')
+        elif campo in ('sueldo_normalizado', 'id') and (not isinstance(valor, int) or isinstance(valor, bool)):
+            raise CursorInvalido('El cursor no corresponde al orden actual del feed.')
+        decodificados.append(valor)
+    return decodificados
+
+
+def _filtro_despues_de(campos, valores):
+    # (a, b, c) < (va, vb, vc) en orden descendente, expandido para que
+    # la base de datos pueda usar el índice compuesto.
+    condicion = Q()
+    for i, campo in enumerate(campos):
+        termino = Q(**{f'{campo}__lt': valores[i]})
+        for campo_previo, valor_previo in zip(campos[:i], valores[:i]):
+            termino &= Q(**{campo_previo: valor_previo})
+        condicion |= termino
+    return condicion
+
+
+def ofertas_disponibles(user, filtros=None):
+    """
+    Ofertas activas que el candidato aún no ha postulado ni descartado (anti-join).
+    """
+    ya_postulada = Solicitud.objects.filter(User_candidato=user, oferta=OuterRef('pk'))
+    ya_descartada = Descarte.objects.filter(User_candidato=user, oferta=OuterRef('pk'))
+    ofertas = OfertaDeEmpleo.objects.filter(estado='activa').filter(
+        ~Exists(ya_postulada), ~Exists(ya_descartada)
+    )
+    if filtros:
+        from .busqueda import filtrar_ofertas
+        ofertas = filtrar_ofertas(ofertas, filtros)
+    return ofertas
+
+
+def obtener_lote(user, perfil, cursor=None, tamano=TAMANO_LOTE, orden=None, filtros=None):
+    """
+    Retorna (ofertas, siguiente_cursor). `siguiente_cursor` es None
+    cuando no quedan más ofertas. `filtros` son los de busqueda.filtrar_ofertas.
+    """
+    tamano = max(1, min(tamano, TAMANO_LOTE_MAXIMO))
+    campos = campos_de_orden(perfil, orden)
+
+    ofertas = ofertas_disponibles(user, filtros).select_related('perfil_empleador__user', 'categoria')
+    if 'sueldo_normalizado' in campos:
+        # Ordenar por sueldo deja fuera las ofertas que no lo publican
+        ofertas = ofertas.filter(sueldo_normalizado__isnull=False)
+    if cursor:
+        ofertas = ofertas.filter(_filtro_despues_de(campos, decodificar_cursor(cursor, campos)))
+
+    # Pedimos uno extra para saber si existe un lote siguiente
+    lote = list(ofertas.order_by(*[f'-{campo}' for campo in campos])[:tamano + 1])
+    siguiente = None
+    if len(lote) > tamano:
+        lote = lote[:tamano]
+        siguiente = codificar_cursor(lote[-1], campos)
+    return lote, siguiente
+
+
+def serializar_tarjeta(oferta):
+    return {
+        'id': oferta.id,
+        'titulo': oferta.titulo,
+        'descripcion': oferta.descripcion or '',
+        'empleador': oferta.perfil_empleador.user.first_name,
+        'categoria': oferta.categoria.nombre if oferta.categoria else None,
+        'es_inclusion': oferta.es_inclusion,
+        'moneda': oferta.moneda,
+        'sueldo': oferta.sueldo,
+        'fecha_publicacion': oferta.fecha_publicacion.isoformat(),
+    }
+
+
+class DecisionInvalida(ValueError):
+    pass
+
+
+def aplicar_swipes(user, decisiones):
+    """
+    Guarda muchas decisiones de una vez: [{'oferta': id, 'accion': 'postular'|'descartar'}].
+    Usa bulk_create(ignore_conflicts=True) contra los unique_together, así
+    repetir un swipe (reintentos del cliente) no falla ni duplica filas.
+    Retorna {'postular': [ids], 'descartar': [ids]} con las ofertas válidas.
+    """
+    if not isinstance(decisiones, list) or len(decisiones) > DECISIONES_MAXIMAS:
+        raise DecisionInvalida(f'Se esperaba una lista de hasta {DECISIONES_MAXIMAS} decisiones.')
+
+    por_accion = {'postular': set(), 'descartar': set()}
+    for decision in decisiones:
+        try:
+            por_accion[decision['accion']].add(int(decision['oferta']))
+        except (KeyError, TypeError, ValueError):
+            raise DecisionInvalida(f'Decisión inválida: {decision!r}')
+    # Si la misma oferta viene con ambas acciones, gana postular
+    por_accion['descartar'] -= por_accion['postular']
+
+    # Solo ofertas activas (una consulta para todo el lote)
+    activas = set(OfertaDeEmpleo.objects.filter(
+        estado='activa', id__in=por_accion['postular'] | por_accion['descartar']
+    ).values_list('id', flat=True))
+    aplicadas = {accion: sorted(ids & activas) for accion, ids in por_accion.items()}
+
+    Solicitud.objects.bulk_create(
+        [Solicitud(oferta_id=id_oferta, User_candidato=user, estado='pendiente')
+         for id_oferta in aplicadas['postular']],
+        ignore_conflicts=True,
+    )
+    Descarte.objects.bulk_create(
+        [Descarte(oferta_id=id_oferta, User_candidato=user) for id_oferta in aplicadas['descartar']],
+        ignore_conflicts=True,
+    )
+    return aplicadas
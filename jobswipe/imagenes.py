@@ -0,0 +1,140 @@
+import hashlib
+import io
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+from .models import Perfil
+from .sesiones import invalidar_usuario
+from .tareas import encolar, tarea
+
+# -----------------------------------------------------------------
+# FOTOS DE PERFIL: VARIANTES REDIMENSIONADAS
+# -----------------------------------------------------------------
+# Al subir una foto se generan, fuera del request (cola de tareas),
+# versiones WebP y JPEG en varios anchos para usar con srcset. Todas
+# se re-codifican desde los píxeles, así no arrastran EXIF (GPS, modelo
+# del teléfono); el original también se reescribe sin metadatos.
+# La ruta de cada variante incluye un hash del archivo original: una
+# foto nueva tiene URLs nuevas y las viejas se pueden cachear "para siempre".
+
+PREFIJO_VARIANTES = 'fotos_perfil/variantes/'
+ANCHOS = (160, 480, 960)
+FORMATOS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+CACHE_VARIANTES = 60 * 60 * 24 * 365
+
+
+def _a_rgb(imagen):
+    # JPEG no tiene transparencia: el fondo transparente queda blanco
+    if imagen.mode in ('RGBA', 'LA') or (imagen.mode == 'P' and 'transparency' in imagen.info):
+        imagen = imagen.convert('RGBA')
+        fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.getchannel('A'))
+        return fondo
+    return imagen.convert('RGB')
+
+
+def _codificar(imagen, opciones):
+    buffer = io.BytesIO()
+    imagen.save(buffer, **opciones)
+    return ContentFile(buffer.getvalue())
+
+
+def _borrar(nombres):
+    for nombre in nombres:
+        default_storage.delete(nombre)
+
+
+def _borrar_variantes(variantes):
+    for por_ancho in (variantes.get(formato, {}) for formato in FORMATOS):
+        _borrar(por_ancho.values())
+
+
+@tarea('procesar_foto')
+def procesar_foto(perfil_id):
+    """
+    Limpia el original y genera las variantes de la foto actual del perfil.
+    Si mientras tanto se subió otra foto, no pisa nada (la nueva tiene su propia tarea).
+    """
+    perfil = Perfil.objects.filter(id=perfil_id).only('id', 'user_id', 'foto', 'foto_variantes').first()
+    if perfil is None or not perfil.foto:
+        return None
+    original = perfil.foto.name
+    anteriores = perfil.foto_variantes or {}
+    if anteriores.get('origen') == original:
+        return anteriores
+
+    with default_storage.open(original, 'rb') as archivo:
+        imagen = Image.open(archivo)
+        formato_original = imagen.format or 'JPEG'
+        imagen = ImageOps.exif_transpose(imagen)  # Aplica la rotación antes de perder el EXIF
+        imagen.load()
+
+    # Original sin metadatos (mismo formato; la rotación ya va en los píxeles).
+    # Se guarda con otro nombre (el original aún existe) y el original se
+    # borra solo cuando el perfil ya apunta a la copia: si algo falla a
+    # mitad, el usuario conserva su foto.
+    limpio = imagen if formato_original in ('PNG', 'WEBP', 'GIF') else _a_rgb(imagen)
+    guardados = []
+    try:
+        original_limpio = default_storage.save(original, _codificar(limpio, {'format': formato_original}))
+        guardados.append(original_limpio)
+
+        base = PREFIJO_VARIANTES + f'{perfil.id}/{hashlib.sha1(original_limpio.encode()).hexdigest()[:12]}/'
+        rgb = _a_rgb(imagen)
+        anchos = [ancho for ancho in ANCHOS if ancho <= rgb.width] or [rgb.width]
+        variantes = {'origen': original_limpio}
+        for formato, opciones in FORMATOS.items():
+            variantes[formato] = {}
+            for ancho in anchos:
+                copia = rgb.copy()
+                copia.thumbnail((ancho, ancho * 10), Image.Resampling.LANCZOS)
+                nombre = default_storage.save(f'{base}{ancho}.{formato}', _codificar(copia, opciones))
+                guardados.append(nombre)
+                variantes[formato][str(ancho)] = nombre
+
+        # Solo si la foto sigue siendo la misma que procesamos
+        actualizado = Perfil.objects.filter(id=perfil.id, foto=original).update(
+            foto=original_limpio, foto_variantes=variantes
+        )
+    except Exception:
+        _borrar(guardados)
+        raise
+
+    if actualizado:
+        invalidar_usuario(perfil.user_id)  # El .update() no pasa por las señales
+
+        def borrar_anteriores():
+            _borrar([original])
+            _borrar_variantes(anteriores)
+        transaction.on_commit(borrar_anteriores)
+    else:
+        _borrar(guardados)
+    return variantes
+
+
+def agendar_procesamiento(perfil):
+    # Una tarea por archivo subido (guardar el perfil de nuevo no la repite)
+    return encolar(
+        'procesar_foto', clave=f'foto:{perfil.id}:{perfil.foto.name}'[:200], perfil_id=perfil.id
+    )
+
+
+# --- Servir variantes ---
+def servir_media(request, path):
+    """
+    Sirve MEDIA_ROOT cuando Django sirve los archivos subidos (sin nginx/CDN).
+    Las variantes nunca cambian de contenido: caché de un año e immutable.
+    """
+    respuesta = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if path.startswith(PREFIJO_VARIANTES):
+        patch_cache_control(respuesta, public=True, max_age=CACHE_VARIANTES, immutable=True)
+    return respuesta
@@ -0,0 +1,200 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .api import invalidar_api
+from .busqueda import obtener_backend
+from .dashboard import invalidar_empleador
+from .forms import OfertaDeEmpleoForm
+from .models import CategoriaDeServicio, OfertaDeEmpleo, Solicitud
+from .relevancia import invalidar_ofertas
+from .sueldos import actualizar_sueldo_normalizado, tasa_dolar
+
+# -----------------------------------------------------------------
+# IMPORTACIÓN MASIVA DE OFERTAS (CSV / JSONL)
+# -----------------------------------------------------------------
+# Cada fila se valida con OfertaDeEmpleoForm (las mismas reglas que
+# crear_oferta_view) y las válidas se insertan con bulk_create, por
+# tramos de TAMANO_TRAMO filas y una transacción por tramo: el archivo
+# se lee de a poco y un error a mitad no deshace lo ya importado.
+# bulk_create no dispara señales: lo que hacen los receivers de
+# signals.py (sueldo normalizado, índice de búsqueda, cachés) se hace
+# aquí por tramo.
+
+TAMANO_TRAMO = 500
+COLUMNAS = ['titulo', 'descripcion', 'categoria', 'es_inclusion', 'moneda', 'sueldo']
+
+
+class ArchivoInvalido(ValueError):
+    pass
+
+
+class _CategoriaEnMemoria(forms.ModelChoiceField):
+    """
+    Categoría por id o por nombre, resuelta contra las categorías ya
+    cargadas (sin una consulta por fila).
+    """
+
+    def __init__(self, categorias, **kwargs):
+        super().__init__(queryset=CategoriaDeServicio.objects.none(), **kwargs)
+        self.categorias = {}
+        for categoria in categorias:
+            self.categorias[str(categoria.id)] = categoria
+            self.categorias[categoria.nombre.strip().lower()] = categoria
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        categoria = self.categorias.get(str(value).strip().lower())
+        if categoria is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return categoria
+
+
+class FilaOfertaForm(OfertaDeEmpleoForm):
+
+    def __init__(self, *args, categorias=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        original = self.fields['categoria']
+        self.fields['categoria'] = _CategoriaEnMemoria(
+            categorias, required=original.required, label=original.label
+        )
+
+
+# --- Lectura del archivo ---
+def leer_filas(archivo, formato):
+    """
+    Genera (número de línea, dict) desde un archivo binario abierto, sin
+    cargarlo entero. formato: 'csv' (con encabezado) o 'jsonl'.
+    """
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    try:
+        if formato == 'csv':
+            lector = csv.DictReader(texto)
+            if not lector.fieldnames or 'titulo' not in lector.fieldnames:
+                raise ArchivoInvalido('El CSV debe tener encabezado con al menos la columna "titulo".')
+            for fila in lector:
+                yield lector.line_num, fila
+        elif formato == 'jsonl':
+            for numero, linea in enumerate(texto, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except ValueError:
+                    raise ArchivoInvalido(f'Línea {numero}: JSON inválido.')
+                if not isinstance(fila, dict):
+                    raise ArchivoInvalido(f'Línea {numero}: se esperaba un objeto JSON.')
+                yield numero, fila
+        else:
+            raise ArchivoInvalido('Formato no soportado (usa csv o jsonl).')
+    except UnicodeDecodeError:
+        raise ArchivoInvalido('El archivo debe estar en UTF-8.')
+    finally:
+        texto.detach()  # No cerrar el archivo subido: es de quien lo abrió
+
+
+def formato_de(nombre):
+    return 'jsonl' if nombre.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+# --- Importación ---
+def _insertar_tramo(perfil, ofertas):
+    with transaction.atomic():
+        creadas = OfertaDeEmpleo.objects.bulk_create(ofertas)
+        backend = obtener_backend()
+        for oferta in creadas:
+            if oferta.pk:  # MySQL no devuelve los ids de bulk_create
+                backend.indexar(oferta)
+    invalidar_api()
+    invalidar_ofertas()
+    invalidar_empleador(perfil.id)
+    return len(creadas)
+
+
+def importar_ofertas(perfil, filas, tamano=TAMANO_TRAMO, max_filas=None):
+    """
+    Importa las filas (de `leer_filas`) como ofertas de `perfil`.
+    Retorna {'creadas': n, 'errores': [(línea, {campo: [mensajes]}), ...]}.
+    Lanza ArchivoInvalido si el archivo no se puede leer o supera `max_filas`.
+    """
+    categorias = list(CategoriaDeServicio.objects.all())
+    tasa = tasa_dolar()
+    resultado = {'creadas': 0, 'errores': []}
+    filas = iter(filas)
+    leidas = 0
+    while True:
+        tramo = list(islice(filas, tamano))
+        if not tramo:
+            break
+        leidas += len(tramo)
+        if max_filas is not None and leidas > max_filas:
+            raise ArchivoInvalido(
+                f'El archivo supera las {max_filas} filas; {resultado["creadas"]} ya quedaron importadas.'
+            )
+        ofertas = []
+        for numero, fila in tramo:
+            datos = {campo: fila.get(campo) for campo in COLUMNAS if fila.get(campo) is not None}
+            if isinstance(datos.get('es_inclusion'), str):
+                # CheckboxInput toma cualquier texto como verdadero
+                datos['es_inclusion'] = datos['es_inclusion'].strip().lower() in ('1', 'true', 'si', 'sí', 'x')
+            form = FilaOfertaForm(datos, categorias=categorias)
+            if not form.is_valid():
+                resultado['errores'].append((numero, form.errors.get_json_data()))
+                continue
+            oferta = form.save(commit=False)
+            oferta.perfil_empleador = perfil
+            actualizar_sueldo_normalizado(oferta, tasa)
+            ofertas.append(oferta)
+        if ofertas:
+            resultado['creadas'] += _insertar_tramo(perfil, ofertas)
+    return resultado
+
+
+# -----------------------------------------------------------------
+# EXPORTACIÓN DE POSTULANTES (CSV EN STREAMING)
+# -----------------------------------------------------------------
+
+COLUMNAS_POSTULANTES = [
+    'solicitud', 'usuario', 'nombre', 'apellido', 'email', 'estado', 'fecha_postulacion', 'habilidades',
+]
+
+
+class _Eco:
+    # csv.writer escribe en un "archivo" que solo devuelve la línea
+    def write(self, valor):
+        return valor
+
+
+def _celda(valor):
+    # Texto del candidato que empieza con = + - @ sería una fórmula en Excel
+    if isinstance(valor, str) and valor[:1] in ('=', '+', '-', '@'):
+        return "'" + valor
+    return valor
+
+
+def filas_postulantes(oferta, tamano=2000):
+    """
+    Genera las líneas CSV de las postulaciones a `oferta`. iterator()
+    trae las filas por tramos (cursor de servidor en Postgres): la
+    memoria no crece con el número de postulantes.
+    """
+    escritor = csv.writer(_Eco())
+    yield '\ufeff' + escritor.writerow(COLUMNAS_POSTULANTES)  # BOM: Excel lo abre como UTF-8
+    solicitudes = (
+        Solicitud.objects.filter(oferta=oferta)
+        .order_by('id')
+        .values_list(
+            'id', 'User_candidato__username', 'User_candidato__first_name', 'User_candidato__last_name',
+            'User_candidato__email', 'estado', 'fecha_postulacion', 'User_candidato__perfil__habilidades',
+        )
+    )
+    for fila in solicitudes.iterator(chunk_size=tamano):
+        fila = [_celda(valor) for valor in fila]
+        fila[6] = fila[6].isoformat()
+        yield escritor.writerow(fila)
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+
+import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+
+from .metricas import medir_http
+
+# -----------------------------------------------------------------
+# INDICADORES ECONÓMICOS (mindicador.cl)
+# -----------------------------------------------------------------
+# La vista nunca habla con la API externa: solo lee la caché.
+# Cuando el valor está "viejo" (pasó el TTL) se sigue sirviendo
+# mientras un hilo en segundo plano lo refresca (stale-while-revalidate).
+# El comando `refrescar_indicadores` mantiene la caché siempre tibia.
+
+CLAVE_DATOS = 'indicadores:datos'
+CLAVE_BLOQUEO = 'indicadores:refrescando'
+CLAVE_FALLOS = 'indicadores:circuito:fallos'
+CLAVE_ABIERTO_HASTA = 'indicadores:circuito:abierto_hasta'
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+# --- Sesión HTTP compartida (pool de conexiones) ---
+_sesion = None
+_sesion_lock = threading.Lock()
+
+
+def obtener_sesion():
+    """
+    Devuelve una sesión de requests reutilizable (keep-alive + pool).
+    """
+    global _sesion
+    if _sesion is None:
+        with _sesion_lock:
+            if _sesion is None:
+                sesion = requests.Session()
+                adaptador = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=_config('INDICADORES_POOL_MAXSIZE', 10),
+                    max_retries=0,  # Los reintentos los decide el circuito, no urllib3
+                )
+                sesion.mount('http://', adaptador)
+                sesion.mount('https://', adaptador)
+                _sesion = sesion
+    return _sesion
+
+
+# --- Circuit breaker (estado compartido en la caché) ---
+class CircuitoAbierto(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Corta las llamadas a la API tras `umbral` fallos seguidos
+    durante `enfriamiento` segundos. El estado vive en la caché
+    para que todos los workers de gunicorn lo compartan.
+    """
+
+    def __init__(self, umbral=None, enfriamiento=None):
+        self.umbral = umbral or _config('INDICADORES_CIRCUITO_UMBRAL', 3)
+        self.enfriamiento = enfriamiento or _config('INDICADORES_CIRCUITO_ENFRIAMIENTO', 60)
+
+    def esta_abierto(self):
+        abierto_hasta = cache.get(CLAVE_ABIERTO_HASTA)
+        return abierto_hasta is not None and abierto_hasta > time.time()
+
+    def registrar_exito(self):
+        cache.delete_many([CLAVE_FALLOS, CLAVE_ABIERTO_HASTA])
+
+    def registrar_fallo(self):
+        if cache.add(CLAVE_FALLOS, 1, timeout=self.enfriamiento * 10):
+            fallos = 1
+        else:
+            try:
+                fallos = cache.incr(CLAVE_FALLOS)
+            except ValueError:  # La clave expiró entre add e incr
+                fallos = 1
+                cache.set(CLAVE_FALLOS, fallos, timeout=self.enfriamiento * 10)
+        if fallos >= self.umbral:
+            cache.set(CLAVE_ABIERTO_HASTA, time.time() + self.enfriamiento, timeout=self.enfriamiento)
+            cache.delete(CLAVE_FALLOS)
+
+    def llamar(self, funcion, *args, **kwargs):
+        if self.esta_abierto():
+            raise CircuitoAbierto('La API de indicadores está en enfriamiento.')
+        try:
+            resultado = funcion(*args, **kwargs)
+        except Exception:
+            self.registrar_fallo()
+            raise
+        self.registrar_exito()
+        return resultado
+
+
+circuito = CircuitBreaker()
+
+
+# --- Consulta a la API ---
+def _consultar_api():
+    url = _config('INDICADORES_API_URL', 'https://mindicador.cl/api')
+    timeout = _config('INDICADORES_TIMEOUT', (2, 3))  # (conexión, lectura)
+    with medir_http('mindicador'):
+        response = obtener_sesion().get(url, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return {
+        'uf': data['uf']['valor'],
+        'dolar': data['dolar']['valor'],
+        'euro': data['euro']['valor']
+    }
+
+
+def refrescar_indicadores():
+    """
+    Consulta la API (respetando el circuito) y guarda el resultado en la caché.
+    Retorna los indicadores nuevos o None si la consulta falló.
+    """
+    try:
+        valores = circuito.llamar(_consultar_api)
+    except Exception:
+        return None
+    _guardar(valores)
+    return valores
+
+
+def _guardar(valores):
+    cache.set(
+        CLAVE_DATOS,
+        {'valores': valores, 'obtenido': time.time()},
+        timeout=_config('INDICADORES_STALE_TTL', 60 * 60 * 24),
+    )
+    # Si el dólar se movió, los sueldos en USD se recalculan en la cola de tareas
+    from .sueldos import agendar_recalculo
+    agendar_recalculo(float(valores['dolar']))
+
+
+def _refrescar_en_segundo_plano():
+    # `cache.add` funciona como candado: solo un hilo (o worker) refresca a la vez.
+    if not cache.add(CLAVE_BLOQUEO, True, timeout=_config('INDICADORES_TIMEOUT_BLOQUEO', 30)):
+        return
+
+    def tarea():
+        # Hilo fuera del ciclo del request: la conexión a la base que abra
+        # (agendar_recalculo encola una Tarea) se cierra aquí, como haría
+        # Django al terminar un request; si no, queda abierta con el hilo.
+        close_old_connections()
+        try:
+            refrescar_indicadores()
+        finally:
+            cache.delete(CLAVE_BLOQUEO)
+            connections.close_all()
+
+    if _config('INDICADORES_REFRESCO_EN_SEGUNDO_PLANO', True):
+        threading.Thread(target=tarea, daemon=True, name='refresco-indicadores').start()
+    else:
+        cache.delete(CLAVE_BLOQUEO)
+
+
+def obtener_indicadores_economicos():
+    """
+    Devuelve la UF, el Dólar y el Euro desde la caché, sin esperar a la red.
+    Si el dato está vencido (o no existe) se agenda un refresco en segundo plano.
+    """
+    datos = cache.get(CLAVE_DATOS)
+    if datos is None:
+        _refrescar_en_segundo_plano()
+        return None
+
+    if time.time() - datos['obtenido'] > _config('INDICADORES_TTL', 60 * 10):
+        _refrescar_en_segundo_plano()
+
+    return datos['valores']
+
+
+# --- Versión async (vistas_async.py) ---
+async def obtener_indicadores_async(espera=0):
+    """
+    Igual que obtener_indicadores_economicos, pero si la caché está vacía
+    espera hasta `espera` segundos a la API: corre junto con el trabajo de
+    la vista (asyncio.gather), así el primer request tras un deploy o un
+    reinicio de la caché ya muestra los indicadores sin sumar latencia.
+    """
+    datos = await cache.aget(CLAVE_DATOS)
+    if datos is not None:
+        if time.time() - datos['obtenido'] > _config('INDICADORES_TTL', 60 * 10):
+            await sync_to_async(_refrescar_en_segundo_plano)()
+        return datos['valores']
+
+    if not espera or not await cache.aadd(CLAVE_BLOQUEO, True, timeout=_config('INDICADORES_TIMEOUT_BLOQUEO', 30)):
+        await sync_to_async(_refrescar_en_segundo_plano)()
+        return None
+    try:
+        # La llamada HTTP en un hilo aparte (no ocupa el hilo de la base del request)
+        consulta = sync_to_async(circuito.llamar, thread_sensitive=False)(_consultar_api)
+        valores = await asyncio.wait_for(consulta, timeout=espera)
+    except Exception:  # Timeout, circuito abierto o error de la API: la página sale sin indicadores
+        return None
+    finally:
+        await cache.adelete(CLAVE_BLOQUEO)
+    await sync_to_async(_guardar)(valores)
+    return valores
@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobswipe.benchmark import (
+    RUTA_BASELINE, SinDatos, cargar_baseline, comparar, comparar_conexiones, comparar_servidores, correr_cliente,
+    correr_http, guardar_baseline,
+)
+
+ESCENARIOS = ['home', 'postular', 'matches', 'chat', 'api_ofertas']
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide latencia (p50/p95/p99), consultas por request y RPS de los flujos principales '
+        'y compara contra la línea base. Usar con datos de `generar_datos`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escenarios', nargs='+', choices=ESCENARIOS, default=ESCENARIOS)
+        parser.add_argument('--iteraciones', type=int, default=200)
+        parser.add_argument('--calentamiento', type=int, default=5)
+        parser.add_argument('--url', help='Servidor a medir (modo HTTP), p. ej. http://127.0.0.1:8000.')
+        parser.add_argument(
+            '--url-asgi',
+            help='Servidor ASGI (VISTAS_ASYNC=True) a comparar con --url (WSGI). Para simular una '
+                 'base lenta, ambos detrás de `proxy_lento`; ver gunicorn.conf.py.'
+        )
+        parser.add_argument('--concurrencia', type=int, default=4, help='Hilos en modo HTTP.')
+        parser.add_argument('--prefijo', default='bench', help='Usuarios generados con este prefijo ("" = cualquiera).')
+        parser.add_argument('--baseline', type=Path, default=RUTA_BASELINE)
+        parser.add_argument('--guardar-baseline', action='store_true', help='Guarda esta corrida como línea base.')
+        parser.add_argument('--tolerancia', type=float, default=0.2, help='Empeoramiento aceptado (0.2 = 20%%).')
+        parser.add_argument('--estricto', action='store_true', help='Falla (código de salida 1) si hay regresiones.')
+        parser.add_argument('--json', action='store_true', help='Imprime los resultados en JSON.')
+        parser.add_argument('--conexiones', action='store_true',
+                            help='Mide además abrir una conexión por request vs. reutilizarla (CONN_MAX_AGE/pool).')
+
+    def handle(self, *args, **options):
+        modo = 'http' if options['url'] else 'cliente'
+        if options['url_asgi'] and not options['url']:
+            raise CommandError('--url-asgi se compara contra --url (el servidor WSGI).')
+        try:
+            if options['url_asgi']:
+                modo = 'wsgi_vs_asgi'
+                resultados = comparar_servidores(
+                    {'wsgi': options['url'], 'asgi': options['url_asgi']}, options['escenarios'],
+                    options['iteraciones'], concurrencia=options['concurrencia'],
+                    calentamiento=options['calentamiento'], prefijo=options['prefijo'],
+                )
+            elif modo == 'http':
+                resultados = correr_http(
+                    options['url'], options['escenarios'], options['iteraciones'],
+                    concurrencia=options['concurrencia'], calentamiento=options['calentamiento'],
+                    prefijo=options['prefijo'],
+                )
+            else:
+                resultados = correr_cliente(
+                    options['escenarios'], options['iteraciones'],
+                    calentamiento=options['calentamiento'], prefijo=options['prefijo'],
+                )
+        except SinDatos as error:
+            raise CommandError(str(error))
+        if options['conexiones']:
+            resultados += comparar_conexiones(options['iteraciones'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+        else:
+            self._tabla(resultados)
+            if modo == 'wsgi_vs_asgi':
+                self._razones(resultados)
+
+        if options['guardar_baseline']:
+            guardar_baseline(resultados, modo, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f'Línea base guardada en {options["baseline"]}.'))
+            return
+
+        baseline = cargar_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write('Sin línea base (usa --guardar-baseline para crearla).')
+            return
+        modo_base, baseline = baseline
+        if modo_base != modo:
+            mensaje = f'La línea base es del modo "{modo_base}" y esta corrida del modo "{modo}": no se comparan.'
+            if options['estricto']:
+                raise CommandError(mensaje)
+            self.stdout.write(self.style.WARNING(mensaje))
+            return
+        regresiones = comparar(resultados, baseline, options['tolerancia'])
+        if not regresiones:
+            self.stdout.write(self.style.SUCCESS('Sin regresiones respecto de la línea base.'))
+            return
+        for regresion in regresiones:
+            self.stdout.write(self.style.WARNING(f'Regresión: {regresion}'))
+        if options['estricto']:
+            raise CommandError(f'{len(regresiones)} regresiones respecto de la línea base.')
+
+    def _tabla(self, resultados):
+        columnas = ['escenario', 'requests', 'errores', 'p50_ms', 'p95_ms', 'p99_ms', 'consultas', 'rps']
+        self.stdout.write('  '.join(f'{c:>11}' for c in columnas))
+        for fila in resultados:
+            self.stdout.write('  '.join(f'{"-" if fila[c] is None else fila[c]!s:>11}' for c in columnas))
+
+    def _razones(self, resultados):
+        rps = {fila['escenario']: fila['rps'] for fila in resultados}
+        for escenario, valor in rps.items():
+            if escenario.startswith('asgi:') and valor and rps.get('wsgi:' + escenario[5:]):
+                self.stdout.write(f'{escenario[5:]}: ASGI {valor / rps["wsgi:" + escenario[5:]]:.2f}x el RPS de WSGI')
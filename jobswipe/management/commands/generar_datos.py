@@ -0,0 +1,175 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jobswipe.api import invalidar_api
+from jobswipe.busqueda import obtener_backend
+from jobswipe.chat import reconstruir_resumenes
+from jobswipe.models import CategoriaDeServicio, Mensaje, OfertaDeEmpleo, Perfil, Solicitud
+from jobswipe.relevancia import invalidar_ofertas
+from jobswipe.sueldos import en_clp, tasa_dolar
+
+CATEGORIAS = ['Tecnología', 'Gastronomía', 'Retail', 'Salud', 'Educación', 'Logística', 'Construcción', 'Finanzas']
+CARGOS = {
+    'Tecnología': ['Desarrollador backend', 'Desarrolladora frontend', 'Analista QA', 'DevOps', 'Soporte TI'],
+    'Gastronomía': ['Cocinero', 'Ayudante de cocina', 'Garzón', 'Barista', 'Pastelera'],
+    'Retail': ['Vendedor', 'Cajera', 'Reponedor', 'Jefe de tienda'],
+    'Salud': ['TENS', 'Enfermera', 'Recepcionista clínica', 'Auxiliar de farmacia'],
+    'Educación': ['Profesor de inglés', 'Asistente de aula', 'Tutora de matemáticas'],
+    'Logística': ['Bodeguero', 'Conductor clase B', 'Operador de grúa horquilla', 'Despachador'],
+    'Construcción': ['Maestro albañil', 'Jornal', 'Electricista', 'Prevencionista de riesgos'],
+    'Finanzas': ['Analista contable', 'Asistente de cobranza', 'Ejecutiva de cuentas'],
+}
+HABILIDADES = [
+    'Python', 'Django', 'JavaScript', 'React', 'SQL', 'Excel', 'atención al cliente', 'inglés',
+    'cocina', 'repostería', 'manejo de caja', 'licencia clase B', 'trabajo en equipo', 'primeros auxilios',
+    'contabilidad', 'ventas', 'bodega', 'electricidad', 'Node.js', 'C++',
+]
+FRASES = [
+    'Buscamos una persona proactiva y responsable.',
+    'Jornada completa de lunes a viernes.',
+    'Se valora experiencia previa en cargos similares.',
+    'Excelente clima laboral y posibilidades de crecimiento.',
+    'Turnos rotativos con colación incluida.',
+    'Incorporación inmediata.',
+]
+MENSAJES = [
+    'Hola, gracias por el match.', '¿Podemos coordinar una entrevista?', 'Claro, ¿qué día te acomoda?',
+    'El martes a las 10 está bien.', 'Perfecto, te envío la dirección.', '¡Nos vemos!',
+]
+
+
+class Command(BaseCommand):
+    help = 'Genera datos sintéticos (perfiles, ofertas, postulaciones y mensajes) para pruebas de carga.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidatos', type=int, default=1000)
+        parser.add_argument('--empleadores', type=int, default=100)
+        parser.add_argument('--ofertas-por-empleador', type=int, default=10)
+        parser.add_argument('--postulaciones-por-candidato', type=int, default=20)
+        parser.add_argument('--mensajes-por-match', type=int, default=8)
+        parser.add_argument('--tasa-match', type=float, default=0.2, help='Fracción de postulaciones aceptadas.')
+        parser.add_argument('--prefijo', default='bench', help='Prefijo de los usernames generados.')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--limpiar', action='store_true', help='Borra antes los usuarios con el prefijo.')
+
+    def handle(self, *args, **options):
+        azar = random.Random(options['semilla'])
+        prefijo = options['prefijo']
+        if options['limpiar']:
+            borrados, _ = User.objects.filter(username__startswith=f'{prefijo}_').delete()
+            self.stdout.write(f'{borrados} filas borradas.')
+
+        with transaction.atomic():
+            categorias = self._categorias()
+            empleadores = self._usuarios(f'{prefijo}_empresa', options['empleadores'], 'empleador', azar)
+            candidatos = self._usuarios(f'{prefijo}_cand', options['candidatos'], 'candidato', azar)
+            ofertas = self._ofertas(empleadores, categorias, options['ofertas_por_empleador'], azar)
+            solicitudes = self._solicitudes(
+                candidatos, ofertas, options['postulaciones_por_candidato'], options['tasa_match'], azar
+            )
+            mensajes = self._mensajes(solicitudes, options['mensajes_por_match'], azar)
+
+        # bulk_create no dispara señales: índices y cachés se actualizan al final
+        self.stdout.write('Reindexando búsqueda y resúmenes de chat...')
+        obtener_backend().reindexar_todo()
+        reconstruir_resumenes(Solicitud.objects.filter(User_candidato__username__startswith=f'{prefijo}_'))
+        invalidar_api()
+        invalidar_ofertas()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(empleadores)} empleadores, {len(candidatos)} candidatos, {len(ofertas)} ofertas, '
+            f'{len(solicitudes)} postulaciones y {mensajes} mensajes generados.'
+        ))
+
+    def _categorias(self):
+        existentes = {c.nombre: c for c in CategoriaDeServicio.objects.filter(nombre__in=CATEGORIAS)}
+        nuevas = [CategoriaDeServicio(nombre=n) for n in CATEGORIAS if n not in existentes]
+        CategoriaDeServicio.objects.bulk_create(nuevas)
+        return list(CategoriaDeServicio.objects.filter(nombre__in=CATEGORIAS))
+
+    def _usuarios(self, base, cantidad, tipo, azar):
+        # Un solo hash para todos: hashear miles de contraseñas tomaría minutos
+        clave = make_password(base.split('_')[0])
+        inicio = User.objects.filter(username__startswith=f'{base}_').count()
+        usuarios = User.objects.bulk_create([
+            User(
+                username=f'{base}_{i}', password=clave, email=f'{base}_{i}@example.com',
+                first_name=azar.choice(['Ana', 'Benjamín', 'Camila', 'Diego', 'Fernanda', 'Matías', 'Sofía']),
+                last_name=azar.choice(['González', 'Muñoz', 'Rojas', 'Díaz', 'Pérez', 'Soto']),
+            )
+            for i in range(inicio, inicio + cantidad)
+        ])
+        usuarios = list(User.objects.filter(username__in=[u.username for u in usuarios]))
+        Perfil.objects.bulk_create([
+            Perfil(
+                user=u, tipo=tipo, es_pcd=(tipo == 'candidato' and azar.random() < 0.1),
+                habilidades=', '.join(azar.sample(HABILIDADES, 4)) if tipo == 'candidato' else None,
+                descripcion_profesional=azar.choice(FRASES) if tipo == 'candidato' else None,
+            )
+            for u in usuarios
+        ], batch_size=1000)
+        return usuarios
+
+    def _ofertas(self, empleadores, categorias, por_empleador, azar):
+        perfiles = dict(Perfil.objects.filter(user__in=empleadores).values_list('user_id', 'id'))
+        ahora = timezone.now()
+        tasa = tasa_dolar()
+        ofertas = []
+        for empleador in empleadores:
+            for _ in range(por_empleador):
+                categoria = azar.choice(categorias)
+                ofertas.append(OfertaDeEmpleo(
+                    perfil_empleador_id=perfiles[empleador.id],
+                    titulo=azar.choice(CARGOS[categoria.nombre]),
+                    descripcion=' '.join(azar.sample(FRASES, 3)) + ' Requisitos: ' + ', '.join(azar.sample(HABILIDADES, 3)),
+                    categoria=categoria,
+                    estado=azar.choices(['activa', 'pausada', 'cerrada'], weights=[85, 5, 10])[0],
+                    es_inclusion=azar.random() < 0.15,
+                    moneda=azar.choices(['CLP', 'USD'], weights=[9, 1])[0],
+                    sueldo=azar.choice([None, 500000, 650000, 800000, 1200000, 1800000]),
+                ))
+                # bulk_create no pasa por pre_save (signals.normalizar_sueldo)
+                ofertas[-1].sueldo_normalizado = en_clp(ofertas[-1].sueldo, ofertas[-1].moneda, tasa)
+        OfertaDeEmpleo.objects.bulk_create(ofertas, batch_size=1000)
+        # MySQL no devuelve los ids de bulk_create: se vuelven a leer (los empleadores son nuevos)
+        ofertas = list(OfertaDeEmpleo.objects.filter(perfil_empleador_id__in=perfiles.values()).order_by('id'))
+        # fecha_publicacion es auto_now_add: se reparte en los últimos 90 días
+        for oferta in ofertas:
+            oferta.fecha_publicacion = ahora - timedelta(minutes=azar.randint(0, 60 * 24 * 90))
+        OfertaDeEmpleo.objects.bulk_update(ofertas, ['fecha_publicacion'], batch_size=1000)
+        return ofertas
+
+    def _solicitudes(self, candidatos, ofertas, por_candidato, tasa_match, azar):
+        activas = [o for o in ofertas if o.estado == 'activa']
+        solicitudes = []
+        for candidato in candidatos:
+            for oferta in azar.sample(activas, min(por_candidato, len(activas))):
+                estado = 'aceptada' if azar.random() < tasa_match else azar.choice(['pendiente', 'rechazada'])
+                solicitudes.append(Solicitud(oferta=oferta, User_candidato=candidato, estado=estado))
+        Solicitud.objects.bulk_create(solicitudes, batch_size=1000, ignore_conflicts=True)
+        return list(
+            Solicitud.objects.filter(User_candidato__in=candidatos)
+            .select_related('oferta__perfil_empleador').only('id', 'estado', 'User_candidato_id',
+                                                             'oferta__perfil_empleador__user_id')
+        )
+
+    def _mensajes(self, solicitudes, por_match, azar):
+        mensajes = []
+        for solicitud in solicitudes:
+            if solicitud.estado != 'aceptada':
+                continue
+            empleador = solicitud.oferta.perfil_empleador.user_id
+            for i in range(azar.randint(0, por_match)):
+                origen, destino = (empleador, solicitud.User_candidato_id)[::1 if i % 2 == 0 else -1]
+                mensajes.append(Mensaje(
+                    solicitud_id=solicitud.id, User_origen_id=origen, User_destino_id=destino,
+                    contenido=MENSAJES[i % len(MENSAJES)], leido=azar.random() < 0.7,
+                ))
+        Mensaje.objects.bulk_create(mensajes, batch_size=2000)
+        return len(mensajes)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobswipe.importacion import TAMANO_TRAMO, ArchivoInvalido, formato_de, importar_ofertas, leer_filas
+from jobswipe.models import Perfil
+
+
+class Command(BaseCommand):
+    help = 'Importa ofertas de un empleador desde un CSV o JSONL (sin el límite de filas de la web).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usuario', help='Username del empleador.')
+        parser.add_argument('archivo')
+        parser.add_argument('--formato', choices=['csv', 'jsonl'], help='Por defecto, según la extensión.')
+        parser.add_argument('--tramo', type=int, default=TAMANO_TRAMO, help='Filas por transacción.')
+
+    def handle(self, *args, **options):
+        perfil = Perfil.objects.filter(user__username=options['usuario'], tipo='empleador').first()
+        if perfil is None:
+            raise CommandError(f'No existe el empleador "{options["usuario"]}".')
+
+        formato = options['formato'] or formato_de(options['archivo'])
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                resultado = importar_ofertas(perfil, leer_filas(archivo, formato), tamano=max(options['tramo'], 1))
+        except (OSError, ArchivoInvalido) as error:
+            raise CommandError(str(error))
+
+        for linea, campos in resultado['errores']:
+            detalle = '; '.join(f'{c}: {" ".join(m["message"] for m in ms)}' for c, ms in campos.items())
+            self.stderr.write(f'Línea {linea}: {detalle}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado["creadas"]} ofertas importadas, {len(resultado["errores"])} filas con errores.'
+        ))
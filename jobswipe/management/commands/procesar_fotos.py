@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from jobswipe.imagenes import procesar_foto
+from jobswipe.models import Perfil
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes (WebP/JPEG) de las fotos de perfil que aún no las tienen.'
+
+    def handle(self, *args, **options):
+        procesadas = 0
+        perfiles = Perfil.objects.exclude(foto='').exclude(foto__isnull=True).only('id', 'foto', 'foto_variantes')
+        for perfil in perfiles.iterator(chunk_size=200):
+            if (perfil.foto_variantes or {}).get('origen') != perfil.foto.name:
+                procesar_foto(perfil.id)
+                procesadas += 1
+        self.stdout.write(self.style.SUCCESS(f'{procesadas} fotos procesadas.'))
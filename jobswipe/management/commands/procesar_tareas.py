@@ -0,0 +1,71 @@
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobswipe.tareas import TAMANO_LOTE, ejecutar, purgar_completadas, reclamar_lote
+
+
+def ejecutar_en_worker(tarea_id):
+    # Cada hilo/proceso del pool tiene su propia conexión: se cierra si quedó vieja o rota
+    try:
+        return ejecutar(tarea_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Worker de la cola de tareas: reclama tareas listas y las ejecuta en un pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Hilos (o procesos) del pool.')
+        parser.add_argument(
+            '--procesos', action='store_true',
+            help='Pool de procesos en vez de hilos (para tareas que usan mucha CPU).'
+        )
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Tareas reclamadas por vuelta.')
+        parser.add_argument('--intervalo', type=float, default=2, help='Segundos de espera con la cola vacía.')
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola y termina.')
+        parser.add_argument(
+            '--purgar-dias', type=int, default=7,
+            help='Borra las tareas completadas hace más de N días (0 = no borrar).'
+        )
+
+    def _pool(self, options):
+        if options['procesos']:
+            # spawn: cada proceso arranca Django desde cero (sin conexiones heredadas)
+            connections.close_all()
+            return ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        return ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='tareas')
+
+    def handle(self, *args, **options):
+        totales = Counter()
+        ultima_purga = 0
+        try:
+            with self._pool(options) as pool:
+                while True:
+                    if options['purgar_dias'] and time.time() - ultima_purga > 60 * 60:
+                        purgar_completadas(options['purgar_dias'])
+                        ultima_purga = time.time()
+
+                    ids = reclamar_lote(options['lote'])
+                    if ids:
+                        totales.update(pool.map(ejecutar_en_worker, ids))
+                        continue
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            # Las tareas reclamadas y no terminadas se retoman al vencer su bloqueo
+            pass
+
+        resumen = ', '.join(f'{estado}: {n}' for estado, n in sorted(totales.items())) or 'sin tareas'
+        self.stdout.write(self.style.SUCCESS(f'Tareas procesadas ({resumen}).'))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobswipe.benchmark import ProxyLento
+
+
+class Command(BaseCommand):
+    help = (
+        'Proxy TCP que agrega latencia a cada respuesta (p. ej. de la base) para medir '
+        'WSGI vs. ASGI con un upstream lento: apuntar DATABASE_URL de ambos servidores al proxy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', required=True, help='host:puerto real, p. ej. localhost:5432.')
+        parser.add_argument('--puerto', type=int, default=6543, help='Puerto local del proxy.')
+        parser.add_argument('--demora-ms', type=float, default=20)
+
+    def handle(self, *args, **options):
+        host, _, puerto = options['destino'].rpartition(':')
+        if not host or not puerto.isdigit():
+            raise CommandError('--destino debe ser host:puerto.')
+
+        proxy = ProxyLento(host, int(puerto), options['demora_ms'] / 1000, puerto=options['puerto'])
+        try:
+            proxy.iniciar()
+        except OSError as e:
+            raise CommandError(f'No se pudo abrir el puerto {options["puerto"]}: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Proxy en 127.0.0.1:{proxy.puerto} -> {options["destino"]} (+{options["demora_ms"]} ms). Ctrl+C para salir.'
+        ))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            proxy.detener()
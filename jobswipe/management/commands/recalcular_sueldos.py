@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from jobswipe.sueldos import TAMANO_LOTE, recalcular_sueldos, tasa_cambio_significativo, tasa_dolar
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el sueldo en pesos (sueldo_normalizado) de las ofertas en USD, por lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasa', type=float, help='Dólar a aplicar (por defecto, el de la caché de indicadores).')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Ofertas por UPDATE.')
+        parser.add_argument(
+            '--si-cambio', action='store_true',
+            help='Solo si el dólar cambió más que SUELDOS_UMBRAL_CAMBIO desde el último recálculo.'
+        )
+
+    def handle(self, *args, **options):
+        tasa = options['tasa'] or tasa_dolar()
+        if options['si_cambio'] and not tasa_cambio_significativo(tasa):
+            self.stdout.write(f'El dólar ({tasa}) no cambió lo suficiente; nada que recalcular.')
+            return
+        actualizadas = recalcular_sueldos(tasa, tamano=max(options['lote'], 1))
+        self.stdout.write(self.style.SUCCESS(f'{actualizadas} ofertas en USD recalculadas con dólar {tasa}.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from jobswipe.chat import reconstruir_resumenes
+from jobswipe.tareas import encolar
+from jobswipe.models import Solicitud
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los no leídos y el último mensaje de cada match desde la tabla de mensajes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Solicitudes por UPDATE.')
+        parser.add_argument(
+            '--encolar', action='store_true',
+            help='En vez de hacerlo ahora, encola una tarea por lote para los workers.'
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        maximo = Solicitud.objects.aggregate(maximo=Max('id'))['maximo'] or 0
+        total = 0
+        # Lotes por rango de id para no bloquear toda la tabla en un solo UPDATE
+        for desde in range(0, maximo + 1, lote):
+            if options['encolar']:
+                encolar('reconstruir_resumenes_chat', desde_id=desde, hasta_id=desde + lote)
+                total += 1
+                continue
+            total += reconstruir_resumenes(
+                Solicitud.objects.filter(id__gt=desde, id__lte=desde + lote)
+            )
+        if options['encolar']:
+            self.stdout.write(self.style.SUCCESS(f'{total} tareas encoladas.'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'{total} resúmenes reconstruidos.'))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobswipe.indicadores import refrescar_indicadores
+
+
+class Command(BaseCommand):
+    help = 'Refresca la caché de indicadores económicos (UF, Dólar, Euro).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Queda corriendo y refresca cada --intervalo segundos.'
+        )
+        parser.add_argument('--intervalo', type=int, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            valores = refrescar_indicadores()
+            if valores:
+                self.stdout.write(self.style.SUCCESS(f'Indicadores actualizados: {valores}'))
+            else:
+                self.stderr.write('No se pudo consultar la API de indicadores.')
+
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from jobswipe.busqueda import obtener_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de las ofertas.'
+
+    def handle(self, *args, **options):
+        backend = obtener_backend()
+        backend.reindexar_todo()
+        self.stdout.write(self.style.SUCCESS(f'Índice reconstruido ({type(backend).__name__}).'))
@@ -0,0 +1,269 @@
+import contextvars
+import hmac
+import logging
+import random
+import threading
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger('jobswipe.consultas_lentas')
+
+# -----------------------------------------------------------------
+# MÉTRICAS DE RENDIMIENTO POR REQUEST
+# -----------------------------------------------------------------
+# MetricasMiddleware mide cada request (latencia por vista, cantidad y
+# tiempo de consultas SQL, render de plantillas y llamadas HTTP externas),
+# lo acumula en histogramas en memoria y agrega la cabecera Server-Timing.
+# /metricas/ los expone en el formato de texto de Prometheus.
+# Los valores son por proceso: con varios workers, cada uno expone los suyos.
+# Las consultas más lentas que METRICAS_CONSULTA_LENTA se registran (con
+# muestreo) junto con la pila de llamadas del código del proyecto.
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+# --- Registro de métricas ---
+class Histograma:
+
+    def __init__(self, nombre, ayuda, etiquetas, buckets=BUCKETS_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        self._series = {}  # valores de etiquetas -> [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *etiquetas):
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[etiquetas] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def reiniciar(self):
+        with self._lock:
+            self._series.clear()
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} histogram']
+        with self._lock:
+            series = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for valores, (conteos, suma, total) in series:
+            base = ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(self.etiquetas, valores))
+            separador = ',' if base else ''
+            for limite, conteo in zip(self.buckets, conteos):
+                lineas.append(f'{self.nombre}_bucket{{{base}{separador}le="{limite}"}} {conteo}')
+            lineas.append(f'{self.nombre}_bucket{{{base}{separador}le="+Inf"}} {total}')
+            lineas.append(f'{self.nombre}_sum{{{base}}} {suma}')
+            lineas.append(f'{self.nombre}_count{{{base}}} {total}')
+        return lineas
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+LATENCIA = Histograma(
+    'jobswipe_request_duracion_segundos', 'Duración de cada request por vista.',
+    ('vista', 'metodo', 'estado'),
+)
+CONSULTAS = Histograma(
+    'jobswipe_request_consultas', 'Consultas SQL por request.', ('vista',), BUCKETS_CONSULTAS,
+)
+DURACION_SQL = Histograma(
+    'jobswipe_request_sql_segundos', 'Tiempo en la base de datos por request.', ('vista',),
+)
+DURACION_PLANTILLAS = Histograma(
+    'jobswipe_plantilla_render_segundos', 'Tiempo de render por plantilla.', ('plantilla',),
+)
+DURACION_HTTP = Histograma(
+    'jobswipe_http_externo_segundos', 'Duración de llamadas HTTP a servicios externos.', ('servicio',),
+)
+METRICAS = [LATENCIA, CONSULTAS, DURACION_SQL, DURACION_PLANTILLAS, DURACION_HTTP]
+
+
+def exponer_metricas():
+    return '\n'.join(linea for metrica in METRICAS for linea in metrica.exponer()) + '\n'
+
+
+# --- Acumulado del request en curso ---
+class _Medicion:
+
+    def __init__(self):
+        self.consultas = 0
+        self.sql = 0.0
+        self.plantillas = 0.0
+        self.http = 0.0
+
+
+_medicion_actual = contextvars.ContextVar('medicion_actual', default=None)
+
+
+@contextmanager
+def medir_http(servicio):
+    """
+    Envuelve una llamada a un servicio externo: with medir_http('mindicador'): ...
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        DURACION_HTTP.observar(duracion, servicio)
+        medicion = _medicion_actual.get()
+        if medicion is not None:
+            medicion.http += duracion
+
+
+def _pila_del_proyecto():
+    # Solo los frames de nuestro código: la pila de Django no ayuda a encontrar la vista
+    base = str(settings.BASE_DIR)
+    return ''.join(
+        linea for linea in traceback.format_stack()[:-2]
+        if linea.lstrip().startswith(f'File "{base}') and 'site-packages' not in linea
+    )
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracion = time.perf_counter() - inicio
+        medicion = _medicion_actual.get()
+        if medicion is not None:
+            medicion.consultas += 1
+            medicion.sql += duracion
+        if (duracion >= _config('METRICAS_CONSULTA_LENTA', 0.2)
+                and random.random() < _config('METRICAS_MUESTREO_LENTAS', 1.0)):
+            logger.warning('Consulta lenta (%.0f ms): %s\n%s', duracion * 1000, sql, _pila_del_proyecto())
+
+
+# --- Plantillas medidas ---
+class _PlantillaMedida(Template):
+
+    def render(self, context=None, request=None):
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            duracion = time.perf_counter() - inicio
+            DURACION_PLANTILLAS.observar(duracion, self.origin.template_name or 'cadena')
+            medicion = _medicion_actual.get()
+            if medicion is not None:
+                medicion.plantillas += duracion
+
+
+class PlantillasMedidas(DjangoTemplates):
+    """
+    Backend de plantillas de Django que mide el render (TEMPLATES['BACKEND']).
+    """
+
+    def from_string(self, template_code):
+        return _PlantillaMedida(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        plantilla = super().get_template(template_name)
+        return _PlantillaMedida(plantilla.template, self)
+
+
+# --- Middleware ---
+class MetricasMiddleware:
+    """
+    Sync y async. Bajo ASGI las consultas de una vista async corren en el
+    hilo del request (sync_to_async): los wrappers se instalan en ese hilo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion = _Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pila:
+                _medir_conexiones(pila)
+                respuesta = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        return self._registrar(request, respuesta, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        medicion = _Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        pila = ExitStack()
+        try:
+            await sync_to_async(_medir_conexiones)(pila)
+            respuesta = await self.get_response(request)
+        finally:
+            await sync_to_async(pila.close)()
+            _medicion_actual.reset(token)
+        return await sync_to_async(self._registrar)(request, respuesta, medicion, time.perf_counter() - inicio)
+
+    def _registrar(self, request, respuesta, medicion, total):
+        coincidencia = getattr(request, 'resolver_match', None)
+        vista = coincidencia.view_name if coincidencia else 'sin_ruta'
+        LATENCIA.observar(total, vista, request.method, respuesta.status_code)
+        CONSULTAS.observar(medicion.consultas, vista)
+        DURACION_SQL.observar(medicion.sql, vista)
+
+        if self._mostrar_server_timing(request):
+            respuesta['Server-Timing'] = ', '.join([
+                f'db;dur={medicion.sql * 1000:.1f};desc="{medicion.consultas} consultas"',
+                f'tpl;dur={medicion.plantillas * 1000:.1f}',
+                f'http;dur={medicion.http * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+        return respuesta
+
+    def _mostrar_server_timing(self, request):
+        # Revela tiempos internos: en producción solo para el staff
+        if _config('METRICAS_SERVER_TIMING', settings.DEBUG):
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_authenticated and user.is_staff)
+
+
+def _medir_conexiones(pila):
+    for conexion in connections.all():
+        pila.enter_context(conexion.execute_wrapper(_medir_consulta))
+
+
+# --- Endpoint para Prometheus ---
+def metricas_view(request):
+    """
+    Con el token METRICAS_TOKEN ("Authorization: Bearer <token>") o para el staff.
+    METRICAS_IPS_PERMITIDAS solo vale sin un proxy reverso local (ver settings).
+    """
+    token = _config('METRICAS_TOKEN', None)
+    autorizacion = request.META.get('HTTP_AUTHORIZATION', '')
+    con_token = bool(token) and hmac.compare_digest(autorizacion.encode(), f'Bearer {token}'.encode())
+    permitida = request.META.get('REMOTE_ADDR') in _config('METRICAS_IPS_PERMITIDAS', ())
+    user = getattr(request, 'user', None)
+    if not (con_token or permitida or (user and user.is_authenticated and user.is_staff)):
+        return HttpResponseForbidden('Métricas disponibles solo con token o para el staff.')
+    return HttpResponse(exponer_metricas(), content_type='text/plain; version=0.0.4; charset=utf-8')
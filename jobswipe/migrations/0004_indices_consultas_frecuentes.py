@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0003_ofertadeempleo_moneda_ofertadeempleo_sueldo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mensaje',
+            index=models.Index(fields=['solicitud', 'fecha'], name='mensaje_solicitud_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ofertadeempleo',
+            index=models.Index(fields=['estado', '-fecha_publicacion', '-id'], name='oferta_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ofertadeempleo',
+            index=models.Index(fields=['estado', '-es_inclusion', '-fecha_publicacion', '-id'], name='oferta_estado_inclusion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ofertadeempleo',
+            index=models.Index(fields=['perfil_empleador', '-fecha_publicacion'], name='oferta_empleador_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['oferta', 'estado'], name='solicitud_oferta_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['User_candidato', 'estado'], name='solicitud_candidato_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(condition=models.Q(('estado', 'pendiente')), fields=['oferta', 'fecha_postulacion'], name='solicitud_pendiente_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0004_indices_consultas_frecuentes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mensaje',
+            index=models.Index(fields=['solicitud', 'id'], name='mensaje_solicitud_id_idx'),
+        ),
+    ]
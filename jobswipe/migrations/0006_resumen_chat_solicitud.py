@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-18 03:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0005_indice_historial_chat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitud',
+            name='no_leidos_candidato',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='no_leidos_empleador',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='ultimo_mensaje',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='jobswipe.mensaje'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='ultimo_mensaje_fecha',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='ultimo_mensaje_texto',
+            field=models.CharField(blank=True, default='', max_length=120),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['estado', '-ultimo_mensaje_fecha', '-fecha_postulacion'], name='solicitud_actividad_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 03:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0006_resumen_chat_solicitud'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Descarte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('User_candidato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descartes', to=settings.AUTH_USER_MODEL)),
+                ('oferta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descartes', to='jobswipe.ofertadeempleo')),
+            ],
+            options={
+                'unique_together': {('User_candidato', 'oferta')},
+            },
+        ),
+    ]
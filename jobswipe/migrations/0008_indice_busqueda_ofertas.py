@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-18 03:11
+
+from django.db import migrations
+
+
+# El índice de búsqueda depende del motor: tsvector + GIN en PostgreSQL,
+# FTS5 en SQLite. En otros motores (MySQL) no se crea nada y la búsqueda
+# usa icontains (ver jobswipe/busqueda.py).
+
+def crear_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("""
+            CREATE TABLE jobswipe_oferta_busqueda (
+                oferta_id bigint PRIMARY KEY
+                    REFERENCES jobswipe_ofertadeempleo (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+                documento tsvector NOT NULL
+            )
+        """)
+        schema_editor.execute(
+            "CREATE INDEX jobswipe_oferta_busqueda_gin ON jobswipe_oferta_busqueda USING gin (documento)"
+        )
+        schema_editor.execute("""
+            INSERT INTO jobswipe_oferta_busqueda (oferta_id, documento)
+            SELECT o.id,
+                setweight(to_tsvector('spanish', coalesce(o.titulo, '')), 'A') ||
+                setweight(to_tsvector('spanish', coalesce(o.descripcion, '')), 'B') ||
+                setweight(to_tsvector('spanish', coalesce(c.nombre, '')), 'C')
+            FROM jobswipe_ofertadeempleo o
+            LEFT JOIN jobswipe_categoriadeservicio c ON c.id = o.categoria_id
+        """)
+    elif vendor == 'sqlite':
+        schema_editor.execute("""
+            CREATE VIRTUAL TABLE jobswipe_oferta_fts USING fts5(
+                titulo, descripcion, categoria, tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        schema_editor.execute("""
+            INSERT INTO jobswipe_oferta_fts (rowid, titulo, descripcion, categoria)
+            SELECT o.id, coalesce(o.titulo, ''), coalesce(o.descripcion, ''), coalesce(c.nombre, '')
+            FROM jobswipe_ofertadeempleo o
+            LEFT JOIN jobswipe_categoriadeservicio c ON c.id = o.categoria_id
+        """)
+
+
+def eliminar_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS jobswipe_oferta_busqueda')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS jobswipe_oferta_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0007_descarte'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
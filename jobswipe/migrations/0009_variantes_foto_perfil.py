@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0008_indice_busqueda_ofertas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfil',
+            name='foto_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 03:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0009_variantes_foto_perfil'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('argumentos', models.JSONField(blank=True, default=dict)),
+                ('clave', models.CharField(blank=True, max_length=200, null=True, unique=True)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completada', 'Completada'), ('fallida', 'Fallida')], default='pendiente', max_length=10)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('max_intentos', models.PositiveSmallIntegerField(default=5)),
+                ('ejecutar_despues', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bloqueada_hasta', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('actualizada', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Tareas',
+                'indexes': [models.Index(fields=['estado', 'ejecutar_despues'], name='tarea_estado_ejecutar_idx')],
+            },
+        ),
+    ]
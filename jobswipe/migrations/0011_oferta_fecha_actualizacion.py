@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 05:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copiar_fecha_publicacion(apps, schema_editor):
+    OfertaDeEmpleo = apps.get_model('jobswipe', 'OfertaDeEmpleo')
+    OfertaDeEmpleo.objects.update(fecha_actualizacion=models.F('fecha_publicacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0010_tarea'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ofertadeempleo',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copiar_fecha_publicacion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 03:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def calcular_sueldo_normalizado(apps, schema_editor):
+    # Con el dólar de respaldo: el primer refresco de indicadores lo recalcula
+    OfertaDeEmpleo = apps.get_model('jobswipe', 'OfertaDeEmpleo')
+    tasa = getattr(settings, 'SUELDOS_DOLAR_RESPALDO', 950)
+    ofertas = OfertaDeEmpleo.objects.filter(sueldo__isnull=False)
+    ofertas.exclude(moneda='USD').update(sueldo_normalizado=models.F('sueldo'))
+    ofertas.filter(moneda='USD').update(sueldo_normalizado=models.F('sueldo') * tasa)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0011_oferta_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ofertadeempleo',
+            name='sueldo_normalizado',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ofertadeempleo',
+            index=models.Index(fields=['estado', '-sueldo_normalizado', '-id'], name='oferta_estado_sueldo_idx'),
+        ),
+        migrations.RunPython(calcular_sueldo_normalizado, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:27
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobswipe', '0012_sueldo_normalizado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(models.F('User_candidato'), models.F('estado'), models.OrderBy(django.db.models.functions.comparison.Coalesce('ultimo_mensaje_fecha', 'fecha_postulacion'), descending=True), models.OrderBy(models.F('id'), descending=True), name='solicitud_cand_actividad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(models.F('oferta'), models.F('estado'), models.OrderBy(django.db.models.functions.comparison.Coalesce('ultimo_mensaje_fecha', 'fecha_postulacion'), descending=True), models.OrderBy(models.F('id'), descending=True), name='solicitud_oferta_actividad_idx'),
+        ),
+    ]
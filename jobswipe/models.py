@@ -1,7 +1,10 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 # --- Modelo de Perfil de User ---
 # Extiende el modelo User nativo de Django
@@ -24,10 +27,46 @@ class Perfil(models.Model):
     habilidades = models.TextField(blank=True, null=True, help_text="Separadas por comas")
     experiencia = models.TextField(blank=True, null=True)
     foto = models.ImageField(upload_to='fotos_perfil/', blank=True, null=True)
+    # Variantes redimensionadas de la foto (las genera jobswipe/imagenes.py):
+    # {'origen': nombre de la foto, 'webp': {ancho: nombre}, 'jpeg': {ancho: nombre}}
+    foto_variantes = models.JSONField(default=dict, blank=True, editable=False)
     es_pcd = models.BooleanField(default=False, verbose_name="Persona con Discapacidad")
 
     def __str__(self):
         return f"{self.user.username} - {self.tipo}"
+
+    # --- Foto responsive (srcset) ---
+    def _variantes(self, formato):
+        # Solo sirven si corresponden a la foto actual (si no, aún se están generando)
+        if not self.foto or (self.foto_variantes or {}).get('origen') != self.foto.name:
+            return {}
+        return self.foto_variantes.get(formato, {})
+
+    def _srcset(self, formato):
+        variantes = self._variantes(formato)
+        return ', '.join(
+            f'{self.foto.storage.url(nombre)} {ancho}w'
+            for ancho, nombre in sorted(variantes.items(), key=lambda par: int(par[0]))
+        )
+
+    @property
+    def foto_srcset_webp(self):
+        return self._srcset('webp')
+
+    @property
+    def foto_srcset_jpeg(self):
+        return self._srcset('jpeg')
+
+    @property
+    def foto_src(self):
+        """
+        URL por defecto: la variante JPEG mediana, o el original mientras no existan.
+        """
+        variantes = self._variantes('jpeg')
+        if variantes:
+            anchos = sorted(variantes, key=int)
+            return self.foto.storage.url(variantes[anchos[len(anchos) // 2]])
+        return self.foto.url if self.foto else ''
 # --- Categorías de Empleo ---
 class CategoriaDeServicio(models.Model):
     nombre = models.CharField(max_length=100, unique=True)
@@ -52,6 +91,8 @@ class OfertaDeEmpleo(models.Model):
     descripcion = models.TextField(blank=True, null=True)
     categoria = models.ForeignKey(CategoriaDeServicio, on_delete=models.SET_NULL, null=True)
     fecha_publicacion = models.DateTimeField(auto_now_add=True)
+    # Parte de la clave de los fragmentos cacheados de la tarjeta (ver signals.py)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
     estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='activa')
 
     # --- ¡NUEVO CAMPO DE INCLUSIÓN! ---
@@ -70,6 +111,8 @@ class OfertaDeEmpleo(models.Model):
         blank=True, null=True, # Opcional
         help_text="Opcional. Ej: 500000"
     )
+    # En CLP con el dólar de los indicadores: filtros y orden por sueldo entre monedas (ver sueldos.py)
+    sueldo_normalizado = models.PositiveBigIntegerField(blank=True, null=True, editable=False)
     # ----------------------------------
 
     def __str__(self):
@@ -77,8 +120,27 @@ class OfertaDeEmpleo(models.Model):
 
     class Meta:
         verbose_name_plural = "Ofertas de Empleo"
+        indexes = [
+            # Feed del candidato: ofertas activas por fecha (y Ley 21.015).
+            # Índices completos y no parciales: MySQL no soporta índices con condición.
+            models.Index(fields=['estado', '-fecha_publicacion', '-id'], name='oferta_estado_fecha_idx'),
+            models.Index(
+                fields=['estado', '-es_inclusion', '-fecha_publicacion', '-id'],
+                name='oferta_estado_inclusion_idx',
+            ),
+            # Dashboard del empleador
+            models.Index(fields=['perfil_empleador', '-fecha_publicacion'], name='oferta_empleador_fecha_idx'),
+            # Rango y orden por sueldo (feed y API)
+            models.Index(fields=['estado', '-sueldo_normalizado', '-id'], name='oferta_estado_sueldo_idx'),
+        ]
 
 # --- Solicitudes de Empleo (Swipes/Matches) ---
+# Actividad de un match: la fecha de su último mensaje o, sin mensajes, la
+# de la postulación. La bandeja ordena por esta expresión y los índices
+# solicitud_*_actividad_idx la indexan tal cual.
+ACTIVIDAD_SOLICITUD = Coalesce('ultimo_mensaje_fecha', 'fecha_postulacion')
+
+
 class Solicitud(models.Model):
     ESTADO_CHOICES = [
         ('pendiente', 'Pendiente'),
@@ -92,14 +154,62 @@ class Solicitud(models.Model):
     fecha_postulacion = models.DateTimeField(auto_now_add=True)
     estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente')
 
+    # --- Resumen del chat (desnormalizado, lo mantiene jobswipe/chat.py) ---
+    no_leidos_candidato = models.PositiveIntegerField(default=0)
+    no_leidos_empleador = models.PositiveIntegerField(default=0)
+    ultimo_mensaje = models.ForeignKey(
+        'Mensaje', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    ultimo_mensaje_texto = models.CharField(max_length=120, blank=True, default='')
+    ultimo_mensaje_fecha = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         # Asegura que un candidato solo puede postular una vez a la misma oferta
         unique_together = ('oferta', 'User_candidato')
         verbose_name_plural = "Solicitudes"
+        indexes = [
+            models.Index(fields=['oferta', 'estado'], name='solicitud_oferta_estado_idx'),
+            models.Index(fields=['User_candidato', 'estado'], name='solicitud_candidato_estado_idx'),
+            # Filtro por estado del admin (no sirve a la bandeja: no empieza por el participante)
+            models.Index(
+                fields=['estado', '-ultimo_mensaje_fecha', '-fecha_postulacion'],
+                name='solicitud_actividad_idx',
+            ),
+            # Bandeja de matches (chat.matches_de) por actividad reciente:
+            # una por cada lado, empezando por la columna del filtro
+            models.Index(
+                F('User_candidato'), F('estado'), ACTIVIDAD_SOLICITUD.desc(), F('id').desc(),
+                name='solicitud_cand_actividad_idx',
+            ),
+            models.Index(
+                F('oferta'), F('estado'), ACTIVIDAD_SOLICITUD.desc(), F('id').desc(),
+                name='solicitud_oferta_actividad_idx',
+            ),
+            # Cola de revisión del empleador (solo pendientes)
+            models.Index(
+                fields=['oferta', 'fecha_postulacion'],
+                condition=models.Q(estado='pendiente'),
+                name='solicitud_pendiente_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.User_candidato.username} a {self.oferta.titulo}'
 
+# --- Descartes (swipe a la izquierda) ---
+# Se guardan para que el feed no vuelva a mostrar la oferta.
+class Descarte(models.Model):
+    User_candidato = models.ForeignKey(User, on_delete=models.CASCADE, related_name='descartes')
+    oferta = models.ForeignKey(OfertaDeEmpleo, on_delete=models.CASCADE, related_name='descartes')
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # El orden (candidato, oferta) sirve al anti-join del feed
+        unique_together = ('User_candidato', 'oferta')
+
+    def __str__(self):
+        return f'{self.User_candidato_id} descartó {self.oferta_id}'
+
 # --- Mensajería ---
 class Mensaje(models.Model):
     # Tu nombre de campo original
@@ -121,6 +231,44 @@ class Mensaje(models.Model):
 
     class Meta:
         ordering = ['fecha']
+        indexes = [
+            models.Index(fields=['solicitud', 'fecha'], name='mensaje_solicitud_fecha_idx'),
+            # Paginación por cursor (id) del historial
+            models.Index(fields=['solicitud', 'id'], name='mensaje_solicitud_id_idx'),
+        ]
+
+# --- Tareas en segundo plano (ver jobswipe/tareas.py) ---
+class Tarea(models.Model):
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En proceso'),
+        ('completada', 'Completada'),
+        ('fallida', 'Fallida'),
+    ]
+
+    nombre = models.CharField(max_length=100)  # Nombre registrado con @tarea
+    argumentos = models.JSONField(default=dict, blank=True)
+    # Clave de idempotencia: encolar dos veces la misma clave crea una sola tarea
+    clave = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=5)
+    ejecutar_despues = models.DateTimeField(default=timezone.now)
+    # Si el worker muere, otra la retoma cuando vence el bloqueo
+    bloqueada_hasta = models.DateTimeField(null=True, blank=True)
+    ultimo_error = models.TextField(blank=True, default='')
+    creada = models.DateTimeField(auto_now_add=True)
+    actualizada = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Tareas"
+        indexes = [
+            # Lo que consulta el worker: pendientes cuya hora ya llegó
+            models.Index(fields=['estado', 'ejecutar_despues'], name='tarea_estado_ejecutar_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.nombre} #{self.id} ({self.estado})'
 
 # --- AgreGar estas lineas al model.py
 # Esto crea automáticamente un Perfil cuando se crea un User
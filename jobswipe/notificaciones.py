@@ -0,0 +1,87 @@
+import time
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .models import Solicitud
+from .tareas import encolar, encolar_muchas, tarea
+
+# -----------------------------------------------------------------
+# NOTIFICACIONES POR CORREO (siempre como tareas en segundo plano)
+# -----------------------------------------------------------------
+# Si el correo falla, la tarea se reintenta con backoff; el request que
+# la originó (aceptar un candidato, enviar un mensaje) ya respondió.
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+def agendar_notificaciones_match(ids_solicitud):
+    # Clave por solicitud: un match se notifica una sola vez
+    return encolar_muchas(
+        [('notificar_match', f'match:{id_solicitud}', {'solicitud_id': id_solicitud})
+         for id_solicitud in ids_solicitud]
+    )
+
+
+def agendar_aviso_mensaje(solicitud, destino):
+    """
+    Correo de "tienes mensajes sin leer" si el destinatario no los lee
+    dentro de AVISO_MENSAJES_RETRASO segundos. Una ráfaga de mensajes en
+    la misma ventana comparte la clave, así que genera un solo aviso.
+    """
+    retraso = _config('AVISO_MENSAJES_RETRASO', 60 * 10)
+    ventana = int(time.time() // retraso)
+    return encolar(
+        'avisar_mensajes_no_leidos',
+        clave=f'aviso:{solicitud.id}:{destino.id}:{ventana}',
+        retraso=retraso,
+        solicitud_id=solicitud.id,
+        user_id=destino.id,
+    )
+
+
+@tarea('notificar_match')
+def notificar_match(solicitud_id):
+    solicitud = (
+        Solicitud.objects.select_related('oferta__perfil_empleador__user', 'User_candidato')
+        .filter(id=solicitud_id, estado='aceptada').first()
+    )
+    if solicitud is None or not solicitud.User_candidato.email:
+        return
+    empresa = solicitud.oferta.perfil_empleador.user.first_name
+    send_mail(
+        f'¡Tienes un match en JobSwipe! ({solicitud.oferta.titulo})',
+        f'Hola {solicitud.User_candidato.first_name},\n\n'
+        f'{empresa} aceptó tu postulación a "{solicitud.oferta.titulo}". '
+        'Ya pueden conversar desde la sección Matches.',
+        None,
+        [solicitud.User_candidato.email],
+    )
+
+
+@tarea('avisar_mensajes_no_leidos')
+def avisar_mensajes_no_leidos(solicitud_id, user_id):
+    solicitud = (
+        Solicitud.objects.select_related('oferta__perfil_empleador__user', 'User_candidato')
+        .filter(id=solicitud_id).first()
+    )
+    if solicitud is None:
+        return
+    if user_id == solicitud.User_candidato_id:
+        destinatario, no_leidos = solicitud.User_candidato, solicitud.no_leidos_candidato
+        otro = solicitud.oferta.perfil_empleador.user
+    else:
+        destinatario, no_leidos = solicitud.oferta.perfil_empleador.user, solicitud.no_leidos_empleador
+        otro = solicitud.User_candidato
+    if not no_leidos or not destinatario.email or destinatario.id != user_id:
+        return
+    send_mail(
+        f'Tienes {no_leidos} mensaje(s) sin leer de {otro.first_name}',
+        f'Hola {destinatario.first_name},\n\n'
+        f'{otro.first_name} te escribió por "{solicitud.oferta.titulo}": '
+        f'"{solicitud.ultimo_mensaje_texto}"',
+        None,
+        [destinatario.email],
+    )
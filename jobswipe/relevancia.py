@@ -0,0 +1,327 @@
+import base64
+import json
+import math
+import re
+import time
+import unicodedata
+import uuid
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .feed import CursorInvalido, TAMANO_LOTE, TAMANO_LOTE_MAXIMO, ofertas_disponibles
+from .models import OfertaDeEmpleo, Solicitud
+from .tareas import encolar, tarea
+
+# -----------------------------------------------------------------
+# MOTOR DE RELEVANCIA (habilidades del candidato vs. ofertas)
+# -----------------------------------------------------------------
+# Ofertas y perfiles se representan como vectores TF-IDF dispersos sobre
+# el mismo vocabulario. El índice de ofertas (matriz CSR, filas
+# normalizadas) se precalcula y se guarda en la caché; los puntajes
+# salen de un producto matriz-vector, sin recorrer oferta por oferta.
+# Las versiones en la caché invalidan índice y rankings (ver signals.py).
+# El índice no se reconstruye dentro de un request: escribir una oferta
+# agenda la reconstrucción en la cola de tareas (una por ventana de
+# RELEVANCIA_REINDEXAR_CADA segundos) y mientras tanto se sigue usando
+# el índice anterior. Si el atraso supera RELEVANCIA_ATRASO_MAXIMO (sin
+# worker, p. ej.) el request que lo nota lo reconstruye.
+# La cola de revisión por relevancia se cachea por oferta; se invalida
+# al cambiar la oferta, sus postulaciones o el perfil de un candidato.
+
+CLAVE_VERSION_OFERTAS = 'relevancia:version:ofertas'
+CLAVE_INDICE_VIGENTE = 'relevancia:indice:vigente'
+CLAVE_ATRASO_DESDE = 'relevancia:indice:atraso_desde'
+CLAVE_VERSION_CANDIDATOS = 'relevancia:version:candidatos'
+TTL_INDICE = 60 * 60
+TTL_RANKING = 60 * 15
+ESCANEO_MAXIMO = 2000   # Ids del ranking revisados por lote; después se entrega lo que haya y el cursor
+TRAMO_MAXIMO = 500      # Ids por consulta (IN) al recorrer el ranking
+COLA_ESCANEO_MAXIMO = 2000  # Postulaciones pendientes puntuadas por oferta (las más antiguas primero)
+PESO_HABILIDADES = 2  # Las habilidades declaradas pesan más que la descripción
+
+STOPWORDS = {
+    'a', 'al', 'como', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'que', 'se', 'sin', 'su', 'sus', 'un', 'una', 'y',
+}
+
+
+# --- Normalización ---
+def normalizar(texto):
+    """
+    'Programación en C++, Node.js' -> ['programacion', 'c++', 'node.js']
+    """
+    if not texto:
+        return []
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    terminos = (t.rstrip('.') for t in re.findall(r'[a-z0-9][a-z0-9+#.]*', texto))
+    return [t for t in terminos if t and t not in STOPWORDS]
+
+
+def terminos_oferta(titulo, descripcion, categoria):
+    return normalizar(titulo) + normalizar(descripcion) + normalizar(categoria)
+
+
+def terminos_perfil(habilidades, descripcion_profesional):
+    return normalizar(habilidades) * PESO_HABILIDADES + normalizar(descripcion_profesional)
+
+
+# --- Versiones (invalidación) ---
+# Versiones aleatorias y no un contador: si la caché se vacía no se
+# repite una versión vieja que siga en la memoria de algún proceso.
+def _version(clave):
+    return cache.get_or_set(clave, lambda: uuid.uuid4().hex, timeout=None)
+
+
+def _invalidar(clave):
+    cache.set(clave, uuid.uuid4().hex, timeout=None)
+
+
+def invalidar_ofertas():
+    _invalidar(CLAVE_VERSION_OFERTAS)
+    agendar_reconstruccion()
+
+
+def invalidar_perfil(user_id):
+    _invalidar(f'relevancia:version:perfil:{user_id}')
+    # El perfil puede estar en la cola de cualquier oferta a la que postuló
+    transaction.on_commit(lambda: _invalidar(CLAVE_VERSION_CANDIDATOS))
+
+
+def invalidar_colas(oferta_ids):
+    # Después del commit: antes, otro request podría volver a cachear la cola vieja
+    versiones = {f'relevancia:version:cola:{i}': uuid.uuid4().hex for i in oferta_ids}
+    if versiones:
+        transaction.on_commit(lambda: cache.set_many(versiones, timeout=None))
+
+
+# --- Índice de ofertas ---
+class IndiceOfertas:
+
+    def __init__(self, ids, inclusion, matriz, vocabulario, idf, version=None):
+        self.ids = ids                  # np.array de ids de oferta (una por fila)
+        self.inclusion = inclusion      # np.array bool (Ley 21.015)
+        self.matriz = matriz            # CSR (ofertas x términos), filas con norma 1
+        self.vocabulario = vocabulario  # término -> columna
+        self.idf = idf                  # np.array por columna
+        self.version = version          # Versión de las ofertas con que se construyó
+
+    def vectorizar(self, documentos):
+        """
+        Lista de listas de términos -> CSR (documentos x términos) TF-IDF normalizada.
+        Los términos fuera del vocabulario se ignoran (no aportan al puntaje).
+        """
+        return _tfidf(documentos, self.vocabulario, self.idf)
+
+
+def _tfidf(documentos, vocabulario, idf):
+    filas, columnas, valores = [], [], []
+    for fila, terminos in enumerate(documentos):
+        for termino, frecuencia in Counter(terminos).items():
+            columna = vocabulario.get(termino)
+            if columna is not None:
+                filas.append(fila)
+                columnas.append(columna)
+                valores.append(1.0 + math.log(frecuencia))
+    matriz = sparse.csr_matrix(
+        (valores, (filas, columnas)), shape=(len(documentos), len(vocabulario)), dtype=np.float32
+    )
+    matriz = matriz.multiply(idf.reshape(1, -1)).tocsr()
+    normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+    normas[normas == 0] = 1.0
+    return sparse.diags(1.0 / normas).dot(matriz).tocsr()
+
+
+def construir_indice(version=None):
+    filas = list(
+        OfertaDeEmpleo.objects.filter(estado='activa')
+        .values_list('id', 'es_inclusion', 'titulo', 'descripcion', 'categoria__nombre')
+        .order_by('id')
+        .iterator(chunk_size=2000)
+    )
+    documentos = [terminos_oferta(titulo, descripcion, categoria) for _, _, titulo, descripcion, categoria in filas]
+
+    vocabulario = {}
+    frecuencia_documental = Counter()
+    for terminos in documentos:
+        frecuencia_documental.update(set(terminos))
+    for termino in sorted(frecuencia_documental):
+        vocabulario[termino] = len(vocabulario)
+    df = np.array([frecuencia_documental[t] for t in vocabulario], dtype=np.float32)
+    idf = (np.log((1 + len(documentos)) / (1 + df)) + 1).astype(np.float32)
+
+    return IndiceOfertas(
+        ids=np.array([fila[0] for fila in filas], dtype=np.int64),
+        inclusion=np.array([fila[1] for fila in filas], dtype=bool),
+        matriz=_tfidf(documentos, vocabulario, idf),
+        vocabulario=vocabulario,
+        idf=idf,
+        version=version,
+    )
+
+
+def reconstruir_indice():
+    # La versión se lee antes de consultar: si otra escritura llega mientras
+    # tanto, el índice ya queda atrasado y se agenda otra reconstrucción
+    version = _version(CLAVE_VERSION_OFERTAS)
+    indice = construir_indice(version)
+    cache.set_many({f'relevancia:indice:{version}': indice, CLAVE_INDICE_VIGENTE: indice}, timeout=TTL_INDICE)
+    cache.delete(CLAVE_ATRASO_DESDE)
+    return indice
+
+
+@tarea('reconstruir_indice_relevancia')
+def reconstruir_indice_tarea():
+    reconstruir_indice()
+
+
+def agendar_reconstruccion():
+    # Una tarea por ventana: las escrituras de la misma ventana entran en
+    # la reconstrucción, que corre después de que la ventana termina.
+    # Sin índice no hay nada que refrescar: lo construye el primer request.
+    if not cache.has_key(CLAVE_INDICE_VIGENTE):
+        return
+    cada = getattr(settings, 'RELEVANCIA_REINDEXAR_CADA', 30)
+    encolar('reconstruir_indice_relevancia', clave=f'relevancia:indice:{int(time.time() // cada)}', retraso=cada)
+
+
+def _puede_atrasarse():
+    desde = cache.get_or_set(CLAVE_ATRASO_DESDE, time.time, timeout=TTL_INDICE)
+    return time.time() - desde < getattr(settings, 'RELEVANCIA_ATRASO_MAXIMO', 60 * 5)
+
+
+_indice_local = {}  # 'indice' -> último IndiceOfertas de este proceso (evita deserializar en cada request)
+
+
+def obtener_indice():
+    version = _version(CLAVE_VERSION_OFERTAS)
+    local = _indice_local.get('indice')
+    if local is not None and local.version == version:
+        return local
+
+    indice = cache.get(f'relevancia:indice:{version}')
+    if indice is None:
+        anterior = local or cache.get(CLAVE_INDICE_VIGENTE)
+        if anterior is not None and _puede_atrasarse():
+            indice = anterior  # La tarea agendada al escribir trae el nuevo
+        else:
+            indice = reconstruir_indice()
+    _indice_local['indice'] = indice
+    return indice
+
+
+# --- Candidato -> ofertas ---
+def ranking_para_candidato(user, perfil):
+    """
+    Ids de ofertas activas ordenados por relevancia para el candidato
+    (primero las de inclusión si es PcD). Cacheado por usuario y versión
+    del índice con que se calculó.
+    """
+    indice = obtener_indice()
+    clave = 'relevancia:ranking:{}:{}:{}:{}'.format(
+        user.id, int(perfil.es_pcd), indice.version, _version(f'relevancia:version:perfil:{user.id}'),
+    )
+    ranking = cache.get(clave)
+    if ranking is not None:
+        return ranking
+
+    if not len(indice.ids):
+        return []
+    vector = indice.vectorizar([terminos_perfil(perfil.habilidades, perfil.descripcion_profesional)])
+    puntajes = np.asarray(indice.matriz.dot(vector.T).todense()).ravel()
+
+    # lexsort ordena por la última clave primero; desempate por id descendente (más nueva)
+    claves = [-indice.ids, -puntajes]
+    if perfil.es_pcd:
+        claves.append(-indice.inclusion.astype(np.int8))
+    orden = np.lexsort(claves)
+    ranking = indice.ids[orden].tolist()
+    cache.set(clave, ranking, timeout=TTL_RANKING)
+    return ranking
+
+
+def _codificar_posicion(posicion):
+    return base64.urlsafe_b64encode(json.dumps(['r', posicion]).encode()).decode()
+
+
+def _decodificar_posicion(cursor):
+    try:
+        marca, posicion = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if marca != 'r' or not isinstance(posicion, int) or posicion < 0:
+            raise ValueError
+        return posicion
+    except (ValueError, TypeError):
+        raise CursorInvalido('Cursor inválido.')
+
+
+def lote_por_relevancia(user, perfil, cursor=None, tamano=TAMANO_LOTE, filtros=None):
+    """
+    Igual que feed.obtener_lote pero recorriendo el ranking de relevancia.
+    El cursor guarda la posición en el ranking; las ofertas ya postuladas,
+    descartadas o fuera de los filtros se saltan consultando solo sus ids,
+    por tramos que crecen (x4). Con filtros muy restrictivos se revisan a
+    lo más ESCANEO_MAXIMO ids: el lote puede venir corto (o vacío) con
+    cursor, y el cliente sigue pidiendo.
+    """
+    tamano = max(1, min(tamano, TAMANO_LOTE_MAXIMO))
+    disponibles_qs = ofertas_disponibles(user, filtros)
+    ranking = ranking_para_candidato(user, perfil)
+    posicion = _decodificar_posicion(cursor) if cursor else 0
+    limite = min(len(ranking), posicion + ESCANEO_MAXIMO)
+    elegidas = []
+    largo_tramo = tamano * 2
+    while len(elegidas) < tamano and posicion < limite:
+        tramo = ranking[posicion:min(posicion + largo_tramo, limite)]
+        disponibles = set(disponibles_qs.filter(id__in=tramo).values_list('id', flat=True))
+        for id_oferta in tramo:
+            posicion += 1
+            if id_oferta in disponibles:
+                elegidas.append(id_oferta)
+                if len(elegidas) == tamano:
+                    break
+        largo_tramo = min(largo_tramo * 4, TRAMO_MAXIMO)
+    ofertas = OfertaDeEmpleo.objects.select_related('perfil_empleador__user', 'categoria').in_bulk(elegidas)
+    lote = [ofertas[id_oferta] for id_oferta in elegidas if id_oferta in ofertas]
+    siguiente = _codificar_posicion(posicion) if posicion < len(ranking) else None
+    return lote, siguiente
+
+
+# --- Oferta -> candidatos (cola del empleador) ---
+def ordenar_pendientes_por_relevancia(oferta):
+    """
+    Ids de las solicitudes pendientes de la oferta, del candidato más
+    afín al menos afín (un producto matriz-vector para toda la cola).
+    Se puntúan a lo más COLA_ESCANEO_MAXIMO (las más antiguas) y el orden
+    queda cacheado por oferta y versión del índice.
+    """
+    indice = obtener_indice()
+    clave = 'relevancia:cola:{}:{}:{}:{}:{}'.format(
+        oferta.id, oferta.fecha_actualizacion.timestamp(), indice.version,
+        _version(CLAVE_VERSION_CANDIDATOS), _version(f'relevancia:version:cola:{oferta.id}'),
+    )
+    ids = cache.get(clave)
+    if ids is not None:
+        return ids
+
+    pendientes = list(
+        Solicitud.objects.filter(oferta=oferta, estado='pendiente')
+        .values_list('id', 'User_candidato__perfil__habilidades', 'User_candidato__perfil__descripcion_profesional')
+        .order_by('fecha_postulacion', 'id')[:COLA_ESCANEO_MAXIMO]
+    )
+    ids = []
+    if pendientes:
+        categoria = oferta.categoria.nombre if oferta.categoria_id else ''
+        vector_oferta = indice.vectorizar([terminos_oferta(oferta.titulo, oferta.descripcion, categoria)])
+        candidatos = indice.vectorizar([terminos_perfil(h, d) for _, h, d in pendientes])
+        puntajes = np.asarray(candidatos.dot(vector_oferta.T).todense()).ravel()
+
+        # Orden estable: a igual puntaje se mantiene el orden de llegada
+        orden = np.argsort(-puntajes, kind='stable')
+        ids = np.array([fila[0] for fila in pendientes], dtype=np.int64)[orden].tolist()
+    cache.set(clave, ids, timeout=TTL_RANKING)
+    return ids
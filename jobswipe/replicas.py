@@ -0,0 +1,184 @@
+import contextvars
+import functools
+import hashlib
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.db import connections
+
+# -----------------------------------------------------------------
+# LECTURAS EN RÉPLICAS (feed, matches, API)
+# -----------------------------------------------------------------
+# Las vistas marcadas con @lectura_en_replica (o los viewsets con
+# LecturaEnReplicaMixin) leen de una réplica elegida al azar según su
+# peso (settings.REPLICAS). Todo lo demás, y toda escritura, va a
+# 'default'.
+# Read-your-writes: si un usuario escribe (POST, o cualquier save/update
+# durante el request), queda fijado a la primaria REPLICAS_VENTANA
+# segundos, así ve de inmediato su postulación o su mensaje aunque la
+# réplica venga atrasada. El usuario se identifica por la sesión o el
+# token de la API, sin consultar la base.
+# Las cachés compartidas (API, relevancia) pueden llenarse desde una
+# réplica atrasada justo después de invalidarse: su TTL acota ese retraso.
+
+_estado = contextvars.ContextVar('estado_replicas', default=None)
+
+
+class _EstadoRequest:
+
+    def __init__(self, fijado):
+        self.fijado = fijado    # Escribió hace poco: todo a la primaria
+        self.lectura = False    # La vista en curso acepta leer de una réplica
+        self.escribio = False
+
+
+def elegir_replica():
+    replicas = getattr(settings, 'REPLICAS', {})
+    if not replicas:
+        return None
+    return random.choices(list(replicas), weights=list(replicas.values()))[0]
+
+
+def _clave_fijado(request):
+    user_id = request.session.get(SESSION_KEY) if hasattr(request, 'session') else None
+    if user_id:
+        return f'replicas:fijado:u{user_id}'
+    autorizacion = request.META.get('HTTP_AUTHORIZATION', '')
+    if autorizacion.startswith('Token '):
+        return 'replicas:fijado:t' + hashlib.sha1(autorizacion[6:].encode()).hexdigest()[:20]
+    return None
+
+
+# --- Router ---
+class RouterReplicas:
+    """
+    DATABASE_ROUTERS = ['jobswipe.replicas.RouterReplicas'] (solo si hay réplicas).
+    """
+
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if estado is None or not estado.lectura or estado.fijado:
+            return 'default'
+        # Dentro de una transacción se lee lo que la transacción ve
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return elegir_replica() or 'default'
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado.escribio = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Réplicas y primaria tienen los mismos datos
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'  # Las réplicas se actualizan por replicación
+
+
+# --- Middleware ---
+class ReplicasMiddleware:
+    """
+    Va después de SessionMiddleware: necesita la sesión para identificar al usuario.
+    Sync y async: bajo ASGI no obliga a pasar las vistas async a un hilo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        clave = _clave_fijado(request)
+        estado = _EstadoRequest(fijado=bool(clave and cache.get(clave)))
+        token = _estado.set(estado)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _estado.reset(token)
+
+        clave = self._clave_a_fijar(request, estado)
+        if clave:
+            cache.set(clave, True, timeout=getattr(settings, 'REPLICAS_VENTANA', 10))
+        return respuesta
+
+    async def __acall__(self, request):
+        clave = await sync_to_async(_clave_fijado)(request)  # Puede cargar la sesión
+        estado = _EstadoRequest(fijado=bool(clave and await cache.aget(clave)))
+        token = _estado.set(estado)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _estado.reset(token)
+
+        clave = await sync_to_async(self._clave_a_fijar)(request, estado)
+        if clave:
+            await cache.aset(clave, True, timeout=getattr(settings, 'REPLICAS_VENTANA', 10))
+        return respuesta
+
+    def _clave_a_fijar(self, request, estado):
+        if estado.escribio or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            # El login cambia la sesión: la clave se recalcula con el usuario nuevo
+            return _clave_fijado(request)
+        return None
+
+
+# --- Marcar vistas de solo lectura ---
+def _activar_lectura(request):
+    estado = _estado.get()
+    if estado is not None and request.method in ('GET', 'HEAD'):
+        estado.lectura = True
+    return estado
+
+
+def lectura_en_replica(vista):
+    """
+    Decorador para vistas de solo lectura (sync o async). Va debajo de
+    @login_required, para que el usuario se cargue de la primaria.
+    """
+    if iscoroutinefunction(vista):
+        @functools.wraps(vista)
+        async def envoltura_async(request, *args, **kwargs):
+            # El estado viaja en el contexto hasta los hilos de sync_to_async
+            estado = _activar_lectura(request)
+            try:
+                return await vista(request, *args, **kwargs)
+            finally:
+                if estado is not None:
+                    estado.lectura = False
+        return envoltura_async
+
+    @functools.wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        estado = _activar_lectura(request)
+        try:
+            return vista(request, *args, **kwargs)
+        finally:
+            if estado is not None:
+                estado.lectura = False
+    return envoltura
+
+
+class LecturaEnReplicaMixin:
+    """
+    Para viewsets de DRF: las lecturas van a la réplica recién después de
+    autenticar (un token recién creado puede no estar en la réplica).
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        _activar_lectura(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        estado = _estado.get()
+        if estado is not None:
+            estado.lectura = False
+        return super().finalize_response(request, response, *args, **kwargs)
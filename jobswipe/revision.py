@@ -0,0 +1,94 @@
+from django.db import transaction
+
+from .feed import DECISIONES_MAXIMAS, DecisionInvalida
+from .models import Solicitud
+from .notificaciones import agendar_notificaciones_match
+from .relevancia import invalidar_colas, ordenar_pendientes_por_relevancia
+
+# -----------------------------------------------------------------
+# COLA DE REVISIÓN DEL EMPLEADOR
+# -----------------------------------------------------------------
+# Concurrencia optimista: el cliente decide sobre solicitudes que vio
+# como 'pendiente'. Al escribir solo se aplican las que SIGUEN
+# pendientes (bloqueadas dentro de la transacción); las demás vuelven
+# como conflicto, así dos reclutadores nunca procesan dos veces la
+# misma tarjeta.
+
+TAMANO_COLA = 10
+TAMANO_COLA_MAXIMO = 50
+ACCIONES = {'aceptar': 'aceptada', 'rechazar': 'rechazada'}
+
+
+def cola_pendiente(oferta, tamano=TAMANO_COLA, orden=None):
+    """
+    Próximas solicitudes pendientes de la oferta, en orden estable
+    (fecha de postulación, id) y con el perfil del candidato ya unido.
+    Con orden='relevancia' primero los candidatos más afines a la oferta.
+    """
+    tamano = max(1, min(tamano, TAMANO_COLA_MAXIMO))
+    pendientes = Solicitud.objects.filter(oferta=oferta, estado='pendiente').select_related('User_candidato__perfil')
+    if orden == 'relevancia':
+        # El orden viene de la caché: se saltan las que ya se decidieron desde entonces
+        ids = ordenar_pendientes_por_relevancia(oferta)
+        cola = []
+        for inicio in range(0, len(ids), TAMANO_COLA_MAXIMO):
+            tramo = ids[inicio:inicio + TAMANO_COLA_MAXIMO]
+            por_id = pendientes.in_bulk(tramo)
+            cola.extend(por_id[i] for i in tramo if i in por_id)
+            if len(cola) >= tamano:
+                break
+        return cola[:tamano]
+    return list(pendientes.order_by('fecha_postulacion', 'id')[:tamano])
+
+
+def serializar_candidato(solicitud):
+    candidato = solicitud.User_candidato
+    perfil = getattr(candidato, 'perfil', None)
+    return {
+        'solicitud': solicitud.id,
+        'fecha_postulacion': solicitud.fecha_postulacion.isoformat(),
+        'nombre': candidato.first_name,
+        'apellido': candidato.last_name,
+        'email': candidato.email,
+        'descripcion_profesional': perfil.descripcion_profesional if perfil else None,
+        'habilidades': perfil.habilidades if perfil else None,
+        'experiencia': perfil.experiencia if perfil else None,
+        'foto': perfil.foto_src if perfil and perfil.foto else None,
+        'foto_srcset': perfil.foto_srcset_webp if perfil and perfil.foto else None,
+    }
+
+
+def aplicar_decisiones(oferta, decisiones):
+    """
+    Aplica [{'solicitud': id, 'accion': 'aceptar'|'rechazar'}] con un solo bulk_update.
+    Los correos de match quedan encolados en la misma transacción.
+    Retorna (aplicadas, conflictos): listas de ids de solicitud.
+    """
+    # Mismo tope que los swipes en lote: acota las filas bloqueadas por transacción
+    if not isinstance(decisiones, list) or len(decisiones) > DECISIONES_MAXIMAS:
+        raise DecisionInvalida(f'Se esperaba una lista de hasta {DECISIONES_MAXIMAS} decisiones.')
+
+    estados = {}
+    for decision in decisiones:
+        try:
+            estados[int(decision['solicitud'])] = ACCIONES[decision['accion']]
+        except (KeyError, TypeError, ValueError):
+            raise DecisionInvalida(f'Decisión inválida: {decision!r}')
+
+    with transaction.atomic():
+        # skip_locked: si otro reclutador está decidiendo la misma fila, es un conflicto
+        pendientes = list(
+            Solicitud.objects.select_for_update(skip_locked=True)
+            .filter(oferta=oferta, estado='pendiente', id__in=estados)
+            .only('id', 'estado')
+        )
+        for solicitud in pendientes:
+            solicitud.estado = estados[solicitud.id]
+        Solicitud.objects.bulk_update(pendientes, ['estado'])
+        agendar_notificaciones_match([s.id for s in pendientes if s.estado == 'aceptada'])
+        if pendientes:
+            invalidar_colas([oferta.id])  # bulk_update no dispara señales
+
+    aplicadas = sorted(solicitud.id for solicitud in pendientes)
+    conflictos = sorted(set(estados) - set(aplicadas))
+    return aplicadas, conflictos
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    # Sala de chat en tiempo real (una por match)
+    path('ws/chat/<int:solicitud_id>/', consumers.ChatConsumer.as_asgi()),
+]
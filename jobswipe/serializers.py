@@ -1,7 +1,74 @@
 from rest_framework import serializers
-from .models import OfertaDeEmpleo
+from .models import Mensaje, OfertaDeEmpleo, Solicitud
 
-class OfertaSerializer(serializers.ModelSerializer):
+
+class CamposDinamicosMixin:
+    """
+    Sparse fieldsets: con context['campos'] = ['id', 'titulo'] el
+    serializer solo entrega esos campos (los desconocidos se ignoran).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = self.context.get('campos')
+        if campos:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+
+class OfertaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = OfertaDeEmpleo
-        fields = ['id', 'titulo', 'descripcion', 'categoria', 'fecha_publicacion', 'es_inclusion']
\ No newline at end of file
+        fields = [
+            'id', 'titulo', 'descripcion', 'categoria', 'fecha_publicacion', 'es_inclusion', 'moneda', 'sueldo',
+            'sueldo_normalizado',
+        ]
+
+
+# --- API móvil: postulaciones, matches y mensajes ---
+class SolicitudSerializer(serializers.ModelSerializer):
+    oferta_titulo = serializers.CharField(source='oferta.titulo', read_only=True)
+    candidato = serializers.IntegerField(source='User_candidato_id', read_only=True)
+    candidato_nombre = serializers.CharField(source='User_candidato.first_name', read_only=True)
+
+    class Meta:
+        model = Solicitud
+        fields = ['id', 'oferta', 'oferta_titulo', 'candidato', 'candidato_nombre', 'estado', 'fecha_postulacion']
+        read_only_fields = ['estado', 'fecha_postulacion']
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    """
+    El match visto por el usuario del request: la contraparte y SUS no leídos.
+    """
+    oferta_titulo = serializers.CharField(source='oferta.titulo', read_only=True)
+    contraparte = serializers.SerializerMethodField()
+    no_leidos = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Solicitud
+        fields = ['id', 'oferta', 'oferta_titulo', 'contraparte', 'no_leidos',
+                  'ultimo_mensaje_texto', 'ultimo_mensaje_fecha']
+
+    def _es_candidato(self, solicitud):
+        return self.context['request'].user.id == solicitud.User_candidato_id
+
+    def get_contraparte(self, solicitud):
+        if self._es_candidato(solicitud):
+            return solicitud.oferta.perfil_empleador.user.first_name
+        return solicitud.User_candidato.first_name
+
+    def get_no_leidos(self, solicitud):
+        if self._es_candidato(solicitud):
+            return solicitud.no_leidos_candidato
+        return solicitud.no_leidos_empleador
+
+
+class MensajeSerializer(serializers.ModelSerializer):
+    origen = serializers.IntegerField(source='User_origen_id', read_only=True)
+    destino = serializers.IntegerField(source='User_destino_id', read_only=True)
+
+    class Meta:
+        model = Mensaje
+        fields = ['id', 'origen', 'destino', 'contenido', 'fecha', 'leido']
+        read_only_fields = ['fecha', 'leido']
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+# -----------------------------------------------------------------
+# USUARIO + PERFIL DE CADA REQUEST, DESDE LA CACHÉ
+# -----------------------------------------------------------------
+# Casi todas las vistas y plantillas usan request.user.perfil. Con la
+# sesión en caché (cached_db) y este backend, AuthenticationMiddleware
+# resuelve el usuario junto con su Perfil (un JOIN) y lo guarda en la
+# caché: un request típico no consulta la base antes de la vista.
+# signals.py borra la entrada al guardar el User o el Perfil; quien los
+# cambie con .update() debe llamar a `invalidar_usuario`.
+# La verificación del hash de la sesión (cambio de contraseña) la sigue
+# haciendo django.contrib.auth con el usuario cacheado.
+# Solo con CACHE_COMPARTIDA (settings): con la caché en memoria de cada
+# worker, el borrado al cerrar sesión o editar el Perfil no llegaría a los
+# demás, que seguirían sirviendo (y guardando) el usuario viejo.
+
+
+def _clave(user_id):
+    return f'sesion:usuario:{user_id}'
+
+
+def invalidar_usuario(user_id):
+    # Después del commit: antes, otro request podría volver a cachear el usuario viejo
+    transaction.on_commit(lambda: cache.delete(_clave(user_id)))
+
+
+def usuario_con_perfil(user_id):
+    """
+    User con su Perfil ya cargado (user.perfil no hace otra consulta).
+    Sin caché compartida se lee siempre de la base.
+    """
+    if not getattr(settings, 'CACHE_COMPARTIDA', False):
+        return User.objects.select_related('perfil').filter(pk=user_id).first()
+    clave = _clave(user_id)
+    user = cache.get(clave)
+    if user is None:
+        user = User.objects.select_related('perfil').filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(clave, user, timeout=getattr(settings, 'SESION_USUARIO_TTL', 60 * 5))
+    return user
+
+
+class BackendConPerfil(ModelBackend):
+    """
+    ModelBackend que resuelve el usuario de la sesión con `usuario_con_perfil`.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user_id = User._meta.pk.to_python(user_id)
+        except ValidationError:
+            return None
+        user = usuario_con_perfil(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
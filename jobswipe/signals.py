@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .api import invalidar_api
+from .busqueda import obtener_backend
+from .dashboard import invalidar_empleador, tocar_ofertas
+from .imagenes import agendar_procesamiento
+from .models import CategoriaDeServicio, OfertaDeEmpleo, Perfil, Solicitud
+from .relevancia import invalidar_colas, invalidar_ofertas, invalidar_perfil
+from .sesiones import invalidar_usuario
+from .sueldos import actualizar_sueldo_normalizado
+
+# -----------------------------------------------------------------
+# MANTENCIÓN DEL ÍNDICE DE BÚSQUEDA
+# -----------------------------------------------------------------
+
+
+@receiver(post_save, sender=OfertaDeEmpleo)
+def indexar_oferta(sender, instance, raw=False, **kwargs):
+    if not raw:
+        obtener_backend().indexar(instance)
+
+
+@receiver(post_delete, sender=OfertaDeEmpleo)
+def desindexar_oferta(sender, instance, **kwargs):
+    obtener_backend().eliminar(instance.id)
+
+
+@receiver(post_save, sender=CategoriaDeServicio)
+def reindexar_categoria(sender, instance, created=False, raw=False, **kwargs):
+    # El nombre de la categoría también se busca
+    if created or raw:
+        return
+    backend = obtener_backend()
+    for oferta in instance.ofertadeempleo_set.select_related('categoria').iterator(chunk_size=500):
+        backend.indexar(oferta)
+
+
+# -----------------------------------------------------------------
+# INVALIDACIÓN DEL MOTOR DE RELEVANCIA
+# -----------------------------------------------------------------
+# Basta con subir la versión: el índice y los rankings viejos quedan
+# huérfanos en la caché y expiran solos.
+
+
+@receiver(post_save, sender=OfertaDeEmpleo)
+@receiver(post_delete, sender=OfertaDeEmpleo)
+@receiver(post_save, sender=CategoriaDeServicio)
+def invalidar_relevancia_ofertas(sender, **kwargs):
+    invalidar_ofertas()
+
+
+@receiver(post_save, sender=Perfil)
+def invalidar_relevancia_perfil(sender, instance, **kwargs):
+    invalidar_perfil(instance.user_id)
+
+
+@receiver(post_save, sender=Solicitud)
+@receiver(post_delete, sender=Solicitud)
+def invalidar_cola_relevancia(sender, instance, **kwargs):
+    invalidar_colas([instance.oferta_id])
+
+
+# -----------------------------------------------------------------
+# INVALIDACIÓN DE LA CACHÉ DE LA API DE OFERTAS
+# -----------------------------------------------------------------
+
+
+@receiver(post_save, sender=OfertaDeEmpleo)
+@receiver(post_delete, sender=OfertaDeEmpleo)
+def invalidar_api_ofertas(sender, **kwargs):
+    invalidar_api()
+
+
+# -----------------------------------------------------------------
+# FOTOS DE PERFIL: variantes fuera del request
+# -----------------------------------------------------------------
+
+
+@receiver(post_save, sender=Perfil)
+def procesar_foto_perfil(sender, instance, raw=False, **kwargs):
+    if raw or not instance.foto:
+        return
+    if (instance.foto_variantes or {}).get('origen') != instance.foto.name:
+        agendar_procesamiento(instance)
+
+
+# -----------------------------------------------------------------
+# CACHÉ DEL DASHBOARD Y FRAGMENTOS DE TARJETAS
+# -----------------------------------------------------------------
+# Guardar la oferta ya cambia la clave de su tarjeta (fecha_actualizacion);
+# los cambios en el nombre del empleador o de la categoría la "tocan".
+
+
+@receiver(post_save, sender=OfertaDeEmpleo)
+@receiver(post_delete, sender=OfertaDeEmpleo)
+def invalidar_dashboard_empleador(sender, instance, **kwargs):
+    invalidar_empleador(instance.perfil_empleador_id)
+
+
+@receiver(post_save, sender=CategoriaDeServicio)
+def tocar_ofertas_categoria(sender, instance, created=False, raw=False, **kwargs):
+    if not (created or raw):
+        tocar_ofertas(instance.ofertadeempleo_set.all())
+
+
+@receiver(pre_delete, sender=CategoriaDeServicio)
+def tocar_ofertas_categoria_eliminada(sender, instance, **kwargs):
+    # Al borrarla, sus ofertas quedan con categoría NULL sin pasar por save()
+    tocar_ofertas(instance.ofertadeempleo_set.all())
+
+
+@receiver(post_save, sender=User)
+def tocar_ofertas_empleador(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # El login guarda solo last_login: no cambia nada de la tarjeta
+    if created or raw or (update_fields is not None and 'first_name' not in update_fields):
+        return
+    tocar_ofertas(OfertaDeEmpleo.objects.filter(perfil_empleador__user=instance))
+
+
+# -----------------------------------------------------------------
+# USUARIO + PERFIL CACHEADOS PARA CADA REQUEST (sesiones.py)
+# -----------------------------------------------------------------
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario_cacheado(sender, instance, **kwargs):
+    invalidar_usuario(instance.id)
+
+
+@receiver(post_save, sender=Perfil)
+@receiver(post_delete, sender=Perfil)
+def invalidar_perfil_cacheado(sender, instance, **kwargs):
+    # elegir_rol_view y toggle_pcd_view guardan el perfil: el próximo request lo ve
+    invalidar_usuario(instance.user_id)
+
+
+# -----------------------------------------------------------------
+# SUELDO NORMALIZADO (sueldos.py)
+# -----------------------------------------------------------------
+
+
+@receiver(pre_save, sender=OfertaDeEmpleo)
+def normalizar_sueldo(sender, instance, raw=False, **kwargs):
+    if not raw:
+        actualizar_sueldo_normalizado(instance)
@@ -0,0 +1,104 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BigIntegerField, F, Value
+from django.db.models.functions import Cast, Round
+
+from .api import invalidar_api
+from .indicadores import obtener_indicadores_economicos
+from .models import OfertaDeEmpleo
+from .tareas import encolar, tarea
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------
+# SUELDO NORMALIZADO EN CLP
+# -----------------------------------------------------------------
+# sueldo_normalizado es el sueldo convertido a pesos con el dólar de la
+# caché de indicadores; está indexado, así filtrar y ordenar por sueldo
+# entre monedas es una sola consulta. Se calcula al guardar la oferta
+# (signals.py) y, cuando el dólar cambia, `recalcular_sueldos` reescribe
+# solo las ofertas en USD, por lotes de ids (un UPDATE por lote).
+
+CLAVE_TASA_APLICADA = 'sueldos:tasa_aplicada'
+TAMANO_LOTE = 2000
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+def tasa_dolar():
+    """
+    Dólar observado de la caché de indicadores (sin esperar a la red).
+    Sin dato se usa SUELDOS_DOLAR_RESPALDO; el recálculo corrige después.
+    """
+    indicadores = obtener_indicadores_economicos()
+    if indicadores and indicadores.get('dolar'):
+        return float(indicadores['dolar'])
+    return float(_config('SUELDOS_DOLAR_RESPALDO', 950))
+
+
+def en_clp(sueldo, moneda, tasa=None):
+    if sueldo is None:
+        return None
+    if moneda == 'USD':
+        return round(sueldo * (tasa or tasa_dolar()))
+    return sueldo
+
+
+def actualizar_sueldo_normalizado(oferta, tasa=None):
+    oferta.sueldo_normalizado = en_clp(oferta.sueldo, oferta.moneda, tasa)
+
+
+# --- Recálculo masivo ---
+def recalcular_sueldos(tasa=None, tamano=TAMANO_LOTE):
+    """
+    Reescribe sueldo_normalizado de las ofertas en USD con `tasa` (o el
+    dólar actual). Recorre por id sin cargar las filas: memoria constante
+    y transacciones cortas aunque haya millones de ofertas.
+    """
+    tasa = tasa or tasa_dolar()
+    usd = OfertaDeEmpleo.objects.filter(moneda='USD', sueldo__isnull=False).order_by('id')
+    convertido = Cast(Round(F('sueldo') * Value(tasa)), output_field=BigIntegerField())
+    ultimo, actualizadas = 0, 0
+    while True:
+        ids = list(usd.filter(id__gt=ultimo).values_list('id', flat=True)[:tamano])
+        if not ids:
+            break
+        actualizadas += OfertaDeEmpleo.objects.filter(id__in=ids).update(sueldo_normalizado=convertido)
+        ultimo = ids[-1]
+    cache.set(CLAVE_TASA_APLICADA, tasa, timeout=None)
+
+    invalidar_api()  # El UPDATE no pasa por las señales
+    return actualizadas
+
+
+def tasa_cambio_significativo(tasa):
+    """
+    True si `tasa` se aleja de la última aplicada más que SUELDOS_UMBRAL_CAMBIO.
+    """
+    aplicada = cache.get(CLAVE_TASA_APLICADA)
+    if aplicada is None:
+        return True
+    return abs(tasa - aplicada) / aplicada > _config('SUELDOS_UMBRAL_CAMBIO', 0.005)
+
+
+@tarea('recalcular_sueldos')
+def recalcular_sueldos_tarea(tasa):
+    recalcular_sueldos(tasa)
+
+
+def agendar_recalculo(tasa):
+    # Llamado al refrescar los indicadores: una tarea por valor del dólar y hora
+    if not tasa_cambio_significativo(tasa):
+        return False
+    try:
+        encolar('recalcular_sueldos', clave=f'sueldos:{tasa}:{int(time.time() // 3600)}', tasa=tasa)
+    except Exception:
+        # Sin base (p. ej. el comando corriendo aparte) el refresco de indicadores sigue igual
+        logger.exception('No se pudo agendar el recálculo de sueldos')
+        return False
+    return True
@@ -0,0 +1,178 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Tarea
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------
+# COLA DE TAREAS EN SEGUNDO PLANO (en la base de datos)
+# -----------------------------------------------------------------
+# Las vistas encolan efectos secundarios (correos, variantes de fotos,
+# reconstrucciones) con `encolar`, dentro de la misma transacción que
+# los datos: si el request falla, la tarea tampoco existe.
+# El comando `procesar_tareas` las reclama en lotes (SELECT ... FOR
+# UPDATE SKIP LOCKED, así varios workers no toman la misma) y las
+# ejecuta en un pool. Si una falla se reintenta con backoff exponencial
+# hasta max_intentos; después queda 'fallida' para revisarla.
+# Con TAREAS_SINCRONAS = True (tests) se ejecutan al hacer commit.
+
+REGISTRO = {}
+TAMANO_LOTE = 20
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+def tarea(nombre):
+    """
+    Registra una función como tarea: @tarea('notificar_match').
+    Los argumentos se guardan como JSON, así que deben ser ids y valores simples.
+    """
+    def registrar(funcion):
+        REGISTRO[nombre] = funcion
+        return funcion
+    return registrar
+
+
+def encolar(nombre, clave=None, retraso=0, max_intentos=5, **argumentos):
+    """
+    Agenda una tarea (un solo INSERT). Si ya existe una con la misma
+    `clave` no se crea otra: reintentos del cliente o eventos repetidos
+    no duplican el trabajo.
+    """
+    return encolar_muchas([(nombre, clave, argumentos)], retraso=retraso, max_intentos=max_intentos)
+
+
+def encolar_muchas(tareas, retraso=0, max_intentos=5):
+    """
+    Igual que `encolar` para varias tareas [(nombre, clave, argumentos)] en un solo INSERT.
+    """
+    if not tareas:
+        return 0
+    ejecutar_despues = timezone.now() + timedelta(seconds=retraso)
+    for nombre, _, _ in tareas:
+        if nombre not in REGISTRO:
+            raise ValueError(f'Tarea no registrada: {nombre}')
+    Tarea.objects.bulk_create(
+        [Tarea(nombre=nombre, clave=clave, argumentos=argumentos,
+               ejecutar_despues=ejecutar_despues, max_intentos=max_intentos)
+         for nombre, clave, argumentos in tareas],
+        ignore_conflicts=True,
+    )
+    if _config('TAREAS_SINCRONAS', False):
+        transaction.on_commit(procesar_pendientes)
+    return len(tareas)
+
+
+def espera_reintento(intentos):
+    """
+    Backoff exponencial con jitter: 10s, 20s, 40s... (máximo 1 hora).
+    """
+    base = _config('TAREAS_BACKOFF_BASE', 10)
+    espera = min(base * 2 ** (intentos - 1), _config('TAREAS_BACKOFF_MAXIMO', 60 * 60))
+    return espera * random.uniform(1.0, 1.1)
+
+
+def reclamar_lote(tamano=TAMANO_LOTE):
+    """
+    Marca como 'en_proceso' hasta `tamano` tareas listas para ejecutarse
+    (o abandonadas por un worker caído) y retorna sus ids.
+    """
+    ahora = timezone.now()
+    bloqueo = timedelta(seconds=_config('TAREAS_BLOQUEO', 60 * 5))
+    with transaction.atomic():
+        ids = list(
+            Tarea.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(estado='pendiente', ejecutar_despues__lte=ahora) |
+                Q(estado='en_proceso', bloqueada_hasta__lt=ahora)
+            )
+            .order_by('ejecutar_despues', 'id')
+            .values_list('id', flat=True)[:tamano]
+        )
+        if ids:
+            Tarea.objects.filter(id__in=ids).update(estado='en_proceso', bloqueada_hasta=ahora + bloqueo)
+    return ids
+
+
+def ejecutar(tarea_id):
+    """
+    Ejecuta una tarea ya reclamada y registra el resultado.
+    Retorna el estado final ('completada', 'pendiente' si se reintentará, o 'fallida').
+    """
+    tarea = Tarea.objects.get(id=tarea_id)
+    tarea.intentos += 1
+    try:
+        funcion = REGISTRO[tarea.nombre]
+    except KeyError:
+        tarea.estado, tarea.ultimo_error = 'fallida', f'Tarea no registrada: {tarea.nombre}'
+    else:
+        try:
+            funcion(**tarea.argumentos)
+        except Exception:
+            logger.exception('Falló la tarea %s', tarea)
+            tarea.ultimo_error = traceback.format_exc()[-4000:]
+            if tarea.intentos >= tarea.max_intentos:
+                tarea.estado = 'fallida'
+            else:
+                tarea.estado = 'pendiente'
+                tarea.ejecutar_despues = timezone.now() + timedelta(seconds=espera_reintento(tarea.intentos))
+        else:
+            tarea.estado, tarea.ultimo_error = 'completada', ''
+    tarea.bloqueada_hasta = None
+    tarea.save(update_fields=[
+        'estado', 'intentos', 'ejecutar_despues', 'bloqueada_hasta', 'ultimo_error', 'actualizada'
+    ])
+    return tarea.estado
+
+
+def procesar_pendientes(tamano=TAMANO_LOTE):
+    """
+    Ejecuta en este hilo todo lo que esté listo (modo síncrono y tests).
+    """
+    procesadas = 0
+    while True:
+        ids = reclamar_lote(tamano)
+        if not ids:
+            return procesadas
+        for tarea_id in ids:
+            ejecutar(tarea_id)
+        procesadas += len(ids)
+
+
+def purgar_completadas(dias=7):
+    limite = timezone.now() - timedelta(days=dias)
+    borradas, _ = Tarea.objects.filter(estado='completada', actualizada__lt=limite).delete()
+    return borradas
+
+
+def resumen_cola():
+    """
+    Profundidad de la cola por tarea y estado, para el panel de staff.
+    """
+    ahora = timezone.now()
+    por_tarea = (
+        Tarea.objects.exclude(estado='completada')
+        .values('nombre')
+        .annotate(
+            pendientes=Count('id', filter=Q(estado='pendiente', ejecutar_despues__lte=ahora)),
+            programadas=Count('id', filter=Q(estado='pendiente', ejecutar_despues__gt=ahora)),
+            en_proceso=Count('id', filter=Q(estado='en_proceso')),
+            fallidas=Count('id', filter=Q(estado='fallida')),
+            mas_antigua=Min('ejecutar_despues', filter=Q(estado='pendiente', ejecutar_despues__lte=ahora)),
+        )
+        .order_by('nombre')
+    )
+    return [
+        {**fila, 'espera': (ahora - fila['mas_antigua']) if fila['mas_antigua'] else None}
+        for fila in por_tarea
+    ]
@@ -1,3 +1,1882 @@
-from django.test import TestCase
+import io
+import json
+import os
+import random
+import runpy
+import socket
+import tempfile
+from io import StringIO
+import threading
+import time
+import types
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from PIL import Image
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import benchmark, chat, imagenes, indicadores, metricas, relevancia, replicas, sesiones, sueldos, tareas, vistas_async
+from .api import MensajesThrottle
+from .imagenes import servir_media
+from .busqueda import buscar_ofertas, filtrar_ofertas
+from .feed import DECISIONES_MAXIMAS, obtener_lote, ofertas_disponibles
+from .revision import aplicar_decisiones, cola_pendiente, serializar_candidato
+from .routing import websocket_urlpatterns
+from .models import CategoriaDeServicio, Mensaje, OfertaDeEmpleo, Perfil, Solicitud, Tarea
+from prjJobSwipe import basedatos
+
+# Lo que activa REDIS_URL (settings); en los tests la LocMemCache hace de caché compartida
+CACHE_COMPARTIDA = dict(
+    CACHE_COMPARTIDA=True,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTHENTICATION_BACKENDS=['jobswipe.sesiones.BackendConPerfil', 'django.contrib.auth.backends.ModelBackend'],
+)
+
+
+# -----------------------------------------------------------------
+# INDICADORES ECONÓMICOS (contra un servidor local de prueba)
+# -----------------------------------------------------------------
+
+class _StubMindicador(BaseHTTPRequestHandler):
+    respuesta = {'uf': {'valor': 39000.5}, 'dolar': {'valor': 950.1}, 'euro': {'valor': 1030.2}}
+    status = 200
+    demora = 0
+    llamadas = 0
+
+    def do_GET(self):
+        type(self).llamadas += 1
+        time.sleep(type(self).demora)
+        cuerpo = json.dumps(type(self).respuesta).encode()
+        self.send_response(type(self).status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        try:
+            self.wfile.write(cuerpo)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # El cliente cortó por timeout
+
+    def log_message(self, *args):
+        pass
+
+
+class IndicadoresTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), _StubMindicador)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.servidor.server_port}/api'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        # Refrescos lanzados por tests anteriores (vistas con la caché vacía) podrían
+        # registrar sus fallos en el circuito de estos tests
+        for hilo in threading.enumerate():
+            if hilo.name == 'refresco-indicadores':
+                hilo.join(10)
+        cache.clear()
+        _StubMindicador.status = 200
+        _StubMindicador.demora = 0
+        _StubMindicador.llamadas = 0
+        ajustes = override_settings(
+            INDICADORES_API_URL=self.url,
+            INDICADORES_TIMEOUT=(0.5, 0.5),
+            INDICADORES_REFRESCO_EN_SEGUNDO_PLANO=False,
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def test_refrescar_guarda_en_cache(self):
+        valores = indicadores.refrescar_indicadores()
+        self.assertEqual(valores, {'uf': 39000.5, 'dolar': 950.1, 'euro': 1030.2})
+        self.assertEqual(indicadores.obtener_indicadores_economicos(), valores)
+        self.assertEqual(_StubMindicador.llamadas, 1)
+
+    def test_sin_cache_no_espera_a_la_red(self):
+        self.assertIsNone(indicadores.obtener_indicadores_economicos())
+        self.assertEqual(_StubMindicador.llamadas, 0)
+
+    def test_dato_vencido_se_sigue_sirviendo(self):
+        indicadores.refrescar_indicadores()
+        _StubMindicador.status = 500
+        with self.settings(INDICADORES_TTL=-1):
+            self.assertEqual(indicadores.obtener_indicadores_economicos()['uf'], 39000.5)
+            self.assertIsNone(indicadores.refrescar_indicadores())
+            self.assertEqual(indicadores.obtener_indicadores_economicos()['uf'], 39000.5)
+
+    def test_timeout_duro(self):
+        _StubMindicador.demora = 2
+        inicio = time.monotonic()
+        self.assertIsNone(indicadores.refrescar_indicadores())
+        self.assertLess(time.monotonic() - inicio, 1.5)
+
+    @override_settings(INDICADORES_REFRESCO_EN_SEGUNDO_PLANO=True)
+    def test_el_hilo_de_refresco_cierra_su_conexion(self):
+        with mock.patch('jobswipe.indicadores.refrescar_indicadores') as refrescar, \
+                mock.patch('jobswipe.indicadores.connections') as conexiones:
+            indicadores._refrescar_en_segundo_plano()
+            for hilo in threading.enumerate():
+                if hilo.name == 'refresco-indicadores':
+                    hilo.join(5)
+        refrescar.assert_called_once()
+        conexiones.close_all.assert_called_once()
+        self.assertIsNone(cache.get(indicadores.CLAVE_BLOQUEO))
+
+    def test_circuito_se_abre_tras_fallos(self):
+        _StubMindicador.status = 500
+        for _ in range(3):
+            indicadores.refrescar_indicadores()
+        self.assertEqual(_StubMindicador.llamadas, 3)
+
+        _StubMindicador.status = 200
+        self.assertIsNone(indicadores.refrescar_indicadores())
+        self.assertEqual(_StubMindicador.llamadas, 3)
+
+
+# -----------------------------------------------------------------
+# FEED DE OFERTAS (keyset)
+# -----------------------------------------------------------------
+
+class FeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        empleador = User.objects.create_user('empresa', password='x')
+        cls.perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        cls.perfil = Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        cls.ofertas = [
+            OfertaDeEmpleo.objects.create(
+                perfil_empleador=cls.perfil_empleador,
+                titulo=f'Oferta {i}',
+                es_inclusion=(i % 3 == 0),
+            )
+            for i in range(25)
+        ]
+        OfertaDeEmpleo.objects.create(perfil_empleador=cls.perfil_empleador, titulo='Cerrada', estado='cerrada')
+        Solicitud.objects.create(oferta=cls.ofertas[5], User_candidato=cls.candidato)
+
+    def _recorrer(self, tamano=7):
+        vistas, cursor = [], None
+        while True:
+            lote, cursor = obtener_lote(self.candidato, self.perfil, cursor=cursor, tamano=tamano)
+            vistas.extend(lote)
+            if cursor is None:
+                return vistas
+
+    def test_recorre_todo_sin_repetir_ni_postuladas(self):
+        vistas = self._recorrer()
+        ids = [o.id for o in vistas]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), {o.id for o in self.ofertas} - {self.ofertas[5].id})
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_orden_ley_21015_para_pcd(self):
+        self.perfil.es_pcd = True
+        vistas = self._recorrer(tamano=4)
+        claves = [(o.es_inclusion, o.fecha_publicacion, o.id) for o in vistas]
+        self.assertEqual(claves, sorted(claves, reverse=True))
+        self.assertTrue(all(o.es_inclusion for o in vistas[:8]))
+        self.perfil.es_pcd = False
+
+    def test_endpoint_json(self):
+        self.client.force_login(self.candidato)
+        datos = self.client.get(reverse('feed_ofertas'), {'tamano': 10}).json()
+        self.assertEqual(len(datos['ofertas']), 10)
+        siguiente = self.client.get(reverse('feed_ofertas'), {'cursor': datos['siguiente']}).json()
+        self.assertNotIn(siguiente['ofertas'][0]['id'], [o['id'] for o in datos['ofertas']])
+
+        respuesta = self.client.get(reverse('feed_ofertas'), {'cursor': 'basura'})
+        self.assertEqual(respuesta.status_code, 400)
+
+
+# -----------------------------------------------------------------
+# ÍNDICES: cada consulta frecuente de las vistas debe usar un índice
+# -----------------------------------------------------------------
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN es propio de SQLite')
+class IndicesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        empleador = User.objects.create_user('empresa', password='x')
+        cls.perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        cls.perfil = Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        cls.oferta = OfertaDeEmpleo.objects.create(perfil_empleador=cls.perfil_empleador, titulo='Dev')
+        cls.solicitud = Solicitud.objects.create(oferta=cls.oferta, User_candidato=cls.candidato)
+
+    def assertUsaIndice(self, queryset, indice):
+        plan = queryset.explain()
+        self.assertIn(indice, plan, plan)
+        self.assertNotIn('TEMP B-TREE', plan, plan)
+
+    def test_feed_candidato(self):
+        self.assertUsaIndice(ofertas_disponibles(self.candidato).order_by('-fecha_publicacion', '-id'),
+                             'oferta_estado_fecha_idx')
+        self.assertUsaIndice(
+            ofertas_disponibles(self.candidato).order_by('-es_inclusion', '-fecha_publicacion', '-id'),
+            'oferta_estado_inclusion_idx',
+        )
+
+    def test_ofertas_del_empleador(self):
+        self.assertUsaIndice(
+            OfertaDeEmpleo.objects.filter(perfil_empleador=self.perfil_empleador).order_by('-fecha_publicacion'),
+            'oferta_empleador_fecha_idx',
+        )
+
+    def test_solicitudes(self):
+        self.assertUsaIndice(
+            Solicitud.objects.filter(oferta=self.oferta, estado='pendiente').order_by('fecha_postulacion'),
+            'solicitud_pendiente_idx',
+        )
+        self.assertUsaIndice(
+            Solicitud.objects.filter(oferta=self.oferta, estado='aceptada'),
+            'solicitud_oferta_estado_idx',
+        )
+        self.assertUsaIndice(
+            Solicitud.objects.filter(User_candidato=self.candidato, estado='aceptada'),
+            'solicitud_candidato_estado_idx',
+        )
+
+    def test_mensajes_del_chat(self):
+        self.assertUsaIndice(Mensaje.objects.filter(solicitud=self.solicitud).order_by('fecha'),
+                             'mensaje_solicitud_fecha_idx')
+
+    def test_bandeja_de_matches(self):
+        self.assertUsaIndice(chat.matches_de(self.candidato), 'solicitud_cand_actividad_idx')
+        # Empleador: por oferta con el índice; el orden entre sus ofertas se mezcla al final
+        plan = chat.matches_de(self.perfil_empleador.user).explain()
+        self.assertIn('solicitud_oferta_actividad_idx', plan, plan)
+
+
+# -----------------------------------------------------------------
+# PRESUPUESTO DE CONSULTAS POR VISTA (sin N+1)
+# -----------------------------------------------------------------
+
+class PresupuestoDeConsultasMixin:
+    """
+    Falla si una vista supera `presupuesto` consultas, o si el número
+    de consultas crece con la cantidad de filas (N+1).
+    """
+
+    def contar_consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(consultas)
+
+    def assertPresupuesto(self, url, presupuesto, crecer):
+        # Se mide con la caché caliente (sesión y usuario cacheados), como en producción
+        self.client.get(url)
+        pocas = self.contar_consultas(url)
+        crecer()
+        muchas = self.contar_consultas(url)
+        self.assertLessEqual(muchas, presupuesto, f'{url}: {muchas} consultas (máx. {presupuesto})')
+        self.assertEqual(pocas, muchas, f'{url}: las consultas crecen con las filas ({pocas} -> {muchas})')
+
+
+class PresupuestoDeConsultasTests(PresupuestoDeConsultasMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = CategoriaDeServicio.objects.create(nombre='TI')
+        empleador = User.objects.create_user('empresa', password='x', first_name='Acme')
+        cls.empleador = empleador
+        cls.perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x', first_name='Ana')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        cls.oferta = cls._crear_ofertas(1)[0]
+
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def _crear_ofertas(cls, n):
+        return [
+            OfertaDeEmpleo.objects.create(
+                perfil_empleador=cls.perfil_empleador, titulo=f'Oferta {i}',
+                descripcion='Descripción ' * 10, categoria=cls.categoria, sueldo=1000,
+            )
+            for i in range(n)
+        ]
+
+    def _crear_matches(self, n):
+        for i in range(n):
+            otro = User.objects.create_user(f'c{i}', password='x')
+            Perfil.objects.create(user=otro, tipo='candidato')
+            oferta = OfertaDeEmpleo.objects.create(perfil_empleador=self.perfil_empleador, titulo=f'M{i}')
+            Solicitud.objects.create(oferta=oferta, User_candidato=otro, estado='aceptada')
+            Solicitud.objects.create(oferta=oferta, User_candidato=self.candidato, estado='aceptada')
+
+    def test_home_candidato(self):
+        self.client.force_login(self.candidato)
+        self.assertPresupuesto(reverse('home'), 4, lambda: self._crear_ofertas(15))
+
+    @override_settings(CACHE_DASHBOARD_TTL=0)  # La lista del empleador sin caché (el peor caso)
+    def test_home_empleador(self):
+        self.client.force_login(self.empleador)
+        self.assertPresupuesto(reverse('home'), 4, lambda: self._crear_ofertas(15))
+
+    def test_matches_candidato(self):
+        self.client.force_login(self.candidato)
+        self.assertPresupuesto(reverse('matches'), 4, lambda: self._crear_matches(5))
+
+    def test_matches_empleador(self):
+        self.client.force_login(self.empleador)
+        self.assertPresupuesto(reverse('matches'), 4, lambda: self._crear_matches(5))
+
+    def test_revisar_candidatos(self):
+        self.client.force_login(self.empleador)
+        url = reverse('revisar_candidatos', args=[self.oferta.id])
+
+        def crecer():
+            for i in range(5):
+                otro = User.objects.create_user(f'r{i}', password='x')
+                Perfil.objects.create(user=otro, tipo='candidato', habilidades='python')
+                Solicitud.objects.create(oferta=self.oferta, User_candidato=otro)
+
+        self.assertPresupuesto(url, 5, crecer)
+
+    def test_chat(self):
+        solicitud = Solicitud.objects.create(oferta=self.oferta, User_candidato=self.candidato, estado='aceptada')
+        self.client.force_login(self.candidato)
+
+        def crecer():
+            for i in range(10):
+                Mensaje.objects.create(solicitud=solicitud, User_origen=self.candidato,
+                                       User_destino=self.empleador, contenido=f'Hola {i}')
+
+        self.assertPresupuesto(reverse('chat', args=[solicitud.id]), 5, crecer)
+
+
+# -----------------------------------------------------------------
+# CHAT EN TIEMPO REAL (WebSocket sobre el channel layer en memoria)
+# -----------------------------------------------------------------
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ChatWebSocketTests(TransactionTestCase):
+
+    def setUp(self):
+        self.empleador = User.objects.create_user('empresa', password='x')
+        perfil_empleador = Perfil.objects.create(user=self.empleador, tipo='empleador')
+        self.candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=self.candidato, tipo='candidato')
+        self.intruso = User.objects.create_user('intruso', password='x')
+        oferta = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Dev')
+        self.solicitud = Solicitud.objects.create(oferta=oferta, User_candidato=self.candidato, estado='aceptada')
+
+    def _conectar(self, user):
+        comunicador = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/chat/{self.solicitud.id}/')
+        comunicador.scope['user'] = user
+        return comunicador
+
+    def test_mensaje_llega_a_ambos_con_ack_y_leido(self):
+        async def flujo():
+            candidato = self._conectar(self.candidato)
+            empleador = self._conectar(self.empleador)
+            self.assertTrue((await candidato.connect())[0])
+            self.assertTrue((await empleador.connect())[0])
+
+            await candidato.send_json_to({'tipo': 'mensaje', 'contenido': 'Hola', 'id_cliente': 'a1'})
+            ack = await candidato.receive_json_from()
+            self.assertEqual(ack['tipo'], 'ack')
+            self.assertEqual(ack['id_cliente'], 'a1')
+
+            recibido = await empleador.receive_json_from()
+            self.assertEqual(recibido['tipo'], 'mensaje')
+            self.assertEqual(recibido['mensaje']['contenido'], 'Hola')
+            self.assertTrue(await candidato.receive_nothing())
+
+            await empleador.send_json_to({'tipo': 'leido', 'hasta': recibido['mensaje']['id']})
+            aviso = await candidato.receive_json_from()
+            self.assertEqual(aviso, {'tipo': 'leidos', 'lector': self.empleador.id,
+                                     'hasta': recibido['mensaje']['id']})
+
+            await candidato.disconnect()
+            await empleador.disconnect()
+
+        async_to_sync(flujo)()
+        self.assertTrue(Mensaje.objects.get(contenido='Hola').leido)
+
+    def test_rechaza_a_quien_no_participa(self):
+        async def flujo():
+            intruso = self._conectar(self.intruso)
+            conectado, codigo = await intruso.connect()
+            self.assertFalse(conectado)
+            self.assertEqual(codigo, 4403)
+
+        async_to_sync(flujo)()
+
+
+# -----------------------------------------------------------------
+# HISTORIAL DEL CHAT (cursor + ETag)
+# -----------------------------------------------------------------
+
+class HistorialChatTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleador = User.objects.create_user('empresa', password='x')
+        perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        oferta = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Dev')
+        cls.solicitud = Solicitud.objects.create(oferta=oferta, User_candidato=cls.candidato, estado='aceptada')
+        cls.mensajes = [
+            Mensaje.objects.create(solicitud=cls.solicitud, User_origen=cls.empleador,
+                                   User_destino=cls.candidato, contenido=f'm{i}')
+            for i in range(45)
+        ]
+        cls.url = reverse('chat_mensajes', args=[cls.solicitud.id])
+
+    def setUp(self):
+        self.client.force_login(self.candidato)
+
+    def test_pagina_reciente_y_anteriores(self):
+        datos = self.client.get(self.url).json()
+        ids = [m['id'] for m in datos['mensajes']]
+        self.assertEqual(ids, [m.id for m in self.mensajes[-30:]])
+        self.assertTrue(datos['hay_mas'])
+
+        anteriores = self.client.get(self.url, {'antes': ids[0]}).json()
+        self.assertEqual([m['id'] for m in anteriores['mensajes']], [m.id for m in self.mensajes[:15]])
+        self.assertFalse(anteriores['hay_mas'])
+
+    def test_polling_incremental_con_etag(self):
+        ultimo = self.mensajes[-1].id
+        respuesta = self.client.get(self.url, {'despues': ultimo})
+        self.assertEqual(respuesta.json()['mensajes'], [])
+
+        with CaptureQueriesContext(connection) as consultas:
+            sin_cambios = self.client.get(self.url, {'despues': ultimo}, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(sin_cambios.status_code, 304)
+        # La huella sale del resumen de la Solicitud, sin recorrer los mensajes
+        self.assertFalse([q for q in consultas if 'jobswipe_mensaje' in q['sql']])
+
+        nuevo = chat.crear_mensaje(self.solicitud, self.empleador, self.candidato, 'nuevo')
+        con_cambios = self.client.get(self.url, {'despues': ultimo}, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(con_cambios.status_code, 200)
+        self.assertEqual([m['id'] for m in con_cambios.json()['mensajes']], [nuevo.id])
+
+    def test_solo_participantes(self):
+        intruso = User.objects.create_user('intruso', password='x')
+        Perfil.objects.create(user=intruso, tipo='candidato')
+        self.client.force_login(intruso)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+# -----------------------------------------------------------------
+# RESUMEN DEL CHAT (no leídos y último mensaje por match)
+# -----------------------------------------------------------------
+
+class ResumenChatTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleador = User.objects.create_user('empresa', password='x')
+        perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        oferta = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Dev')
+        cls.solicitud = Solicitud.objects.create(oferta=oferta, User_candidato=cls.candidato, estado='aceptada')
+
+    def _resumen(self):
+        return Solicitud.objects.values(
+            'no_leidos_candidato', 'no_leidos_empleador', 'ultimo_mensaje_id', 'ultimo_mensaje_texto'
+        ).get(id=self.solicitud.id)
+
+    def test_contadores_al_crear_y_leer(self):
+        chat.crear_mensaje(self.solicitud, self.empleador, self.candidato, 'Hola')
+        chat.crear_mensaje(self.solicitud, self.empleador, self.candidato, '¿Cuándo puedes?')
+        ultimo = chat.crear_mensaje(self.solicitud, self.candidato, self.empleador, 'Mañana ' * 30)
+
+        resumen = self._resumen()
+        self.assertEqual(resumen['no_leidos_candidato'], 2)
+        self.assertEqual(resumen['no_leidos_empleador'], 1)
+        self.assertEqual(resumen['ultimo_mensaje_id'], ultimo.id)
+        self.assertEqual(len(resumen['ultimo_mensaje_texto']), 120)
+
+        self.assertEqual(chat.marcar_leidos(self.solicitud.id, self.candidato), 2)
+        self.assertEqual(self._resumen()['no_leidos_candidato'], 0)
+        self.assertEqual(self._resumen()['no_leidos_empleador'], 1)
+
+    def test_reconstruir_desde_cero(self):
+        chat.crear_mensaje(self.solicitud, self.empleador, self.candidato, 'Hola')
+        ultimo = chat.crear_mensaje(self.solicitud, self.candidato, self.empleador, 'Chao')
+        esperado = self._resumen()
+        Solicitud.objects.update(no_leidos_candidato=9, no_leidos_empleador=9,
+                                 ultimo_mensaje=None, ultimo_mensaje_texto='')
+
+        call_command('reconstruir_resumenes_chat', stdout=StringIO())
+        self.assertEqual(self._resumen(), esperado)
+        self.assertEqual(esperado['ultimo_mensaje_id'], ultimo.id)
+
+
+# -----------------------------------------------------------------
+# SWIPES EN LOTE
+# -----------------------------------------------------------------
+
+class SwipesLoteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        empleador = User.objects.create_user('empresa', password='x')
+        perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        cls.perfil = Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        cls.ofertas = [
+            OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo=f'Oferta {i}')
+            for i in range(8)
+        ]
+        cls.cerrada = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='X', estado='cerrada')
+
+    def _enviar(self, datos):
+        return self.client.post(reverse('swipes_lote'), json.dumps(datos), content_type='application/json')
+
+    def test_postula_descarta_y_devuelve_siguientes(self):
+        self.client.force_login(self.candidato)
+        o = self.ofertas
+        respuesta = self._enviar({'tamano': 10, 'decisiones': [
+            {'oferta': o[0].id, 'accion': 'postular'},
+            {'oferta': o[1].id, 'accion': 'postular'},
+            {'oferta': o[2].id, 'accion': 'descartar'},
+            {'oferta': self.cerrada.id, 'accion': 'postular'},
+        ]}).json()
+
+        self.assertEqual(respuesta['postuladas'], [o[0].id, o[1].id])
+        self.assertEqual(respuesta['descartadas'], [o[2].id])
+        self.assertEqual({t['id'] for t in respuesta['ofertas']}, {x.id for x in o[3:]})
+        self.assertEqual(Solicitud.objects.filter(User_candidato=self.candidato).count(), 2)
+
+        # Reintento del mismo lote: no duplica ni falla
+        repetida = self._enviar({'tamano': 0, 'decisiones': [{'oferta': o[0].id, 'accion': 'postular'}]})
+        self.assertEqual(repetida.status_code, 200)
+        self.assertNotIn('ofertas', repetida.json())
+        self.assertEqual(Solicitud.objects.filter(User_candidato=self.candidato).count(), 2)
+
+        lote, _ = obtener_lote(self.candidato, self.perfil)
+        self.assertNotIn(o[2].id, [x.id for x in lote])
+
+    def test_siguientes_con_filtros(self):
+        categoria = CategoriaDeServicio.objects.create(nombre='TI')
+        o = self.ofertas
+        OfertaDeEmpleo.objects.filter(id__in=[o[4].id, o[6].id]).update(categoria=categoria)
+        self.client.force_login(self.candidato)
+
+        respuesta = self._enviar({'tamano': 10, 'filtros': {'categoria': categoria.id}, 'decisiones': [
+            {'oferta': o[4].id, 'accion': 'descartar'},
+        ]}).json()
+        self.assertEqual([t['id'] for t in respuesta['ofertas']], [o[6].id])
+
+        # Sin "filtros" en el cuerpo valen los del query string, como en feed_ofertas_view
+        respuesta = self.client.post(
+            reverse('swipes_lote') + f'?categoria={categoria.id}',
+            json.dumps({'tamano': 10, 'decisiones': []}), content_type='application/json',
+        ).json()
+        self.assertEqual([t['id'] for t in respuesta['ofertas']], [o[6].id])
+        self.assertEqual(self._enviar({'filtros': ['categoria'], 'decisiones': []}).status_code, 400)
+
+    def test_decision_invalida(self):
+        self.client.force_login(self.candidato)
+        respuesta = self._enviar({'decisiones': [{'oferta': self.ofertas[0].id, 'accion': 'superlike'}]})
+        self.assertEqual(respuesta.status_code, 400)
+
+
+# -----------------------------------------------------------------
+# COLA DE REVISIÓN DEL EMPLEADOR
+# -----------------------------------------------------------------
+
+class ColaRevisionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleador = User.objects.create_user('empresa', password='x')
+        perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cls.oferta = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Dev')
+        cls.solicitudes = []
+        for i in range(6):
+            candidato = User.objects.create_user(f'c{i}', password='x', first_name=f'C{i}')
+            Perfil.objects.create(user=candidato, tipo='candidato', habilidades='python')
+            cls.solicitudes.append(Solicitud.objects.create(oferta=cls.oferta, User_candidato=candidato))
+
+    def setUp(self):
+        self.client.force_login(self.empleador)
+
+    def _decidir(self, decisiones):
+        return self.client.post(
+            reverse('decisiones_revision', args=[self.oferta.id]),
+            json.dumps({'decisiones': decisiones}), content_type='application/json'
+        )
+
+    def test_cola_ordenada_con_perfiles_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            cola = cola_pendiente(self.oferta, tamano=4)
+            datos = [serializar_candidato(s) for s in cola]
+        self.assertEqual([d['solicitud'] for d in datos], [s.id for s in self.solicitudes[:4]])
+        self.assertEqual(datos[0]['habilidades'], 'python')
+
+    def test_decisiones_en_lote_sin_doble_proceso(self):
+        s = self.solicitudes
+        primera = self._decidir([{'solicitud': s[0].id, 'accion': 'aceptar'},
+                                 {'solicitud': s[1].id, 'accion': 'rechazar'}]).json()
+        self.assertEqual(primera, {'aplicadas': [s[0].id, s[1].id], 'conflictos': []})
+
+        # Otro reclutador con la misma cola en pantalla
+        segunda = self._decidir([{'solicitud': s[0].id, 'accion': 'rechazar'},
+                                 {'solicitud': s[2].id, 'accion': 'aceptar'}]).json()
+        self.assertEqual(segunda, {'aplicadas': [s[2].id], 'conflictos': [s[0].id]})
+
+        s[0].refresh_from_db()
+        self.assertEqual(s[0].estado, 'aceptada')
+        datos = self.client.get(reverse('cola_revision', args=[self.oferta.id])).json()
+        self.assertEqual([c['solicitud'] for c in datos['candidatos']], [x.id for x in s[3:]])
+
+    def test_tope_de_decisiones_por_request(self):
+        decisiones = [{'solicitud': self.solicitudes[0].id, 'accion': 'aceptar'}] * (DECISIONES_MAXIMAS + 1)
+        with self.assertNumQueries(4):  # sesión, usuario, oferta y perfil: nada se bloquea ni se escribe
+            respuesta = self._decidir(decisiones)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(self._decidir({'solicitud': 1}).status_code, 400)
+        self.assertFalse(Solicitud.objects.exclude(estado='pendiente').exists())
+
+
+# -----------------------------------------------------------------
+# BÚSQUEDA DE TEXTO COMPLETO
+# -----------------------------------------------------------------
+
+class BusquedaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        empleador = User.objects.create_user('empresa', password='x', first_name='Acme')
+        perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        cls.ti = CategoriaDeServicio.objects.create(nombre='Tecnología')
+
+        def crear(titulo, descripcion='', **extra):
+            return OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo=titulo,
+                                                 descripcion=descripcion, **extra)
+
+        cls.dev = crear('Desarrollador Python', 'Django y APIs REST', categoria=cls.ti, sueldo=1500000)
+        cls.data = crear('Analista de datos', 'Python, SQL y visualización', moneda='USD', sueldo=3000)
+        cls.chef = crear('Cocinero', 'Cocina chilena', es_inclusion=True)
+        cls.cerrada = crear('Python senior', estado='cerrada')
+
+    def test_ranking_titulo_sobre_descripcion(self):
+        resultado = list(buscar_ofertas('python'))
+        self.assertEqual(resultado, [self.dev, self.data])
+
+    def test_sin_acentos_y_por_prefijo(self):
+        self.assertEqual(list(buscar_ofertas('tecnologia')), [self.dev])
+        self.assertEqual(list(buscar_ofertas('desarroll')), [self.dev])
+
+    def test_filtros(self):
+        ofertas = filtrar_ofertas(OfertaDeEmpleo.objects.filter(estado='activa'), {'moneda': 'USD'})
+        self.assertEqual(list(buscar_ofertas('python', ofertas)), [self.data])
+        ofertas = filtrar_ofertas(OfertaDeEmpleo.objects.filter(estado='activa'), {'es_inclusion': '1'})
+        self.assertEqual(list(ofertas), [self.chef])
+
+    def test_indice_se_mantiene_al_editar_y_borrar(self):
+        self.chef.titulo = 'Cocinero Python'
+        self.chef.save()
+        self.assertIn(self.chef, buscar_ofertas('python'))
+        self.dev.delete()
+        self.assertEqual(list(buscar_ofertas('django')), [])
+
+    def test_api_y_ui(self):
+        datos = self.client.get('/api/ofertas/', {'q': 'python', 'sueldo_min': '2000'}).json()['results']
+        self.assertEqual([o['id'] for o in datos], [self.dev.id, self.data.id])
+
+        self.client.force_login(self.candidato)
+        respuesta = self.client.get(reverse('buscar_ofertas'), {'q': 'cocina'})
+        self.assertEqual(list(respuesta.context['ofertas']), [self.chef])
+
+
+# -----------------------------------------------------------------
+# RELEVANCIA: feed y cola del empleador ordenados por habilidades
+# -----------------------------------------------------------------
+
+class RelevanciaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleador = User.objects.create_user('empresa', password='x')
+        perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cocina = CategoriaDeServicio.objects.create(nombre='Gastronomía')
+        crear = lambda **datos: OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, **datos)
+        cls.backend = crear(titulo='Desarrollador backend', descripcion='Python, Django y PostgreSQL')
+        cls.frontend = crear(titulo='Desarrollador frontend', descripcion='React y Node.js')
+        cls.chef = crear(titulo='Chef', descripcion='Cocina chilena', categoria=cocina)
+        cls.inclusiva = crear(titulo='Asistente', descripcion='Atención de público', es_inclusion=True)
+
+        cls.candidato = User.objects.create_user('cand', password='x')
+        cls.perfil = Perfil.objects.create(
+            user=cls.candidato, tipo='candidato', habilidades='Python, Django', descripcion_profesional='Programador'
+        )
+
+    def setUp(self):
+        cache.clear()  # Los rankings cacheados sobreviven al rollback de cada test
+        relevancia._indice_local.clear()
+
+    def test_normalizar(self):
+        self.assertEqual(relevancia.normalizar('Programación en C++, Node.js.'), ['programacion', 'c++', 'node.js'])
+
+    def test_ranking_y_lote_por_relevancia(self):
+        ranking = relevancia.ranking_para_candidato(self.candidato, self.perfil)
+        self.assertEqual(ranking[0], self.backend.id)
+        self.assertEqual(set(ranking), {self.backend.id, self.frontend.id, self.chef.id, self.inclusiva.id})
+
+        Solicitud.objects.create(oferta=self.backend, User_candidato=self.candidato)
+        vistas, cursor = [], None
+        while True:
+            lote, cursor = relevancia.lote_por_relevancia(self.candidato, self.perfil, cursor=cursor, tamano=1)
+            vistas.extend(o.id for o in lote)
+            if cursor is None:
+                break
+        self.assertEqual(vistas, [i for i in ranking if i != self.backend.id])
+
+    def test_pcd_primero_inclusion(self):
+        self.perfil.es_pcd = True
+        ranking = relevancia.ranking_para_candidato(self.candidato, self.perfil)
+        self.perfil.es_pcd = False
+        self.assertEqual(ranking[:2], [self.inclusiva.id, self.backend.id])
+
+    def test_invalidacion_al_editar_perfil_y_ofertas(self):
+        relevancia.ranking_para_candidato(self.candidato, self.perfil)
+        self.perfil.habilidades = 'cocina'
+        self.perfil.save()
+        self.assertEqual(relevancia.ranking_para_candidato(self.candidato, self.perfil)[0], self.chef.id)
+
+        nueva = OfertaDeEmpleo.objects.create(
+            perfil_empleador=self.chef.perfil_empleador, titulo='Cocinero', descripcion='Cocina de autor'
+        )
+        # El request no reconstruye el índice: sigue con el anterior y la tarea agendada trae el nuevo
+        with self.assertNumQueries(0):
+            self.assertNotIn(nueva.id, relevancia.ranking_para_candidato(self.candidato, self.perfil))
+        Tarea.objects.filter(nombre='reconstruir_indice_relevancia').update(ejecutar_despues=timezone.now())
+        self.assertEqual(tareas.procesar_pendientes(), 1)  # Una sola por ventana de escrituras
+        self.assertIn(nueva.id, relevancia.ranking_para_candidato(self.candidato, self.perfil)[:2])
+
+    @override_settings(RELEVANCIA_ATRASO_MAXIMO=0)
+    def test_sin_worker_el_atraso_queda_acotado(self):
+        relevancia.ranking_para_candidato(self.candidato, self.perfil)
+        nueva = OfertaDeEmpleo.objects.create(perfil_empleador=self.chef.perfil_empleador, titulo='Python')
+        self.assertIn(nueva.id, relevancia.ranking_para_candidato(self.candidato, self.perfil))
+
+    def test_lote_con_filtros_restrictivos_acotado(self):
+        filtros = {'categoria': str(self.chef.categoria_id)}
+        relevancia.ranking_para_candidato(self.candidato, self.perfil)
+        lotes, cursor = [], None
+        with mock.patch('jobswipe.relevancia.ESCANEO_MAXIMO', 2):
+            while True:
+                with CaptureQueriesContext(connection) as consultas:
+                    lote, cursor = relevancia.lote_por_relevancia(
+                        self.candidato, self.perfil, cursor=cursor, tamano=1, filtros=filtros
+                    )
+                self.assertLessEqual(len(consultas), 2)  # Ids disponibles de un tramo + las ofertas elegidas
+                lotes.append([o.id for o in lote])
+                if cursor is None:
+                    break
+        self.assertIn([], lotes)  # Lote corto con cursor: el cliente sigue pidiendo
+        self.assertEqual(sum(lotes, []), [self.chef.id])
+
+    def test_endpoints_con_orden_relevancia(self):
+        self.client.force_login(self.candidato)
+        datos = self.client.get(reverse('feed_ofertas'), {'orden': 'relevancia', 'tamano': 2}).json()
+        self.assertEqual(datos['ofertas'][0]['id'], self.backend.id)
+        self.assertIsNotNone(datos['siguiente'])
+        respuesta = self.client.get(reverse('feed_ofertas'), {'orden': 'relevancia', 'cursor': 'basura'})
+        self.assertEqual(respuesta.status_code, 400)
+
+        otro = User.objects.create_user('cocinero', password='x')
+        Perfil.objects.create(user=otro, tipo='candidato', habilidades='Cocina')
+        primero = Solicitud.objects.create(oferta=self.chef, User_candidato=otro)
+        segundo = Solicitud.objects.create(oferta=self.chef, User_candidato=self.candidato)
+        self.client.force_login(self.empleador)
+        url = reverse('cola_revision', args=[self.chef.id])
+        por_fecha = self.client.get(url).json()['candidatos']
+        por_relevancia = self.client.get(url, {'orden': 'relevancia'}).json()['candidatos']
+        self.assertEqual([c['solicitud'] for c in por_fecha], [primero.id, segundo.id])
+        self.assertEqual([c['solicitud'] for c in por_relevancia], [primero.id, segundo.id])
+
+        self.chef.descripcion = 'Python'
+        self.chef.save()
+        por_relevancia = self.client.get(url, {'orden': 'relevancia'}).json()['candidatos']
+        self.assertEqual([c['solicitud'] for c in por_relevancia], [segundo.id, primero.id])
+
+    def test_cola_por_relevancia_cacheada(self):
+        otro = User.objects.create_user('cocinero', password='x')
+        perfil_otro = Perfil.objects.create(user=otro, tipo='candidato', habilidades='Cocina')
+        with self.captureOnCommitCallbacks(execute=True):
+            primero = Solicitud.objects.create(oferta=self.chef, User_candidato=otro)
+            segundo = Solicitud.objects.create(oferta=self.chef, User_candidato=self.candidato)
+        self.assertEqual(relevancia.ordenar_pendientes_por_relevancia(self.chef), [primero.id, segundo.id])
+        with self.assertNumQueries(0):
+            relevancia.ordenar_pendientes_por_relevancia(self.chef)
+
+        # Cambian los perfiles de los candidatos de la cola: se recalcula
+        perfil_otro.habilidades = 'Contabilidad'
+        self.perfil.habilidades = 'Cocina'
+        with self.captureOnCommitCallbacks(execute=True):
+            perfil_otro.save()
+            self.perfil.save()
+        self.assertEqual(relevancia.ordenar_pendientes_por_relevancia(self.chef), [segundo.id, primero.id])
+
+        # Decidir (bulk_update, sin señales) también la invalida
+        with self.captureOnCommitCallbacks(execute=True):
+            aplicar_decisiones(self.chef, [{'solicitud': segundo.id, 'accion': 'rechazar'}])
+        self.assertEqual(relevancia.ordenar_pendientes_por_relevancia(self.chef), [primero.id])
+
+    @mock.patch.object(relevancia, 'COLA_ESCANEO_MAXIMO', 1)
+    def test_cola_por_relevancia_acotada(self):
+        antigua = Solicitud.objects.create(oferta=self.backend, User_candidato=self.empleador)
+        Solicitud.objects.create(oferta=self.backend, User_candidato=self.candidato)
+        self.assertEqual(relevancia.ordenar_pendientes_por_relevancia(self.backend), [antigua.id])
+
+
+# -----------------------------------------------------------------
+# API REST DE OFERTAS
+# -----------------------------------------------------------------
+
+class ApiOfertasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        empleador = User.objects.create_user('empresa', password='x')
+        cls.perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.ofertas = [
+            OfertaDeEmpleo.objects.create(
+                perfil_empleador=cls.perfil_empleador, titulo=f'Oferta {i}',
+                moneda='USD' if i % 2 else 'CLP', sueldo=1000 * i,
+            )
+            for i in range(7)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('ofertadeempleo-list')
+
+    def test_paginacion_por_cursor_y_campos(self):
+        datos = self.client.get(self.url, {'tamano': 3, 'campos': 'id,titulo'}).json()
+        self.assertEqual(len(datos['results']), 3)
+        self.assertEqual(set(datos['results'][0]), {'id', 'titulo'})
+
+        ids = [fila['id'] for fila in datos['results']]
+        while datos['next']:
+            datos = self.client.get(datos['next']).json()
+            ids.extend(fila['id'] for fila in datos['results'])
+        self.assertEqual(ids, sorted((o.id for o in self.ofertas), reverse=True))
+
+    def test_filtros(self):
+        datos = self.client.get(self.url, {'moneda': 'USD', 'sueldo_min': 2000}).json()
+        self.assertEqual([f['id'] for f in datos['results']], [self.ofertas[5].id, self.ofertas[3].id])
+
+        OfertaDeEmpleo.objects.filter(id=self.ofertas[0].id).update(fecha_publicacion='2020-01-01T00:00:00Z')
+        datos = self.client.get(self.url, {'publicada_desde': '2021-01-01', 'campos': 'id'}).json()
+        self.assertNotIn(self.ofertas[0].id, [f['id'] for f in datos['results']])
+        self.assertEqual(len(datos['results']), 6)
+
+    @override_settings(CACHE_COMPARTIDA=True)
+    def test_get_condicional_y_cache_invalidada_al_escribir(self):
+        primera = self.client.get(self.url)
+        etag = primera['ETag']
+        self.assertIn('Last-Modified', primera)
+
+        with self.assertNumQueries(0):
+            no_modificada = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(no_modificada.status_code, 304)
+        # El Last-Modified recibido sirve tal cual (segundos enteros)
+        no_modificada = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=primera['Last-Modified'])
+        self.assertEqual(no_modificada.status_code, 304)
+
+        self.ofertas[6].estado = 'cerrada'
+        self.ofertas[6].save()
+        cambiada = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cambiada.status_code, 200)
+        self.assertNotEqual(cambiada['ETag'], etag)
+        self.assertNotIn(self.ofertas[6].id, [f['id'] for f in cambiada.json()['results']])
+
+    @override_settings(CACHE_COMPARTIDA=True, ALLOWED_HOSTS=['a.test', 'b.test'])
+    def test_cache_por_host(self):
+        self.client.get(self.url, {'tamano': 3}, HTTP_HOST='a.test')
+        datos = self.client.get(self.url, {'tamano': 3}, HTTP_HOST='b.test').json()
+        self.assertTrue(datos['next'].startswith('http://b.test/'))
+
+    def test_sin_cache_compartida(self):
+        primera = self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=primera['ETag']).status_code, 304)
+        ultima = OfertaDeEmpleo.objects.filter(estado='activa').latest('fecha_actualizacion').fecha_actualizacion
+        self.assertEqual(primera['Last-Modified'], http_date(int(ultima.timestamp())))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=primera['Last-Modified']).status_code, 304)
+
+        # Editar una oferta de la lista la mueve
+        with mock.patch('django.utils.timezone.now', return_value=ultima + timedelta(minutes=5)):
+            self.ofertas[3].save()
+        editada = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=primera['Last-Modified'])
+        self.assertEqual(editada.status_code, 200)
+
+        # Sin ejecutar las señales: como si otro worker cerrara la oferta
+        OfertaDeEmpleo.objects.filter(id=self.ofertas[6].id).update(estado='cerrada')
+        cambiada = self.client.get(self.url, HTTP_IF_NONE_MATCH=primera['ETag'])
+        self.assertEqual(cambiada.status_code, 200)
+        self.assertNotIn(self.ofertas[6].id, [f['id'] for f in cambiada.json()['results']])
+
+
+# -----------------------------------------------------------------
+# API MÓVIL: postulaciones, matches y mensajes
+# -----------------------------------------------------------------
+
+@override_settings(**CACHE_COMPARTIDA)
+class ApiMovilTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleador = User.objects.create_user('empresa', password='x', first_name='Empresa')
+        perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cls.oferta = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Dev')
+        cls.candidato = User.objects.create_user('cand', password='x', first_name='Ana')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_postular_decidir_y_chatear(self):
+        self.client.force_login(self.candidato)
+        creada = self.client.post('/api/solicitudes/', {'oferta': self.oferta.id})
+        self.assertEqual(creada.status_code, 201)
+        repetida = self.client.post('/api/solicitudes/', {'oferta': self.oferta.id})
+        self.assertEqual((repetida.status_code, repetida.json()['id']), (200, creada.json()['id']))
+        id_solicitud = creada.json()['id']
+
+        self.client.force_login(self.empleador)
+        pendientes = self.client.get('/api/solicitudes/', {'estado': 'pendiente'}).json()['results']
+        self.assertEqual([(s['id'], s['candidato_nombre']) for s in pendientes], [(id_solicitud, 'Ana')])
+        decidida = self.client.post(f'/api/solicitudes/{id_solicitud}/decidir/', {'accion': 'aceptar'})
+        self.assertEqual(decidida.json()['estado'], 'aceptada')
+        otra_vez = self.client.post(f'/api/solicitudes/{id_solicitud}/decidir/', {'accion': 'rechazar'})
+        self.assertEqual(otra_vez.status_code, 409)
+
+        enviado = self.client.post(f'/api/matches/{id_solicitud}/mensajes/', {'contenido': 'Hola Ana'})
+        self.assertEqual(enviado.status_code, 201)
+
+        with self.captureOnCommitCallbacks(execute=True):  # El login guarda last_login e invalida el usuario
+            self.client.force_login(self.candidato)
+        # La sesión sale de la caché; el usuario llega con su perfil en un JOIN
+        with self.assertNumQueries(2):  # usuario y matches con oferta, empleador y candidato
+            matches = self.client.get('/api/matches/').json()['results']
+        self.assertEqual(matches[0]['contraparte'], 'Empresa')
+        self.assertEqual(matches[0]['no_leidos'], 1)
+        historial = self.client.get(f'/api/matches/{id_solicitud}/mensajes/').json()['results']
+        self.assertEqual([m['contenido'] for m in historial], ['Hola Ana'])
+        self.assertEqual(self.client.post(f'/api/matches/{id_solicitud}/leidos/').json(), {'leidos': 1})
+
+    def test_permisos(self):
+        self.client.force_login(self.empleador)
+        self.assertEqual(self.client.post('/api/solicitudes/', {'oferta': self.oferta.id}).status_code, 403)
+        solicitud = Solicitud.objects.create(oferta=self.oferta, User_candidato=self.candidato)
+
+        self.client.force_login(self.candidato)
+        respuesta = self.client.post(f'/api/solicitudes/{solicitud.id}/decidir/', {'accion': 'aceptar'})
+        self.assertEqual(respuesta.status_code, 403)
+        # Aún no es match: no hay chat
+        self.assertEqual(self.client.get(f'/api/matches/{solicitud.id}/mensajes/').status_code, 404)
+
+        # Staff sin Perfil (createsuperuser): 403, no un 500
+        self.client.force_login(User.objects.create_user('admin', password='x', is_staff=True))
+        for url in ('/api/solicitudes/', '/api/matches/', f'/api/matches/{solicitud.id}/mensajes/'):
+            self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.post('/api/solicitudes/', {'oferta': self.oferta.id}).status_code, 403)
+
+    @mock.patch.object(MensajesThrottle, 'rate', '2/minute', create=True)
+    def test_throttling_de_mensajes_por_usuario(self):
+        solicitud = Solicitud.objects.create(oferta=self.oferta, User_candidato=self.candidato, estado='aceptada')
+        self.client.force_login(self.candidato)
+        url = f'/api/matches/{solicitud.id}/mensajes/'
+        codigos = [self.client.post(url, {'contenido': str(i)}).status_code for i in range(3)]
+        self.assertEqual(codigos, [201, 201, 429])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+# -----------------------------------------------------------------
+# FOTOS DE PERFIL: variantes sin metadatos y srcset
+# -----------------------------------------------------------------
+
+class FotosPerfilTests(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=self.media.name, TAREAS_SINCRONAS=True)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def _foto_con_exif(self):
+        imagen = Image.new('RGB', (1200, 800), (200, 30, 30))
+        exif = Image.Exif()
+        exif[0x010F] = 'Telefono'  # Make
+        buffer = io.BytesIO()
+        imagen.save(buffer, format='JPEG', exif=exif)
+        return SimpleUploadedFile('yo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_variantes_srcset_y_cache(self):
+        user = User.objects.create_user('cand', password='x')
+        with self.captureOnCommitCallbacks(execute=True):
+            perfil = Perfil.objects.create(user=user, tipo='candidato', foto=self._foto_con_exif())
+            subida = perfil.foto.name
+        perfil.refresh_from_db()
+        # La copia limpia tiene otro nombre; la subida se borra después de actualizar el perfil
+        self.assertNotEqual(perfil.foto.name, subida)
+        self.assertFalse(default_storage.exists(subida))
+
+        self.assertEqual(sorted(perfil.foto_variantes['webp']), ['160', '480', '960'])
+        with Image.open(perfil.foto.path) as original:
+            self.assertEqual(len(original.getexif()), 0)
+        with default_storage.open(perfil.foto_variantes['jpeg']['480']) as archivo, Image.open(archivo) as variante:
+            self.assertEqual(variante.size, (480, 320))
+            self.assertEqual(len(variante.getexif()), 0)
+
+        self.assertIn(' 960w', perfil.foto_srcset_webp)
+        self.assertTrue(perfil.foto_src.endswith('/480.jpeg'))
+
+        respuesta = servir_media(RequestFactory().get('/'), perfil.foto_variantes['webp']['160'])
+        self.assertIn('immutable', respuesta['Cache-Control'])
+        self.assertIn('max-age=31536000', respuesta['Cache-Control'])
+
+    def test_si_falla_la_foto_se_conserva(self):
+        user = User.objects.create_user('cand', password='x')
+        perfil = Perfil.objects.create(user=user, tipo='candidato', foto=self._foto_con_exif())
+        codificar = imagenes._codificar
+        llamadas = []
+
+        def falla_a_mitad(imagen, opciones):
+            llamadas.append(opciones)
+            if len(llamadas) == 3:
+                raise OSError('disco lleno')
+            return codificar(imagen, opciones)
+
+        with mock.patch('jobswipe.imagenes._codificar', falla_a_mitad), self.assertRaises(OSError):
+            imagenes.procesar_foto(perfil.id)
+        perfil.refresh_from_db()
+        self.assertTrue(default_storage.exists(perfil.foto.name))
+        self.assertEqual(perfil.foto_variantes, {})
+        # Lo guardado a medias se borró: solo queda la subida
+        self.assertEqual(default_storage.listdir('fotos_perfil')[1], [perfil.foto.name.split('/')[-1]])
+
+    def test_sin_variantes_usa_el_original(self):
+        user = User.objects.create_user('cand', password='x')
+        perfil = Perfil.objects.create(user=user, tipo='candidato', foto=self._foto_con_exif())
+        # Sin ejecutar el on_commit: las variantes aún no existen
+        self.assertEqual(perfil.foto_srcset_webp, '')
+        self.assertEqual(perfil.foto_src, perfil.foto.url)
+
+
+# -----------------------------------------------------------------
+# COLA DE TAREAS
+# -----------------------------------------------------------------
+
+@tareas.tarea('prueba_inestable')
+def _tarea_inestable(fallar_hasta):
+    _tarea_inestable.llamadas += 1
+    if _tarea_inestable.llamadas <= fallar_hasta:
+        raise RuntimeError('falla de prueba')
+
+
+class TareasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleador = User.objects.create_user('empresa', password='x', first_name='Empresa')
+        perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cls.oferta = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Dev')
+        cls.candidato = User.objects.create_user('cand', password='x', first_name='Ana', email='ana@example.com')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+
+    def setUp(self):
+        _tarea_inestable.llamadas = 0
+        # La oferta de setUpTestData pudo agendar la reconstrucción del índice de relevancia
+        Tarea.objects.filter(nombre='reconstruir_indice_relevancia').delete()
+
+    def _vencer_programadas(self):
+        Tarea.objects.filter(estado='pendiente').update(ejecutar_despues=timezone.now())
+
+    def test_reintentos_con_backoff_y_falla_final(self):
+        tareas.encolar('prueba_inestable', max_intentos=3, fallar_hasta=10)
+        for intento in range(1, 4):
+            self._vencer_programadas()
+            tareas.procesar_pendientes()
+            tarea = Tarea.objects.get()
+            self.assertEqual(tarea.intentos, intento)
+            if intento < 3:
+                self.assertEqual(tarea.estado, 'pendiente')
+                self.assertGreater(tarea.ejecutar_despues, timezone.now())
+        self.assertEqual(tarea.estado, 'fallida')
+        self.assertIn('falla de prueba', tarea.ultimo_error)
+
+        tareas.encolar('prueba_inestable', fallar_hasta=0)
+        tareas.procesar_pendientes()
+        self.assertEqual(Tarea.objects.filter(estado='completada').count(), 1)
+
+    def test_clave_de_idempotencia(self):
+        for _ in range(3):
+            tareas.encolar('prueba_inestable', clave='unica', fallar_hasta=0)
+        self.assertEqual(Tarea.objects.count(), 1)
+        with self.assertRaises(ValueError):
+            tareas.encolar('no_existe')
+
+    def test_aceptar_encola_el_correo_de_match(self):
+        solicitud = Solicitud.objects.create(oferta=self.oferta, User_candidato=self.candidato)
+        self.client.force_login(self.empleador)
+        self.client.get(reverse('aceptar_solicitud', args=[solicitud.id]))
+        self.assertEqual(len(mail.outbox), 0)  # El request no envía nada
+
+        tareas.procesar_pendientes()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ana@example.com'])
+        self.assertEqual(Tarea.objects.get().estado, 'completada')
+
+    def test_aviso_de_mensajes_solo_si_siguen_sin_leer(self):
+        solicitud = Solicitud.objects.create(oferta=self.oferta, User_candidato=self.candidato, estado='aceptada')
+        self.client.force_login(self.empleador)
+        url = reverse('chat', args=[solicitud.id])
+        self.client.post(url, {'contenido': 'Hola'})
+        self.client.post(url, {'contenido': '¿Sigues ahí?'})
+        self.assertEqual(Tarea.objects.filter(nombre='avisar_mensajes_no_leidos').count(), 1)
+
+        tareas.procesar_pendientes()  # Aún no es la hora
+        self.assertEqual(len(mail.outbox), 0)
+        self._vencer_programadas()
+        tareas.procesar_pendientes()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('2 mensaje(s)', mail.outbox[0].subject)
+
+    def test_panel_solo_staff(self):
+        tareas.encolar('prueba_inestable', fallar_hasta=0)
+        self.client.force_login(self.candidato)
+        self.assertEqual(self.client.get(reverse('panel_tareas')).status_code, 302)
+
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.client.force_login(staff)
+        datos = self.client.get(reverse('panel_tareas'), {'formato': 'json'}).json()
+        self.assertEqual(datos['tareas'][0]['nombre'], 'prueba_inestable')
+        self.assertEqual(datos['tareas'][0]['pendientes'], 1)
+        self.assertContains(self.client.get(reverse('panel_tareas')), 'prueba_inestable')
+
+
+
+class WorkerTareasTests(TransactionTestCase):
+    # El worker usa otras conexiones (hilos del pool): necesita datos ya confirmados
+
+    def test_worker_vacia_la_cola(self):
+        _tarea_inestable.llamadas = 0
+        tareas.encolar('prueba_inestable', fallar_hasta=0)
+        tareas.encolar('prueba_inestable', fallar_hasta=0)
+        salida = StringIO()
+        call_command('procesar_tareas', una_vez=True, workers=1, stdout=salida)
+        self.assertIn('completada: 2', salida.getvalue())
+        self.assertFalse(Tarea.objects.exclude(estado='completada').exists())
+
+
+# -----------------------------------------------------------------
+# MÉTRICAS DE RENDIMIENTO
+# -----------------------------------------------------------------
+
+@override_settings(METRICAS_SERVER_TIMING=True)
+class MetricasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+
+    def setUp(self):
+        for metrica in metricas.METRICAS:
+            metrica.reiniciar()
+        self.client.force_login(self.candidato)
+
+    def test_server_timing_y_endpoint_prometheus(self):
+        respuesta = self.client.get(reverse('home'))
+        self.assertRegex(respuesta['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ consultas", tpl;dur=[\d.]+')
+
+        with self.settings(METRICAS_TOKEN='secreto'):
+            texto = self.client.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer secreto').content.decode()
+        self.assertIn('jobswipe_request_duracion_segundos_count{vista="home",metodo="GET",estado="200"} 1', texto)
+        self.assertIn('jobswipe_plantilla_render_segundos_count{plantilla="jobswipe/home.html"} 1', texto)
+        self.assertRegex(texto, r'jobswipe_request_consultas_sum\{vista="home"\} [1-9]')
+
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_endpoint_con_token_o_staff(self):
+        self.client.logout()
+        url = reverse('metricas')
+        # Detrás de un proxy reverso local todo llega desde 127.0.0.1: no basta
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer secreto').status_code, 200)
+        with self.settings(METRICAS_IPS_PERMITIDAS=('10.0.0.7',)):
+            self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.7').status_code, 200)
+
+        self.client.force_login(User.objects.create_user('admin', password='x', is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(METRICAS_CONSULTA_LENTA=0)
+    def test_consultas_lentas_con_pila(self):
+        with self.assertLogs('jobswipe.consultas_lentas', level='WARNING') as registros:
+            self.client.get(reverse('matches'))
+        self.assertIn('jobswipe_solicitud', '\n'.join(registros.output))
+        self.assertIn('views.py', '\n'.join(registros.output))
+
+    def test_http_externo(self):
+        with metricas.medir_http('prueba'):
+            pass
+        self.assertIn('jobswipe_http_externo_segundos_count{servicio="prueba"} 1', metricas.exponer_metricas())
+
+
+class BenchmarkTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command(
+            'generar_datos', candidatos=4, empleadores=2, ofertas_por_empleador=5,
+            postulaciones_por_candidato=4, mensajes_por_match=3, tasa_match=0.5, stdout=StringIO(),
+        )
+
+    def test_generar_datos(self):
+        self.assertEqual(Perfil.objects.filter(user__username__startswith='bench_', tipo='candidato').count(), 4)
+        self.assertEqual(OfertaDeEmpleo.objects.filter(perfil_empleador__user__username__startswith='bench_').count(), 10)
+        match = Solicitud.objects.filter(estado='aceptada', mensajes__isnull=False).first()
+        self.assertEqual(match.ultimo_mensaje_id, match.mensajes.order_by('-id').first().id)
+
+    def test_generar_datos_sin_ids_de_bulk_create(self):
+        # Como en MySQL: bulk_create no devuelve las claves primarias
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            call_command('generar_datos', candidatos=2, empleadores=1, ofertas_por_empleador=3,
+                         postulaciones_por_candidato=2, prefijo='mysql', stdout=StringIO())
+        ofertas = OfertaDeEmpleo.objects.filter(perfil_empleador__user__username__startswith='mysql_')
+        self.assertEqual(ofertas.count(), 3)
+        # fecha_publicacion repartida con bulk_update: requiere haber releído los ids
+        self.assertTrue(ofertas.filter(fecha_publicacion__lt=timezone.now() - timedelta(hours=1)).exists())
+        self.assertTrue(Solicitud.objects.filter(User_candidato__username__startswith='mysql_').exists())
+
+    def test_comparar_sin_rps_ni_latencias(self):
+        base = {'home': benchmark.resumir('home', [0.01], [3], 1.0)}
+        vacia = benchmark.resumir('home', [], [], 0)
+        self.assertEqual((vacia['rps'], vacia['p95_ms']), (None, None))
+        self.assertEqual(benchmark.comparar([vacia], base), [])
+
+    def test_percentil_por_rango(self):
+        valores = list(range(1, 101))
+        self.assertEqual([benchmark.percentil(valores, p) for p in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(benchmark.percentil([7], 99), 7)
+
+    def test_corrida_y_comparacion_con_baseline(self):
+        solicitudes = Solicitud.objects.count()
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = f'{directorio}/baseline.json'
+            call_command('benchmark', iteraciones=3, calentamiento=1, baseline=ruta,
+                         guardar_baseline=True, stdout=StringIO())
+            with open(ruta) as archivo:
+                resultados = {r['escenario']: r for r in json.load(archivo)['resultados']}
+            self.assertEqual(set(resultados), {'home', 'postular', 'matches', 'chat', 'api_ofertas'})
+            self.assertEqual(resultados['chat']['errores'], 0)
+            self.assertGreater(resultados['matches']['consultas'], 0)
+
+            # Una línea base con menos consultas es una regresión
+            resultados['matches']['consultas'] = 0
+            with open(ruta, 'w') as archivo:
+                json.dump({'modo': 'cliente', 'resultados': list(resultados.values())}, archivo)
+            with self.assertRaisesMessage(CommandError, 'regresiones'):
+                call_command('benchmark', escenarios=['matches'], iteraciones=2, baseline=ruta,
+                             estricto=True, stdout=StringIO())
+
+            # Una línea base de otro modo (servidor HTTP) no se compara con el cliente de pruebas
+            with open(ruta, 'w') as archivo:
+                json.dump({'modo': 'http', 'resultados': list(resultados.values())}, archivo)
+            salida = StringIO()
+            call_command('benchmark', escenarios=['matches'], iteraciones=2, baseline=ruta, stdout=salida)
+            self.assertIn('no se comparan', salida.getvalue())
+            with self.assertRaisesMessage(CommandError, 'no se comparan'):
+                call_command('benchmark', escenarios=['matches'], iteraciones=2, baseline=ruta,
+                             estricto=True, stdout=StringIO())
+        # Las postulaciones del benchmark se deshacen
+        self.assertEqual(Solicitud.objects.count(), solicitudes)
+
+
+class CacheDashboardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = CategoriaDeServicio.objects.create(nombre='TI')
+        cls.empleador = User.objects.create_user('empresa', password='x', first_name='Acme')
+        cls.perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        cls.oferta = OfertaDeEmpleo.objects.create(
+            perfil_empleador=cls.perfil_empleador, titulo='Backend', categoria=cls.categoria
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(CACHE_COMPARTIDA=True)
+    def test_lista_del_empleador_cacheada_e_invalidada(self):
+        self.client.force_login(self.empleador)
+        self.client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(reverse('home'))
+        self.assertFalse([q for q in consultas if 'jobswipe_ofertadeempleo' in q['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.oferta.titulo = 'Backend senior'
+            self.oferta.save()
+        self.assertContains(self.client.get(reverse('home')), 'Backend senior')
+
+    def test_lista_sin_cache_compartida(self):
+        self.client.force_login(self.empleador)
+        self.client.get(reverse('home'))
+        # Sin ejecutar los on_commit: como si otro worker guardara la oferta
+        OfertaDeEmpleo.objects.create(perfil_empleador=self.perfil_empleador, titulo='Frontend')
+        self.assertContains(self.client.get(reverse('home')), 'Frontend')
+
+    def test_tarjeta_cacheada_por_fecha_actualizacion(self):
+        self.client.force_login(self.candidato)
+        self.assertContains(self.client.get(reverse('home')), 'Backend')
+
+        # Un UPDATE directo no cambia fecha_actualizacion: se sirve el fragmento
+        OfertaDeEmpleo.objects.filter(id=self.oferta.id).update(titulo='Sin señal')
+        self.assertNotContains(self.client.get(reverse('home')), 'Sin señal')
+
+        self.oferta.refresh_from_db()
+        self.oferta.save()
+        self.assertContains(self.client.get(reverse('home')), 'Sin señal')
+
+    def test_cambios_relacionados_renuevan_la_tarjeta(self):
+        self.client.force_login(self.candidato)
+        self.client.get(reverse('home'))
+
+        self.categoria.nombre = 'Tecnología'
+        self.categoria.save()
+        self.empleador.first_name = 'Acme SpA'
+        self.empleador.save()
+        respuesta = self.client.get(reverse('home'))
+        self.assertContains(respuesta, 'Tecnología')
+        self.assertContains(respuesta, 'Acme SpA')
+
+
+class ConexionesTests(TestCase):
+
+    def test_tamano_del_pool_por_worker(self):
+        self.assertEqual(basedatos.tamano_pool(20, workers=4), 5)
+        self.assertEqual(basedatos.tamano_pool(20, workers=16, hilos=4), 4)  # al menos una por hilo
+
+    def test_postgres_con_pool(self):
+        entorno = {'DB_POOL': 'True', 'DB_MAX_CONEXIONES': '30', 'WEB_CONCURRENCY': '3', 'DB_SSL_CA': '/ca.pem'}
+        with mock.patch.dict('os.environ', entorno):
+            config = basedatos.configurar_conexion({'ENGINE': 'django.db.backends.postgresql'})
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 10)
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS']['sslrootcert'], '/ca.pem')
+
+    def test_mysql_persistente_con_health_checks(self):
+        with mock.patch.dict('os.environ', {'DB_CONN_MAX_AGE': '120'}):
+            config = basedatos.configurar_conexion({'ENGINE': 'django.db.backends.mysql'})
+        self.assertEqual(config['CONN_MAX_AGE'], 120)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', config['OPTIONS'])
+
+    def test_benchmark_de_conexiones(self):
+        resultados = {r['escenario']: r for r in benchmark.comparar_conexiones(iteraciones=3)}
+        self.assertEqual(set(resultados), {'conexion_nueva', 'conexion_reutilizada'})
+        self.assertEqual(resultados['conexion_nueva']['requests'], 3)
+
+
+@override_settings(REPLICAS={'replica_a': 3, 'replica_b': 1}, REPLICAS_VENTANA=10)
+class ReplicasTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.router = replicas.RouterReplicas()
+
+    def _request(self, metodo='get', user_id=7, vista=None):
+        request = getattr(RequestFactory(), metodo)('/')
+        request.session = {SESSION_KEY: str(user_id)}
+        destinos = []
+
+        def responder(request):
+            destinos.append(self.router.db_for_read(OfertaDeEmpleo))
+            if metodo == 'post':
+                self.router.db_for_write(OfertaDeEmpleo)
+            return HttpResponse()
+        replicas.ReplicasMiddleware(vista(responder) if vista else responder)(request)
+        return destinos[0]
+
+    def test_solo_las_vistas_marcadas_leen_de_replicas(self):
+        self.assertEqual(self._request(), 'default')
+        self.assertIn(self._request(vista=replicas.lectura_en_replica), ('replica_a', 'replica_b'))
+        self.assertEqual(self.router.db_for_read(OfertaDeEmpleo), 'default')  # fuera de un request
+
+    def test_read_your_writes(self):
+        self._request('post')
+        self.assertEqual(self._request(vista=replicas.lectura_en_replica), 'default')
+        # Otro usuario no queda fijado
+        self.assertNotEqual(self._request(user_id=8, vista=replicas.lectura_en_replica), 'default')
+
+    def test_seleccion_ponderada(self):
+        with mock.patch('jobswipe.replicas.random', random.Random(1)):
+            elegidas = [replicas.elegir_replica() for _ in range(2000)]
+        self.assertAlmostEqual(elegidas.count('replica_a') / 2000, 0.75, delta=0.05)
+
+
+@skipUnless(settings.REPLICAS, 'Sin réplicas configuradas (DATABASE_REPLICA_URLS)')
+class ReplicasIntegracionTests(TransactionTestCase):
+    # Correr con, p. ej., DATABASE_REPLICA_URLS=sqlite:////tmp/r.db: en los tests la réplica es espejo de default
+    databases = '__all__'
+
+    def test_matches_desde_la_replica_salvo_despues_de_escribir(self):
+        cache.clear()
+        empleador = User.objects.create_user('empresa', password='x')
+        perfil = Perfil.objects.create(user=empleador, tipo='empleador')
+        candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=candidato, tipo='candidato')
+        oferta = OfertaDeEmpleo.objects.create(perfil_empleador=perfil, titulo='Backend')
+        match = Solicitud.objects.create(oferta=oferta, User_candidato=candidato, estado='aceptada')
+        self.client.force_login(candidato)
+        replica = connections[next(iter(settings.REPLICAS))]
+
+        with mock.patch('jobswipe.replicas.elegir_replica', return_value=replica.alias), \
+                CaptureQueriesContext(replica) as leidas:
+            self.assertContains(self.client.get(reverse('matches')), 'Backend')
+        self.assertTrue(leidas)
+
+        self.client.post(reverse('chat', args=[match.id]), {'contenido': 'Hola'})
+        with mock.patch('jobswipe.replicas.elegir_replica', return_value=replica.alias), \
+                CaptureQueriesContext(replica) as leidas:
+            self.assertContains(self.client.get(reverse('matches')), 'Hola')
+        self.assertFalse(leidas)
+
+
+@override_settings(**CACHE_COMPARTIDA)
+class SesionCacheadaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.candidato)
+
+    def test_usuario_y_perfil_sin_consultas(self):
+        self.client.get(reverse('elegir_rol'))
+        with self.assertNumQueries(0):  # Sesión, usuario y user.perfil.tipo desde la caché
+            self.assertRedirects(self.client.get(reverse('elegir_rol')), reverse('home'),
+                                 fetch_redirect_response=False)
+
+    def test_toggle_pcd_invalida_el_perfil_cacheado(self):
+        self.assertContains(self.client.get(reverse('home')), 'Activar Filtro')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('toggle_pcd'))
+        self.assertContains(self.client.get(reverse('home')), 'FILTRO ACTIVADO')
+
+    def test_cambio_de_clave_cierra_la_sesion(self):
+        self.client.get(reverse('home'))
+        self.candidato.set_password('otra')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidato.save()
+        self.assertEqual(self.client.get(reverse('home')).status_code, 302)
+
+    def test_se_invalida_despues_del_commit(self):
+        self.client.get(reverse('home'))
+        perfil = Perfil.objects.get(user=self.candidato)
+        perfil.es_pcd = True
+        with self.captureOnCommitCallbacks() as callbacks:
+            perfil.save()
+            # Hasta el commit la caché sigue con el perfil anterior (nadie lee la fila nueva)
+            self.assertFalse(sesiones.usuario_con_perfil(self.candidato.id).perfil.es_pcd)
+        for callback in callbacks:
+            callback()
+        self.assertTrue(sesiones.usuario_con_perfil(self.candidato.id).perfil.es_pcd)
+
+
+class SinCacheCompartidaTests(TestCase):
+
+    def test_settings_sin_redis(self):
+        with mock.patch.dict('os.environ'):
+            for variable in ('REDIS_URL', 'CACHE_COMPARTIDA'):
+                os.environ.pop(variable, None)
+            ajustes = runpy.run_module('prjJobSwipe.settings')
+        self.assertIn('LocMemCache', ajustes['CACHES']['default']['BACKEND'])
+        self.assertFalse(ajustes['CACHE_COMPARTIDA'])
+        self.assertEqual(ajustes['SESSION_ENGINE'], 'django.contrib.sessions.backends.db')
+        self.assertEqual(ajustes['AUTHENTICATION_BACKENDS'], ['django.contrib.auth.backends.ModelBackend'])
+
+    @override_settings(CACHE_COMPARTIDA=False)
+    def test_usuario_siempre_desde_la_base(self):
+        candidato = User.objects.create_user('cand', password='x')
+        Perfil.objects.create(user=candidato, tipo='candidato')
+        cache.clear()
+        sesiones.usuario_con_perfil(candidato.id)
+        # Lo que haría otro worker: cambia el Perfil sin borrar esta caché
+        Perfil.objects.filter(user=candidato).update(es_pcd=True)
+        self.assertTrue(sesiones.usuario_con_perfil(candidato.id).perfil.es_pcd)
+        self.assertIsNone(cache.get(sesiones._clave(candidato.id)))
+
+
+class SueldosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        empleador = User.objects.create_user('emp', password='x')
+        cls.perfil_emp = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x')
+        cls.perfil_cand = Perfil.objects.create(user=cls.candidato, tipo='candidato')
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('jobswipe.sueldos.tasa_dolar', return_value=1000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        crear = lambda titulo, moneda, sueldo: OfertaDeEmpleo.objects.create(
+            perfil_empleador=self.perfil_emp, titulo=titulo, descripcion='...', moneda=moneda, sueldo=sueldo
+        )
+        self.clp = crear('Cajero', 'CLP', 800000)
+        self.usd = crear('Data', 'USD', 2000)  # 2.000.000 CLP
+        self.sin_sueldo = crear('Garzón', 'CLP', None)
+
+    def test_se_normaliza_al_guardar(self):
+        self.assertEqual(self.clp.sueldo_normalizado, 800000)
+        self.assertEqual(self.usd.sueldo_normalizado, 2000000)
+        self.assertIsNone(self.sin_sueldo.sueldo_normalizado)
+
+    def test_recalculo_por_lotes_solo_usd(self):
+        otra = OfertaDeEmpleo.objects.create(perfil_empleador=self.perfil_emp, titulo='QA', moneda='USD', sueldo=1500)
+        with self.assertNumQueries(5):  # 2 lotes de (ids + UPDATE) y el lote vacío que termina
+            self.assertEqual(sueldos.recalcular_sueldos(tasa=900.0, tamano=1), 2)
+        self.usd.refresh_from_db()
+        otra.refresh_from_db()
+        self.assertEqual((self.usd.sueldo_normalizado, otra.sueldo_normalizado), (1800000, 1350000))
+        self.clp.refresh_from_db()
+        self.assertEqual(self.clp.sueldo_normalizado, 800000)
+        self.assertFalse(sueldos.tasa_cambio_significativo(901.0))
+        self.assertTrue(sueldos.tasa_cambio_significativo(950.0))
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command('recalcular_sueldos', '--tasa', '900', stdout=salida)
+        self.assertIn('1 ofertas', salida.getvalue())
+        call_command('recalcular_sueldos', '--tasa', '900', '--si-cambio', stdout=salida)
+        self.assertIn('nada que recalcular', salida.getvalue())
+
+    def test_filtro_en_pesos_entre_monedas(self):
+        ofertas = filtrar_ofertas(OfertaDeEmpleo.objects.all(), {'sueldo_clp_min': '1000000'})
+        self.assertEqual(list(ofertas), [self.usd])
+
+    def test_feed_mejor_pagadas(self):
+        ofertas, siguiente = obtener_lote(self.candidato, self.perfil_cand, tamano=1, orden='sueldo')
+        self.assertEqual(ofertas, [self.usd])
+        ofertas, siguiente = obtener_lote(self.candidato, self.perfil_cand, cursor=siguiente, tamano=1, orden='sueldo')
+        self.assertEqual((ofertas, siguiente), ([self.clp], None))  # Sin sueldo no entra
+
+        self.client.force_login(self.candidato)
+        respuesta = self.client.get(reverse('feed_ofertas'), {'orden': 'sueldo', 'sueldo_clp_max': '1000000'})
+        self.assertEqual([o['id'] for o in respuesta.json()['ofertas']], [self.clp.id])
+        # Un cursor del orden por fecha no sirve para el orden por sueldo
+        _, cursor_fecha = obtener_lote(self.candidato, self.perfil_cand, tamano=1)
+        respuesta = self.client.get(reverse('feed_ofertas'), {'orden': 'sueldo', 'cursor': cursor_fecha})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_api_ordena_por_sueldo(self):
+        self.client.force_login(self.candidato)
+        datos = self.client.get('/api/ofertas/', {'orden': 'sueldo_asc'}).json()['results']
+        self.assertEqual([o['id'] for o in datos], [self.clp.id, self.usd.id])
+        self.assertEqual(datos[1]['sueldo_normalizado'], 2000000)
+
+
+class ImportacionExportacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = CategoriaDeServicio.objects.create(nombre='Tecnología')
+        cls.empleador = User.objects.create_user('empresa', password='x')
+        cls.perfil_empleador = Perfil.objects.create(user=cls.empleador, tipo='empleador')
+        cls.otro = User.objects.create_user('otra_empresa', password='x')
+        Perfil.objects.create(user=cls.otro, tipo='empleador')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.empleador)
+
+    def _subir(self, nombre, contenido):
+        archivo = SimpleUploadedFile(nombre, contenido.encode('utf-8'))
+        return self.client.post(reverse('importar_ofertas'), {'archivo': archivo})
+
+    def test_csv_valida_con_el_formulario(self):
+        filas = ''.join(f'Dev {i},Python,tecnología,si,USD,{1000 + i}\n' for i in range(5))
+        contenido = 'titulo,descripcion,categoria,es_inclusion,moneda,sueldo\n' + filas + ',sin título,,,CLP,abc\n'
+        with mock.patch('jobswipe.importacion.tasa_dolar', return_value=1000.0):
+            respuesta = self._subir('ofertas.csv', contenido)
+        self.assertContains(respuesta, 'Línea 7')
+        ofertas = OfertaDeEmpleo.objects.filter(perfil_empleador=self.perfil_empleador)
+        self.assertEqual(ofertas.count(), 5)
+        oferta = ofertas.get(titulo='Dev 0')
+        self.assertEqual((oferta.categoria, oferta.es_inclusion, oferta.sueldo_normalizado), (self.categoria, True, 1000000))
+        self.assertEqual(list(buscar_ofertas('python')), list(ofertas.order_by('-fecha_publicacion', '-id'))[:5])
+
+    def test_jsonl_y_archivo_invalido(self):
+        contenido = json.dumps({'titulo': 'Chef', 'categoria': self.categoria.id, 'sueldo': 900000}) + '\n'
+        self.assertRedirects(self._subir('ofertas.jsonl', contenido), reverse('home'), fetch_redirect_response=False)
+        self.assertTrue(OfertaDeEmpleo.objects.filter(titulo='Chef', categoria=self.categoria).exists())
+        self.assertContains(self._subir('ofertas.jsonl', '{roto\n'), 'JSON inválido')
+        self.assertContains(self._subir('ofertas.csv', 'nombre,sueldo\nx,1\n'), 'encabezado')
+
+    def test_comando_por_tramos(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as archivo:
+            archivo.write('titulo,categoria,moneda\nA,Tecnología,CLP\nB,Tecnología,CLP\nC,Tecnología,EUR\n')
+            archivo.flush()
+            salida, errores = StringIO(), StringIO()
+            with CaptureQueriesContext(connection) as consultas:
+                call_command('importar_ofertas', 'empresa', archivo.name, '--tramo', '1', stdout=salida, stderr=errores)
+        self.assertIn('2 ofertas importadas, 1 filas con errores', salida.getvalue())
+        self.assertIn('Línea 4: moneda', errores.getvalue())
+        self.assertEqual(len([q for q in consultas if q['sql'].startswith('INSERT INTO "jobswipe_ofertadeempleo"')]), 2)
+
+    def test_exportar_postulantes_en_streaming(self):
+        oferta = OfertaDeEmpleo.objects.create(perfil_empleador=self.perfil_empleador, titulo='Backend')
+        for i in range(3):
+            candidato = User.objects.create_user(f'cand{i}', password='x', first_name='=HYPERLINK()' if i == 0 else 'Ana')
+            Perfil.objects.create(user=candidato, tipo='candidato', habilidades='Python')
+            Solicitud.objects.create(oferta=oferta, User_candidato=candidato)
+
+        respuesta = self.client.get(reverse('exportar_postulantes', args=[oferta.id]))
+        self.assertTrue(respuesta.streaming)
+        lineas = b''.join(respuesta.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lineas), 4)
+        self.assertTrue(lineas[0].startswith('solicitud,usuario'))
+        self.assertIn("'=HYPERLINK()", lineas[1])
+
+        self.client.force_login(self.otro)
+        self.assertEqual(self.client.get(reverse('exportar_postulantes', args=[oferta.id])).status_code, 302)
+
+
+@override_settings(**CACHE_COMPARTIDA)
+class AdminTablasGrandesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser('admin', password='x')
+        empleador = User.objects.create_user('empresa', password='x')
+        cls.perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.ofertas = [
+            OfertaDeEmpleo.objects.create(perfil_empleador=cls.perfil_empleador, titulo=f'Oferta {i}')
+            for i in range(3)
+        ]
+        for i in range(3):
+            candidato = User.objects.create_user(f'cand{i}', password='x')
+            for oferta in cls.ofertas:
+                solicitud = Solicitud.objects.create(oferta=oferta, User_candidato=candidato)
+                Mensaje.objects.create(solicitud=solicitud, User_origen=candidato, User_destino=empleador, contenido='hola')
+        chat.reconstruir_resumenes()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.staff)
+
+    def test_listados_sin_consultas_por_fila(self):
+        for modelo in ('ofertadeempleo', 'solicitud', 'mensaje', 'descarte'):
+            url = reverse(f'admin:jobswipe_{modelo}_changelist')
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as consultas:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            # Sesión/usuario vienen de la caché: COUNT(*) y la página, nada por fila
+            self.assertLessEqual(len(consultas), 2, modelo)
+
+    def test_total_estimado_sin_filtros(self):
+        with mock.patch('jobswipe.admin.filas_estimadas', return_value=5_000_000):
+            respuesta = self.client.get(reverse('admin:jobswipe_mensaje_changelist'))
+            self.assertEqual(respuesta.context['cl'].result_count, 5_000_000)
+            filtrada = self.client.get(reverse('admin:jobswipe_solicitud_changelist'), {'estado': 'pendiente'})
+            self.assertEqual(filtrada.context['cl'].result_count, 9)
+
+    def test_acciones_en_un_update(self):
+        api = self.client.get('/api/ofertas/').json()['results']
+        self.assertEqual(len(api), 3)
+        with CaptureQueriesContext(connection) as consultas, self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:jobswipe_ofertadeempleo_changelist'), {
+                'action': 'pausar', '_selected_action': [o.id for o in self.ofertas[:2]],
+            })
+        self.assertEqual(len([q for q in consultas if q['sql'].startswith('UPDATE "jobswipe_ofertadeempleo"')]), 1)
+        self.assertEqual(OfertaDeEmpleo.objects.filter(estado='pausada').count(), 2)
+        self.assertEqual(len(self.client.get('/api/ofertas/').json()['results']), 1)  # Caché de la API invalidada
+
+        self.client.post(reverse('admin:jobswipe_mensaje_changelist'), {
+            'action': 'moderar', '_selected_action': [Mensaje.objects.order_by('id').first().id],
+        })
+        resumen = Solicitud.objects.order_by('id').first()
+        self.assertEqual(resumen.ultimo_mensaje_texto, '[Mensaje eliminado por moderación]')
+        self.client.post(reverse('admin:jobswipe_mensaje_changelist'), {
+            'action': 'marcar_leidos', '_selected_action': list(Mensaje.objects.values_list('id', flat=True)),
+        })
+        self.assertFalse(Solicitud.objects.filter(no_leidos_empleador__gt=0).exists())
+
+
+def _urls_async():
+    # Las URLs del proyecto con home y matches async (lo que hace VISTAS_ASYNC en urls.py)
+    from django.urls import path
+    from prjJobSwipe import urls
+    modulo = types.ModuleType('urls_async')
+    modulo.urlpatterns = [
+        path('', vistas_async.home_view, name='home'),
+        path('matches/', vistas_async.matches_view, name='matches'),
+    ] + urls.urlpatterns
+    return modulo
+
+
+def _consulta_lenta(demora):
+    def consultar():
+        time.sleep(demora)
+        return {'uf': 39000.5, 'dolar': 950.25, 'euro': 1030.75}
+    return consultar
+
+
+@override_settings(
+    ROOT_URLCONF=_urls_async(), METRICAS_SERVER_TIMING=True,
+    MIDDLEWARE=[m for m in settings.MIDDLEWARE if 'whitenoise' not in m],  # Cadena 100% async
+)
+class VistasAsyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        empleador = User.objects.create_user('empresa', password='x', first_name='Acme')
+        perfil_empleador = Perfil.objects.create(user=empleador, tipo='empleador')
+        cls.candidato = User.objects.create_user('cand', password='x', first_name='Ana')
+        Perfil.objects.create(user=cls.candidato, tipo='candidato')
+        cls.pendiente = User.objects.create_user('nuevo', password='x')
+        Perfil.objects.create(user=cls.pendiente)
+        OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Backend async')
+        con_match = OfertaDeEmpleo.objects.create(perfil_empleador=perfil_empleador, titulo='Frontend con match')
+        Solicitud.objects.create(oferta=con_match, User_candidato=cls.candidato, estado='aceptada')
+
+    def setUp(self):
+        cache.clear()
+        self.async_client = AsyncClient()
+
+    async def test_home_espera_a_la_api_junto_con_la_base(self):
+        await self.async_client.aforce_login(self.candidato)
+        with mock.patch('jobswipe.indicadores._consultar_api', _consulta_lenta(0.05)):
+            respuesta = await self.async_client.get('/')
+        self.assertContains(respuesta, 'Backend async')
+        self.assertContains(respuesta, '950.25')  # Caché vacía: esperó a la API
+        self.assertIn('consultas', respuesta['Server-Timing'])
+        self.assertNotIn('db;dur=0.0;desc="0 consultas"', respuesta['Server-Timing'])
+
+    @override_settings(INDICADORES_ESPERA_ASYNC=0.05)
+    async def test_home_no_espera_mas_de_lo_configurado(self):
+        await self.async_client.aforce_login(self.candidato)
+        inicio = time.perf_counter()
+        with mock.patch('jobswipe.indicadores._consultar_api', _consulta_lenta(0.5)):
+            respuesta = await self.async_client.get('/')
+        self.assertLess(time.perf_counter() - inicio, 0.45)
+        self.assertContains(respuesta, 'Backend async')
+        self.assertNotContains(respuesta, '950.25')
+
+    async def test_home_redirige_perfil_pendiente(self):
+        await self.async_client.aforce_login(self.pendiente)
+        respuesta = await self.async_client.get('/')
+        self.assertRedirects(respuesta, reverse('elegir_rol'), fetch_redirect_response=False)
+
+    async def test_matches(self):
+        await self.async_client.aforce_login(self.candidato)
+        respuesta = await self.async_client.get('/matches/')
+        self.assertContains(respuesta, 'Frontend con match')
+        self.assertNotContains(respuesta, 'Backend async')
+
+    async def test_lectura_en_replica_async(self):
+        estado = replicas._EstadoRequest(fijado=False)
+        vistos = []
+
+        @replicas.lectura_en_replica
+        async def vista(request):
+            vistos.append(estado.lectura)
+            return HttpResponse()
+
+        token = replicas._estado.set(estado)
+        try:
+            await vista(RequestFactory().get('/'))
+        finally:
+            replicas._estado.reset(token)
+        self.assertEqual((vistos, estado.lectura), ([True], False))
+
+
+class WsgiVsAsgiBenchmarkTests(TestCase):
+
+    def test_proxy_lento_agrega_la_demora(self):
+        servidor = socket.create_server(('127.0.0.1', 0))
+        self.addCleanup(servidor.close)
+        terminar = threading.Event()
+        self.addCleanup(terminar.set)
+
+        def eco():
+            conexion, _ = servidor.accept()
+            with conexion:
+                conexion.sendall(conexion.recv(64))
+                terminar.wait(5)
+        threading.Thread(target=eco, daemon=True).start()
+
+        proxy = benchmark.ProxyLento('127.0.0.1', servidor.getsockname()[1], demora=0.1)
+        puerto = proxy.iniciar()
+        self.addCleanup(proxy.detener)
+        with socket.create_connection(('127.0.0.1', puerto), timeout=2) as cliente:
+            inicio = time.perf_counter()
+            cliente.sendall(b'SELECT 1')
+            self.assertEqual(cliente.recv(64), b'SELECT 1')
+            self.assertGreaterEqual(time.perf_counter() - inicio, 0.1)
+
+            # Con la conexión abierta, detener la cierra y espera al hilo del loop
+            proxy.detener()
+            self.assertNotIn('proxy-lento', [hilo.name for hilo in threading.enumerate()])
+            self.assertEqual(cliente.recv(64), b'')
+
+    def test_proxy_lento_con_puerto_ocupado(self):
+        ocupado = socket.create_server(('127.0.0.1', 0))
+        self.addCleanup(ocupado.close)
+        with self.assertRaisesMessage(CommandError, 'No se pudo abrir el puerto'):
+            call_command('proxy_lento', destino='127.0.0.1:5432', puerto=ocupado.getsockname()[1], stdout=StringIO())
+        self.assertNotIn('proxy-lento', [hilo.name for hilo in threading.enumerate()])
+
+    def test_compara_los_mismos_escenarios_en_ambos_servidores(self):
+        def correr(url, nombres, *args):
+            return [benchmark.resumir(nombre, [0.01], [2], 0.01) for nombre in nombres]
+
+        with mock.patch('jobswipe.benchmark.correr_http', side_effect=correr):
+            salida = StringIO()
+            with tempfile.TemporaryDirectory() as directorio:
+                call_command('benchmark', url='http://wsgi', url_asgi='http://asgi', escenarios=['home'],
+                             baseline=f'{directorio}/b.json', stdout=salida)
+        self.assertIn('wsgi:home', salida.getvalue())
+        self.assertIn('home: ASGI 1.00x el RPS de WSGI', salida.getvalue())
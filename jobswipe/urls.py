@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, vistas_async
+
+# Desplegado con ASGI (VISTAS_ASYNC=True), home y matches usan las versiones async
+vistas_lectura = vistas_async if settings.VISTAS_ASYNC else views
 
 urlpatterns = [
     # --- Vistas de Autenticación y Flujo ---
-    path('', views.home_view, name='home'),
+    path('', vistas_lectura.home_view, name='home'),
     path('register/', views.register_view, name='register'),
     path('elegir-rol/', views.elegir_rol_view, name='elegir_rol'),
     
@@ -12,6 +16,9 @@ urlpatterns = [
     
     # --- Vistas de Empleador ---
     path('oferta/crear/', views.crear_oferta_view, name='crear_oferta'),
+
+    # Carga masiva de ofertas (CSV / JSONL)
+    path('oferta/importar/', views.importar_ofertas_view, name='importar_ofertas'),
     
     # Editar oferta (CRUD)
     path(
@@ -33,7 +40,26 @@ urlpatterns = [
         views.revisar_candidatos_view, 
         name='revisar_candidatos'
     ),
+
+    # Cola de revisión (JSON): próximos candidatos y decisiones en lote
+    path(
+        'oferta/revisar/<int:id_oferta>/cola/',
+        views.cola_revision_view,
+        name='cola_revision'
+    ),
+    path(
+        'oferta/revisar/<int:id_oferta>/decisiones/',
+        views.decisiones_revision_view,
+        name='decisiones_revision'
+    ),
     
+    # Postulantes de la oferta en CSV (streaming)
+    path(
+        'oferta/<int:id_oferta>/postulantes.csv',
+        views.exportar_postulantes_view,
+        name='exportar_postulantes'
+    ),
+
     # Aceptar solicitud
     path(
         'solicitud/aceptar/<int:id_solicitud>/', 
@@ -54,13 +80,34 @@ urlpatterns = [
         views.postular_oferta_view,
         name='postular_oferta'
     ),
+
+    # Feed por lotes (JSON) para precargar tarjetas
+    path(
+        'feed/',
+        views.feed_ofertas_view,
+        name='feed_ofertas'
+    ),
+
+    # Búsqueda de ofertas (texto completo + filtros)
+    path(
+        'buscar/',
+        views.buscar_ofertas_view,
+        name='buscar_ofertas'
+    ),
+
+    # Swipes en lote (JSON): postular/descartar muchas ofertas de una vez
+    path(
+        'swipes/',
+        views.swipes_lote_view,
+        name='swipes_lote'
+    ),
     
     # --- Vistas de Chat y Matches ---
     
     # Bandeja de entrada
     path(
         'matches/',
-        views.matches_view,
+        vistas_lectura.matches_view,
         name='matches'
     ),
     
@@ -70,4 +117,14 @@ urlpatterns = [
         views.chat_view,
         name='chat'
     ),
+
+    # Historial del chat (JSON, paginado por cursor)
+    path(
+        'chat/<int:solicitud_id>/mensajes/',
+        views.chat_mensajes_view,
+        name='chat_mensajes'
+    ),
+
+    # --- Staff ---
+    path('tareas/', views.panel_tareas_view, name='panel_tareas'),
 ]
\ No newline at end of file
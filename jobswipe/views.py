@@ -1,115 +1,93 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse, JsonResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.views.decorators.http import require_POST
 from django.db import IntegrityError
-from django.db.models import Q # Para consultas complejas (OR)
-import requests # Necesario para la API externa
+import json
 
 # Importamos formularios y modelos
 from .forms import UserRegisterForm, OfertaDeEmpleoForm
-from .models import OfertaDeEmpleo, Perfil, Solicitud, Mensaje
-
-# -----------------------------------------------------------------
-# FUNCIONES AUXILIARES (APIs)
-# -----------------------------------------------------------------
-
-def obtener_indicadores_economicos():
-    """
-    Consume la API de mindicador.cl para obtener la UF y el Dólar.
-    """
-    try:
-        url = 'https://mindicador.cl/api'
-        response = requests.get(url)
-        data = response.json()
-        
-        return {
-            'uf': data['uf']['valor'],
-            'dolar': data['dolar']['valor'],
-            'euro': data['euro']['valor']
-        }
-    except:
-        # En caso de que no haya internet o falle la API, retornamos None
-        return None
-
+from .models import OfertaDeEmpleo, Perfil, Solicitud, Mensaje, CategoriaDeServicio, Tarea
+# Indicadores desde la caché (nunca espera a mindicador.cl)
+from .indicadores import obtener_indicadores_economicos
+from .feed import (
+    obtener_lote, serializar_tarjeta, aplicar_swipes, ofertas_disponibles,
+    CursorInvalido, TAMANO_LOTE
+)
+from .busqueda import buscar_ofertas, filtrar_ofertas
+from .relevancia import invalidar_colas, lote_por_relevancia
+from .dashboard import ofertas_del_empleador
+from .importacion import ArchivoInvalido, filas_postulantes, formato_de, importar_ofertas, leer_filas
+from .replicas import lectura_en_replica
+from .tareas import resumen_cola
+from .revision import cola_pendiente, serializar_candidato, aplicar_decisiones, TAMANO_COLA
+from .chat import (
+    participantes, crear_mensaje, marcar_leidos, notificar_mensaje, matches_de,
+    pagina_mensajes, version_chat, serializar_mensaje, TAMANO_PAGINA
+)
 
 # -----------------------------------------------------------------
 # VISTA DE INICIO (HOME)
 # -----------------------------------------------------------------
 @login_required
+@lectura_en_replica
 def home_view(request):
     """
     Vista principal. Redirige o muestra el dashboard según el rol.
     """
-    # 1. Llamada a la API externa (se ejecuta para todos)
+    # 1. Indicadores económicos (desde la caché, se ejecuta para todos)
     indicadores = obtener_indicadores_economicos()
 
-    # 2. Admin / Staff
+    # 2. Dashboard según el rol
+    context = contexto_home(request)
+    if isinstance(context, HttpResponse):
+        return context
+    context['indicadores'] = indicadores
+    return render(request, 'jobswipe/home.html', context)
+
+
+def contexto_home(request):
+    """
+    Contexto de home según el rol (sin los indicadores), o la redirección
+    si el perfil está incompleto. Compartido con vistas_async.home_view.
+    """
+    # A) Admin / Staff
     if request.user.is_staff:
-        context = {
-            'mensaje': 'Bienvenido/a, Admin.',
-            'indicadores': indicadores
-        }
-        return render(request, 'jobswipe/home.html', context)
+        return {'mensaje': 'Bienvenido/a, Admin.'}
 
-    # 3. Usuarios normales
+    # B) Usuarios normales
     try:
         perfil = request.user.perfil 
-        
-        # A) Perfil incompleto -> Forzar elección de rol
-        if perfil.tipo == 'pendiente':
-            messages.info(request, '¡Bienvenido/a! Por favor, completa tu perfil para continuar.')
-            return redirect('elegir_rol')
-        
-        # B) Candidato
-        elif perfil.tipo == 'candidato':
-            # Obtener IDs de ofertas ya postuladas
-            ofertas_postuladas_ids = Solicitud.objects.filter(
-                User_candidato=request.user
-            ).values_list('oferta_id', flat=True)
-
-            # --- ALGORITMO DE FILTRO LEY 21.015 ---
-            if perfil.es_pcd:
-                # Si el filtro está activo: primero las inclusivas, luego fecha
-                orden = ['-es_inclusion', '-fecha_publicacion']
-            else:
-                # Si no, solo por fecha
-                orden = ['-fecha_publicacion']
-
-            # Buscar ofertas activas que NO estén postuladas
-            ofertas_activas = OfertaDeEmpleo.objects.filter(
-                estado='activa'
-            ).exclude(
-                id__in=ofertas_postuladas_ids
-            ).order_by(*orden)
-            
-            context = {
-                'mensaje': 'Bienvenido, Candidato. ¡Desliza para tu próximo empleo!',
-                'ofertas': ofertas_activas,
-                'ofertas_postuladas_ids': list(ofertas_postuladas_ids),
-                'indicadores': indicadores
-            }
-            
-        # C) Empleador
-        elif perfil.tipo == 'empleador':
-            ofertas_propias = OfertaDeEmpleo.objects.filter(
-                perfil_empleador=perfil
-            ).order_by('-fecha_publicacion')
-            
-            context = {
-                'mensaje': 'Bienvenido, Empleador. Aquí gestionarás tus ofertas.',
-                'ofertas_propias': ofertas_propias,
-                'indicadores': indicadores
-            }
-        
-        return render(request, 'jobswipe/home.html', context)
-
     except Perfil.DoesNotExist:
-        context = {
-            'mensaje': 'Error: No se encontró tu perfil. Contacta a soporte.',
-            'indicadores': indicadores
+        return {'mensaje': 'Error: No se encontró tu perfil. Contacta a soporte.'}
+
+    # Perfil incompleto -> Forzar elección de rol
+    if perfil.tipo == 'pendiente':
+        messages.info(request, '¡Bienvenido/a! Por favor, completa tu perfil para continuar.')
+        return redirect('elegir_rol')
+
+    # Candidato
+    elif perfil.tipo == 'candidato':
+        # Solo el primer lote del feed (Ley 21.015 incluida);
+        # el resto lo pide el navegador a 'feed_ofertas' mientras desliza.
+        orden = request.GET.get('orden', '')
+        ofertas, siguiente_cursor = _lote_feed(request.user, perfil, orden, filtros=request.GET)
+        return {
+            'mensaje': 'Bienvenido, Candidato. ¡Desliza para tu próximo empleo!',
+            'ofertas': ofertas,
+            'siguiente_cursor': siguiente_cursor,
+            'orden': orden,
         }
-        return render(request, 'jobswipe/home.html', context)
+
+    # Empleador
+    # Lista cacheada por empleador (se invalida al guardar sus ofertas)
+    return {
+        'mensaje': 'Bienvenido, Empleador. Aquí gestionarás tus ofertas.',
+        'ofertas_propias': ofertas_del_empleador(perfil),
+    }
 
 
 # -----------------------------------------------------------------
@@ -192,10 +170,54 @@ def crear_oferta_view(request):
     return render(request, 'jobswipe/crear_oferta.html', {'form': form})
 
 
+@login_required
+def importar_ofertas_view(request):
+    """
+    Carga masiva de ofertas desde un CSV o JSONL (columnas: titulo,
+    descripcion, categoria, es_inclusion, moneda, sueldo). Las filas
+    inválidas se informan y el resto se publica.
+    """
+    if request.user.perfil.tipo != 'empleador':
+        return redirect('home')
+
+    resultado = None
+    if request.method == 'POST' and request.FILES.get('archivo'):
+        archivo = request.FILES['archivo']
+        try:
+            resultado = importar_ofertas(
+                request.user.perfil,
+                leer_filas(archivo.file, formato_de(archivo.name)),
+                max_filas=getattr(settings, 'IMPORTACION_MAX_FILAS', 5000),
+            )
+        except ArchivoInvalido as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'{resultado["creadas"]} ofertas publicadas.')
+            if not resultado['errores']:
+                return redirect('home')
+
+    return render(request, 'jobswipe/importar_ofertas.html', {
+        'resultado': resultado,
+        'errores': resultado['errores'][:100] if resultado else [],
+    })
+
+
+@login_required
+def exportar_postulantes_view(request, id_oferta):
+    # CSV en streaming: se genera mientras se descarga, sin armarlo en memoria
+    oferta = get_object_or_404(OfertaDeEmpleo, id=id_oferta)
+    if request.user.perfil.id != oferta.perfil_empleador_id:
+        return redirect('home')
+
+    respuesta = StreamingHttpResponse(filas_postulantes(oferta), content_type='text/csv; charset=utf-8')
+    respuesta['Content-Disposition'] = f'attachment; filename="postulantes_oferta_{oferta.id}.csv"'
+    return respuesta
+
+
 @login_required
 def eliminar_oferta_view(request, id_oferta):
     oferta = get_object_or_404(OfertaDeEmpleo, id=id_oferta)
-    if request.user.perfil == oferta.perfil_empleador:
+    if request.user.perfil.id == oferta.perfil_empleador_id:
         oferta.delete()
         messages.success(request, 'Oferta eliminada.')
     return redirect('home')
@@ -205,7 +227,7 @@ def eliminar_oferta_view(request, id_oferta):
 def editar_oferta_view(request, id_oferta):
     oferta = get_object_or_404(OfertaDeEmpleo, id=id_oferta)
     
-    if request.user.perfil != oferta.perfil_empleador:
+    if request.user.perfil.id != oferta.perfil_empleador_id:
         messages.error(request, 'No tienes permiso para editar esta oferta.')
         return redirect('home')
 
@@ -225,13 +247,12 @@ def editar_oferta_view(request, id_oferta):
 def revisar_candidatos_view(request, id_oferta):
     oferta = get_object_or_404(OfertaDeEmpleo, id=id_oferta)
     
-    if request.user.perfil != oferta.perfil_empleador:
+    if request.user.perfil.id != oferta.perfil_empleador_id:
         return redirect('home')
     
-    proxima_solicitud = Solicitud.objects.filter(
-        oferta=oferta, 
-        estado='pendiente'
-    ).first()
+    # Mismo orden que la API de la cola (usa el índice parcial de pendientes)
+    cola = cola_pendiente(oferta, tamano=1)
+    proxima_solicitud = cola[0] if cola else None
     
     return render(request, 'jobswipe/revisar_candidatos.html', {
         'oferta': oferta,
@@ -239,26 +260,76 @@ def revisar_candidatos_view(request, id_oferta):
     })
 
 
+@login_required
+def cola_revision_view(request, id_oferta):
+    """
+    API JSON: próximos N candidatos pendientes de la oferta, con su perfil.
+    ?orden=relevancia pone primero a los candidatos más afines.
+    """
+    oferta = get_object_or_404(OfertaDeEmpleo, id=id_oferta)
+    if request.user.perfil.id != oferta.perfil_empleador_id:
+        return JsonResponse({'error': 'No tienes permiso para revisar esta oferta.'}, status=403)
+
+    try:
+        tamano = int(request.GET.get('tamano', TAMANO_COLA))
+    except ValueError:
+        tamano = TAMANO_COLA
+
+    return JsonResponse({
+        'candidatos': [
+            serializar_candidato(s) for s in cola_pendiente(oferta, tamano, orden=request.GET.get('orden'))
+        ],
+    })
+
+
+@login_required
+@require_POST
+def decisiones_revision_view(request, id_oferta):
+    """
+    API JSON: aplica muchas decisiones de una vez.
+      {"decisiones": [{"solicitud": 1, "accion": "aceptar"}, {"solicitud": 2, "accion": "rechazar"}]}
+    Las solicitudes que otro reclutador ya procesó vuelven en "conflictos".
+    """
+    oferta = get_object_or_404(OfertaDeEmpleo, id=id_oferta)
+    if request.user.perfil.id != oferta.perfil_empleador_id:
+        return JsonResponse({'error': 'No tienes permiso para revisar esta oferta.'}, status=403)
+
+    try:
+        decisiones = json.loads(request.body).get('decisiones', [])
+        aplicadas, conflictos = aplicar_decisiones(oferta, decisiones)
+    except (ValueError, AttributeError) as e:  # JSON inválido o DecisionInvalida
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'aplicadas': aplicadas, 'conflictos': conflictos})
+
+
+def _decidir_solicitud(request, id_solicitud, accion):
+    solicitud = get_object_or_404(
+        Solicitud.objects.select_related('oferta', 'User_candidato'), id=id_solicitud
+    )
+    if request.user.perfil.id != solicitud.oferta.perfil_empleador_id:
+        return None, redirect('home')
+
+    aplicadas, _ = aplicar_decisiones(solicitud.oferta, [{'solicitud': solicitud.id, 'accion': accion}])
+    if not aplicadas:
+        messages.info(request, 'Este candidato ya fue revisado.')
+    return (solicitud if aplicadas else None), redirect('revisar_candidatos', id_oferta=solicitud.oferta_id)
+
+
 @login_required
 def aceptar_solicitud_view(request, id_solicitud):
-    solicitud = get_object_or_404(Solicitud, id=id_solicitud)
-    if request.user.perfil == solicitud.oferta.perfil_empleador:
-        solicitud.estado = 'aceptada'
-        solicitud.save()
+    solicitud, respuesta = _decidir_solicitud(request, id_solicitud, 'aceptar')
+    if solicitud:
         messages.success(request, f'¡Match con {solicitud.User_candidato.first_name}!')
-        return redirect('revisar_candidatos', id_oferta=solicitud.oferta.id)
-    return redirect('home')
+    return respuesta
 
 
 @login_required
 def rechazar_solicitud_view(request, id_solicitud):
-    solicitud = get_object_or_404(Solicitud, id=id_solicitud)
-    if request.user.perfil == solicitud.oferta.perfil_empleador:
-        solicitud.estado = 'rechazada'
-        solicitud.save()
+    solicitud, respuesta = _decidir_solicitud(request, id_solicitud, 'rechazar')
+    if solicitud:
         messages.warning(request, 'Candidato descartado.')
-        return redirect('revisar_candidatos', id_oferta=solicitud.oferta.id)
-    return redirect('home')
+    return respuesta
 
 
 # -----------------------------------------------------------------
@@ -284,53 +355,221 @@ def postular_oferta_view(request, id_oferta):
     return redirect('home')
 
 
+def _lote_feed(user, perfil, orden, cursor=None, tamano=TAMANO_LOTE, filtros=None):
+    # orden=relevancia: ranking por habilidades; orden=sueldo: mejor pagadas
+    # (keyset sobre sueldo_normalizado); si no, por fecha (keyset)
+    if orden == 'relevancia':
+        return lote_por_relevancia(user, perfil, cursor=cursor, tamano=tamano, filtros=filtros)
+    return obtener_lote(user, perfil, cursor=cursor, tamano=tamano, orden=orden, filtros=filtros)
+
+
+@login_required
+@lectura_en_replica
+def feed_ofertas_view(request):
+    """
+    API JSON del feed: entrega el siguiente lote de tarjetas
+    para que el cliente lo precargue mientras el usuario desliza.
+    ?orden=relevancia ordena por afinidad con las habilidades del candidato,
+    ?orden=sueldo por sueldo en pesos; acepta los filtros de filtrar_ofertas.
+    """
+    perfil = request.user.perfil
+    if perfil.tipo != 'candidato':
+        return JsonResponse({'error': 'Solo los candidatos tienen feed.'}, status=403)
+
+    try:
+        tamano = int(request.GET.get('tamano', TAMANO_LOTE))
+    except ValueError:
+        tamano = TAMANO_LOTE
+
+    try:
+        ofertas, siguiente_cursor = _lote_feed(
+            request.user, perfil, request.GET.get('orden'), cursor=request.GET.get('cursor'), tamano=tamano,
+            filtros=request.GET,
+        )
+    except CursorInvalido as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'ofertas': [serializar_tarjeta(oferta) for oferta in ofertas],
+        'siguiente': siguiente_cursor,
+    })
+
+
+@login_required
+@lectura_en_replica
+def buscar_ofertas_view(request):
+    """
+    Búsqueda de texto completo (título, descripción, categoría) con filtros.
+    """
+    if request.user.perfil.tipo != 'candidato':
+        return redirect('home')
+
+    texto = request.GET.get('q', '').strip()
+    ofertas = filtrar_ofertas(ofertas_disponibles(request.user), request.GET)
+    if texto:
+        ofertas = buscar_ofertas(texto, ofertas)
+    else:
+        ofertas = ofertas.order_by('-fecha_publicacion', '-id')
+
+    context = {
+        'q': texto,
+        'ofertas': ofertas.select_related('perfil_empleador__user', 'categoria')[:50],
+        'categorias': CategoriaDeServicio.objects.order_by('nombre'),
+        'filtros': request.GET,
+    }
+    return render(request, 'jobswipe/buscar.html', context)
+
+
+@login_required
+@require_POST
+def swipes_lote_view(request):
+    """
+    API JSON para swipes en lote. Recibe:
+      {"decisiones": [{"oferta": 1, "accion": "postular"}, {"oferta": 2, "accion": "descartar"}],
+       "cursor": "...", "tamano": 10, "orden": "...", "filtros": {"categoria": 3}}
+    Guarda todo de una vez y responde con las próximas tarjetas del feed
+    ("tamano": 0 para no pedir tarjetas), con el mismo orden y filtros que
+    feed_ofertas_view ("filtros" o, si no viene, el query string).
+    """
+    perfil = request.user.perfil
+    if perfil.tipo != 'candidato':
+        return JsonResponse({'error': 'Solo los candidatos pueden postular.'}, status=403)
+
+    try:
+        datos = json.loads(request.body)
+        filtros = datos.get('filtros')
+        if filtros is None:
+            filtros = request.GET
+        elif isinstance(filtros, dict):
+            filtros = {clave: str(valor) for clave, valor in filtros.items()}  # Como llegan en el query string
+        else:
+            raise ValueError('"filtros" debe ser un objeto.')
+        aplicadas = aplicar_swipes(request.user, datos.get('decisiones', []))
+        invalidar_colas(aplicadas['postular'])  # bulk_create no dispara señales
+        tamano = int(datos.get('tamano', TAMANO_LOTE))
+    except (ValueError, TypeError, AttributeError) as e:  # JSON inválido, DecisionInvalida, tamano
+        return JsonResponse({'error': str(e)}, status=400)
+
+    respuesta = {'postuladas': aplicadas['postular'], 'descartadas': aplicadas['descartar']}
+    if tamano > 0:
+        try:
+            ofertas, siguiente_cursor = _lote_feed(
+                request.user, perfil, datos.get('orden'), cursor=datos.get('cursor'), tamano=tamano,
+                filtros=filtros,
+            )
+        except CursorInvalido as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        respuesta['ofertas'] = [serializar_tarjeta(oferta) for oferta in ofertas]
+        respuesta['siguiente'] = siguiente_cursor
+    return JsonResponse(respuesta)
+
+
 # -----------------------------------------------------------------
 # CHAT Y MATCHES
 # -----------------------------------------------------------------
 
 @login_required
+@lectura_en_replica
 def matches_view(request):
-    matches = Solicitud.objects.filter(
-        Q(estado='aceptada'),
-        Q(User_candidato=request.user) | 
-        Q(oferta__perfil_empleador=request.user.perfil)
-    ).order_by('-fecha_postulacion')
-    
-    return render(request, 'jobswipe/matches.html', {'matches': matches})
+    return render(request, 'jobswipe/matches.html', {'matches': matches_de(request.user)})
 
 
 @login_required
 def chat_view(request, solicitud_id):
-    solicitud = get_object_or_404(Solicitud, id=solicitud_id, estado='aceptada')
-    
-    es_candidato = (request.user == solicitud.User_candidato)
-    es_empleador = (request.user.perfil == solicitud.oferta.perfil_empleador)
+    solicitud = get_object_or_404(
+        Solicitud.objects.select_related('oferta__perfil_empleador__user', 'User_candidato'),
+        id=solicitud_id, estado='aceptada'
+    )
     
-    if not (es_candidato or es_empleador):
+    otro_usuario = participantes(solicitud, request.user)
+    if otro_usuario is None:
         messages.error(request, 'No tienes permiso para ver este chat.')
         return redirect('matches')
 
-    if es_candidato:
-        otro_usuario = solicitud.oferta.perfil_empleador.user
-    else:
-        otro_usuario = solicitud.User_candidato
-
     if request.method == 'POST':
         contenido = request.POST.get('contenido')
         if contenido:
-            Mensaje.objects.create(
-                solicitud=solicitud,
-                User_origen=request.user, 
-                User_destino=otro_usuario,
-                contenido=contenido
-            )
+            mensaje = crear_mensaje(solicitud, request.user, otro_usuario, contenido)
+            # Si el otro usuario tiene el chat abierto, lo recibe por WebSocket
+            notificar_mensaje(mensaje)
             return redirect('chat', solicitud_id=solicitud_id)
 
-    mensajes = Mensaje.objects.filter(solicitud=solicitud).order_by('fecha')
+    # El contador desnormalizado evita el UPDATE cuando no hay nada por leer
+    if request.user.id == solicitud.User_candidato_id:
+        no_leidos = solicitud.no_leidos_candidato
+    else:
+        no_leidos = solicitud.no_leidos_empleador
+    if no_leidos:
+        marcar_leidos(solicitud.id, request.user)
+    # Solo la página más reciente; los anteriores se cargan al hacer scroll
+    mensajes, hay_mas_antiguos = pagina_mensajes(solicitud.id)
 
     context = {
         'solicitud': solicitud,
         'mensajes': mensajes,
+        'hay_mas_antiguos': hay_mas_antiguos,
         'otro_usuario_nombre': otro_usuario.first_name
     }
-    return render(request, 'jobswipe/chat.html', context)
\ No newline at end of file
+    return render(request, 'jobswipe/chat.html', context)
+
+
+@login_required
+def chat_mensajes_view(request, solicitud_id):
+    """
+    API JSON del historial del chat.
+    ?antes=<id> para mensajes anteriores, ?despues=<id> para polling incremental.
+    Soporta ETag / If-None-Match (304 si no hay cambios).
+    """
+    solicitud = get_object_or_404(
+        Solicitud.objects.select_related('oferta__perfil_empleador__user', 'User_candidato'),
+        id=solicitud_id, estado='aceptada'
+    )
+    if participantes(solicitud, request.user) is None:
+        return JsonResponse({'error': 'No tienes permiso para ver este chat.'}, status=403)
+
+    try:
+        antes = int(request.GET['antes']) if 'antes' in request.GET else None
+        despues = int(request.GET['despues']) if 'despues' in request.GET else None
+        tamano = int(request.GET.get('tamano', TAMANO_PAGINA))
+    except ValueError:
+        return JsonResponse({'error': 'Parámetros inválidos.'}, status=400)
+
+    etag = f'"{version_chat(solicitud)}-{antes}-{despues}-{tamano}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        respuesta = HttpResponseNotModified()
+        respuesta['ETag'] = etag
+        return respuesta
+
+    mensajes, hay_mas = pagina_mensajes(solicitud.id, antes=antes, despues=despues, tamano=tamano)
+    respuesta = JsonResponse({
+        'mensajes': [serializar_mensaje(m) for m in mensajes],
+        'hay_mas': hay_mas,
+    })
+    respuesta['ETag'] = etag
+    respuesta['Cache-Control'] = 'private, no-cache'
+    return respuesta
+
+# -----------------------------------------------------------------
+# PANEL DE LA COLA DE TAREAS (STAFF)
+# -----------------------------------------------------------------
+
+@login_required
+def panel_tareas_view(request):
+    """
+    Profundidad de la cola por tarea y últimas fallas.
+    ?formato=json para monitoreo.
+    """
+    if not request.user.is_staff:
+        return redirect('home')
+
+    resumen = resumen_cola()
+    if request.GET.get('formato') == 'json':
+        return JsonResponse({'tareas': [
+            {**fila,
+             'mas_antigua': fila['mas_antigua'].isoformat() if fila['mas_antigua'] else None,
+             'espera': fila['espera'].total_seconds() if fila['espera'] else None}
+            for fila in resumen
+        ]})
+
+    fallidas = Tarea.objects.filter(estado='fallida').order_by('-actualizada')[:20]
+    return render(request, 'jobswipe/panel_tareas.html', {'resumen': resumen, 'fallidas': fallidas})
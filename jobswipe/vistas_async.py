@@ -0,0 +1,48 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse
+from django.shortcuts import render
+
+from .indicadores import obtener_indicadores_async
+from .replicas import lectura_en_replica
+from .views import contexto_home, matches_de
+
+# -----------------------------------------------------------------
+# VISTAS ASYNC (servidas con ASGI)
+# -----------------------------------------------------------------
+# Con VISTAS_ASYNC=True (urls.py) home y matches se sirven con estas
+# versiones. Bajo ASGI un request que espera (a la base, a la caché o a
+# una API) no ocupa un worker: el event loop atiende otros mientras tanto.
+# Lo independiente corre a la vez con asyncio.gather. La lógica es la de
+# views.py; el ORM y el render son sync y corren en el hilo del request
+# (sync_to_async), que es donde vive su conexión a la base.
+# Bajo WSGI conviene dejarlas apagadas: Django tendría que levantar un
+# event loop por request.
+# La API de ofertas sigue en DRF, que no tiene vistas async (autenticación,
+# throttling y paginación son sync); bajo ASGI corre en el pool de hilos.
+
+
+@login_required
+@lectura_en_replica
+async def home_view(request):
+    # Indicadores (caché o API) y el dashboard según el rol, a la vez
+    indicadores, context = await asyncio.gather(
+        obtener_indicadores_async(espera=getattr(settings, 'INDICADORES_ESPERA_ASYNC', 0.3)),
+        sync_to_async(contexto_home)(request),
+    )
+    if isinstance(context, HttpResponse):
+        return context
+    context['indicadores'] = indicadores
+    return await sync_to_async(render)(request, 'jobswipe/home.html', context)
+
+
+@login_required
+@lectura_en_replica
+async def matches_view(request):
+    user = await request.auser()
+    await sync_to_async(getattr)(user, 'perfil')  # Suele venir ya cargado (sesiones.py); si no, en el hilo
+    matches = [match async for match in matches_de(user)]
+    return await sync_to_async(render)(request, 'jobswipe/matches.html', {'matches': matches})
@@ -2,6 +2,11 @@
 ASGI config for prjJobSwipe project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django as usual; WebSockets (chat en tiempo real) go to Channels.
+
+Con VISTAS_ASYNC=True home y matches son vistas async (jobswipe/vistas_async.py)
+y los estáticos se sirven aquí con WhiteNoise, fuera de la cadena de
+middlewares. Cómo levantarlo con uvicorn: ver gunicorn.conf.py.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +18,38 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'prjJobSwipe.settings')
 
-application = get_asgi_application()
+# Inicializar Django antes de importar código que use modelos
+django_asgi_app = get_asgi_application()
+
+from asgiref.wsgi import WsgiToAsgi
+from channels.auth import AuthMiddlewareStack
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
+from django.conf import settings
+from whitenoise import WhiteNoise
+
+from jobswipe.routing import websocket_urlpatterns
+
+
+def _no_encontrado(environ, start_response):
+    start_response('404 Not Found', [('Content-Type', 'text/plain')])
+    return [b'Not Found']
+
+
+def _con_estaticos(app):
+    # Solo /static/ pasa por WhiteNoise (WSGI, en el pool de hilos); el resto va directo a Django
+    prefijo = '/' + settings.STATIC_URL.strip('/') + '/'
+    estaticos = WsgiToAsgi(WhiteNoise(_no_encontrado, root=settings.STATIC_ROOT, prefix=settings.STATIC_URL))
+
+    async def http(scope, receive, send):
+        app_destino = estaticos if scope['path'].startswith(prefijo) else app
+        await app_destino(scope, receive, send)
+    return http
+
+
+application = ProtocolTypeRouter({
+    'http': _con_estaticos(django_asgi_app) if settings.VISTAS_ASYNC else django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(
+        AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+    ),
+})
@@ -0,0 +1,74 @@
+"""
+Configuración de las conexiones a la base de datos (usada por settings.py).
+
+Cada request abría una conexión nueva (TCP + TLS + autenticación) contra
+la base administrada. Aquí se decide, según el motor y el entorno, cómo
+reutilizarlas:
+  - Postgres: pool nativo de Django (psycopg_pool), con un tamaño por
+    proceso calculado desde el máximo de conexiones y los workers.
+  - MySQL (y Postgres sin pool): conexiones persistentes (CONN_MAX_AGE)
+    con health checks, una por hilo. Django no trae pool para MySQL.
+"""
+import os
+
+
+def _entero(nombre, defecto):
+    return int(os.environ.get(nombre, defecto))
+
+
+def _booleano(nombre, defecto):
+    return os.environ.get(nombre, str(defecto)) == 'True'
+
+
+def tamano_pool(max_conexiones, workers, hilos=1):
+    """
+    Conexiones que puede abrir cada proceso sin que entre todos superen
+    `max_conexiones` (el límite del plan de la base menos un margen).
+    Nunca menos que los hilos del worker: cada hilo necesita la suya.
+    """
+    por_worker = max_conexiones // max(workers, 1)
+    return max(por_worker, hilos, 1)
+
+
+def configurar_conexion(config):
+    """
+    Completa un dict de DATABASES['default'] con pool o conexiones
+    persistentes, health checks y TLS. Todo se ajusta por variables de entorno:
+      DB_POOL (True/False), DB_MAX_CONEXIONES, WEB_CONCURRENCY (workers de
+      gunicorn), GUNICORN_THREADS, DB_POOL_MIN, DB_POOL_TIMEOUT,
+      DB_CONN_MAX_AGE, DB_SSL_CA (ruta al certificado de la CA) y VISTAS_ASYNC.
+    """
+    config = dict(config)
+    opciones = dict(config.get('OPTIONS', {}))
+    motor = config.get('ENGINE', '')
+
+    workers = _entero('WEB_CONCURRENCY', 2)
+    hilos = _entero('GUNICORN_THREADS', 1)
+    maximo = tamano_pool(_entero('DB_MAX_CONEXIONES', 20), workers, hilos)
+
+    if 'postgresql' in motor and _booleano('DB_POOL', False):
+        # El pool y CONN_MAX_AGE se excluyen: la conexión vuelve al pool al terminar el request
+        opciones['pool'] = {
+            'min_size': min(_entero('DB_POOL_MIN', 2), maximo),
+            'max_size': maximo,
+            'timeout': _entero('DB_POOL_TIMEOUT', 10),
+        }
+        config['CONN_MAX_AGE'] = 0
+    elif 'sqlite' not in motor:
+        # Bajo ASGI (VISTAS_ASYNC) cada request corre el ORM en un hilo propio:
+        # una conexión persistente por hilo se acumularía, por eso 0 (o el pool).
+        config['CONN_MAX_AGE'] = _entero('DB_CONN_MAX_AGE', 0 if _booleano('VISTAS_ASYNC', False) else 60)
+    # Una conexión reutilizada se verifica antes del request: si la base
+    # la cerró (reinicio, timeout de inactividad) se abre otra en vez de fallar.
+    config['CONN_HEALTH_CHECKS'] = True
+
+    ca = os.environ.get('DB_SSL_CA')
+    if ca:
+        if 'mysql' in motor:
+            opciones['ssl'] = {'ca': ca}
+            opciones['ssl_mode'] = 'VERIFY_IDENTITY'
+        elif 'postgresql' in motor:
+            opciones.update({'sslmode': 'verify-full', 'sslrootcert': ca})
+
+    config['OPTIONS'] = opciones
+    return config
@@ -15,6 +15,8 @@ from dotenv import load_dotenv
 from decouple import config
 import dj_database_url
 
+from .basedatos import configurar_conexion
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -37,6 +39,7 @@ ALLOWED_HOSTS = ['*']
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',  # runserver sobre ASGI (WebSockets del chat); debe ir primero
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -47,9 +50,12 @@ INSTALLED_APPS = [
     'crispy_forms',
     'crispy_bootstrap5',
     'rest_framework',
+    'rest_framework.authtoken',
+    'channels',
 ]
 
 MIDDLEWARE = [
+    'jobswipe.metricas.MetricasMiddleware',  # Primero: mide el request completo
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,24 +66,41 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Despliegue ASGI (uvicorn, ver gunicorn.conf.py): vistas async de lectura
+# (jobswipe/vistas_async.py). WhiteNoise es solo WSGI y partiría la cadena
+# async de middlewares: los estáticos los sirve prjJobSwipe/asgi.py.
+VISTAS_ASYNC = os.environ.get('VISTAS_ASYNC', 'False') == 'True'
+if VISTAS_ASYNC:
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'prjJobSwipe.urls'
 
+# En producción las plantillas se compilan una vez por proceso (cached.Loader);
+# en desarrollo se releen en cada request para ver los cambios sin reiniciar.
+CARGADORES_PLANTILLAS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    CARGADORES_PLANTILLAS = [('django.template.loaders.cached.Loader', CARGADORES_PLANTILLAS)]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
+        'BACKEND': 'jobswipe.metricas.PlantillasMedidas',  # DjangoTemplates + tiempo de render
+        'DIRS': [BASE_DIR / 'Templates'],  # Igual que la carpeta (Linux distingue mayúsculas)
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': CARGADORES_PLANTILLAS,
         },
     },
 ]
 
 WSGI_APPLICATION = 'prjJobSwipe.wsgi.application'
+ASGI_APPLICATION = 'prjJobSwipe.asgi.application'
 
 
 # Database
@@ -103,6 +126,27 @@ else: #intento nuevo
         }
     }
 
+# Conexiones persistentes o pool, health checks y TLS (ver prjJobSwipe/basedatos.py).
+# El pool se reparte entre los workers: DB_MAX_CONEXIONES / WEB_CONCURRENCY por proceso.
+DATABASES['default'] = configurar_conexion(DATABASES['default'])
+
+# Réplicas de lectura (jobswipe/replicas.py): URLs separadas por coma y,
+# opcionalmente, sus pesos, p. ej. DATABASE_REPLICA_PESOS=3,1.
+# En los tests cada réplica es un espejo de 'default'.
+REPLICAS = {}
+_urls_replicas = [u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+_pesos_replicas = [int(p) for p in os.environ.get('DATABASE_REPLICA_PESOS', '').split(',') if p.strip()]
+for _i, _url in enumerate(_urls_replicas, start=1):
+    _replica = configurar_conexion(dj_database_url.parse(_url))
+    _replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica_{_i}'] = _replica
+    REPLICAS[f'replica_{_i}'] = _pesos_replicas[_i - 1] if _i <= len(_pesos_replicas) else 1
+REPLICAS_VENTANA = 10  # Segundos en la primaria después de escribir (read-your-writes)
+if REPLICAS:
+    DATABASE_ROUTERS = ['jobswipe.replicas.RouterReplicas']
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware') + 1,
+                      'jobswipe.replicas.ReplicasMiddleware')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -142,6 +186,12 @@ STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Archivos subidos (fotos de perfil)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+# Sin nginx/CDN delante, Django sirve MEDIA_ROOT (ver jobswipe/imagenes.py)
+SERVIR_MEDIA = os.environ.get('SERVIR_MEDIA', str(DEBUG)) == 'True'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -154,3 +204,138 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 LOGIN_REDIRECT_URL = 'home' 
 LOGOUT_REDIRECT_URL = 'home'
 LOGIN_URL = 'login' # Le dice a @login_required a dónde redirigir
+
+# Caché compartida
+# Con REDIS_URL todos los workers de gunicorn comparten la caché;
+# en local basta con la caché en memoria del proceso.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Las cachés que se borran al escribir (sesión y usuario, dashboard del
+# empleador, respuestas de la API) solo sirven si todos los workers ven la
+# misma caché: con la caché en memoria de cada proceso el borrado no llega
+# a los otros workers y estos servirían datos viejos hasta el TTL.
+CACHE_COMPARTIDA = os.environ.get('CACHE_COMPARTIDA', str(bool(REDIS_URL))) == 'True'
+
+# Sesiones y usuario sin tocar la base en cada request (solo con caché
+# compartida): la sesión se lee de la caché (y se respalda en la base) y el
+# usuario llega con su Perfil desde la caché (jobswipe/sesiones.py).
+# ModelBackend queda para las sesiones abiertas antes del cambio.
+if CACHE_COMPARTIDA:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    AUTHENTICATION_BACKENDS = [
+        'jobswipe.sesiones.BackendConPerfil',
+        'django.contrib.auth.backends.ModelBackend',
+    ]
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+SESION_USUARIO_TTL = 60 * 5
+
+# Channel layer para el chat en tiempo real
+# En memoria sirve para un solo proceso (y para los tests); con varios
+# workers se cambia por un backend compartido, p. ej.:
+#   CHANNEL_LAYERS_BACKEND=channels_redis.core.RedisChannelLayer
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': os.environ.get('CHANNEL_LAYERS_BACKEND', 'channels.layers.InMemoryChannelLayer'),
+    }
+}
+if REDIS_URL and 'redis' in CHANNEL_LAYERS['default']['BACKEND'].lower():
+    CHANNEL_LAYERS['default']['CONFIG'] = {'hosts': [REDIS_URL]}
+
+# API REST (web y app móvil)
+# Los contadores del throttling viven en la caché por defecto (Redis en
+# producción), así el límite por usuario es el mismo en todos los workers.
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.TokenAuthentication',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'rest_framework.throttling.AnonRateThrottle',
+        'rest_framework.throttling.UserRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '300/hour',
+        'user': '3000/hour',
+        'mensajes': '30/minute',
+    },
+}
+
+# API REST de ofertas: las respuestas (solo con CACHE_COMPARTIDA) se
+# invalidan al escribir una oferta, el TTL solo acota lo que ocupan las
+# consultas poco repetidas.
+API_OFERTAS_CACHE_TTL = 60 * 5
+
+# Dashboard del empleador (jobswipe/dashboard.py): la lista se borra al
+# guardar una de sus ofertas (solo se cachea con CACHE_COMPARTIDA); las
+# tarjetas se cachean por id y fecha_actualizacion.
+CACHE_DASHBOARD_TTL = 60 * 10
+
+# Métricas de rendimiento (jobswipe/metricas.py, endpoint /metricas/)
+METRICAS_SERVER_TIMING = DEBUG          # En producción la cabecera solo se envía al staff
+# /metricas/ exige el token (cabecera "Authorization: Bearer <token>") o un usuario staff.
+# METRICAS_IPS_PERMITIDAS solo sirve si Django ve la IP real del cliente: detrás de un
+# proxy reverso local (nginx, el router de la plataforma) REMOTE_ADDR es siempre
+# 127.0.0.1 y permitirla dejaría el endpoint público. Por eso va vacía por defecto.
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+METRICAS_IPS_PERMITIDAS = tuple(
+    ip.strip() for ip in os.environ.get('METRICAS_IPS_PERMITIDAS', '').split(',') if ip.strip()
+)
+METRICAS_CONSULTA_LENTA = 0.2           # Segundos; se registra SQL + pila de la vista
+METRICAS_MUESTREO_LENTAS = 1.0          # Fracción de consultas lentas que se registran
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # Consultas lentas (SQL + pila de la vista) y fallas de tareas
+        'jobswipe': {'handlers': ['consola'], 'level': 'INFO'},
+    },
+}
+
+# Cola de tareas (jobswipe/tareas.py, worker: manage.py procesar_tareas)
+TAREAS_SINCRONAS = os.environ.get('TAREAS_SINCRONAS') == 'True'  # Sin worker: se ejecutan al hacer commit
+TAREAS_BACKOFF_BASE = 10           # Segundos antes del primer reintento (luego x2)
+TAREAS_BLOQUEO = 60 * 5            # Tras esto, una tarea 'en_proceso' se considera abandonada
+AVISO_MENSAJES_RETRASO = 60 * 10   # Correo si un mensaje sigue sin leer después de esto
+
+# Correo (notificaciones). En desarrollo se imprimen en la consola.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'JobSwipe <no-responder@jobswipe.cl>')
+
+# Indicadores económicos (mindicador.cl)
+INDICADORES_API_URL = os.environ.get('INDICADORES_API_URL', 'https://mindicador.cl/api')
+INDICADORES_TTL = 60 * 10               # Después de esto el dato se refresca en segundo plano
+INDICADORES_STALE_TTL = 60 * 60 * 24    # Hasta cuándo se puede servir un dato viejo
+INDICADORES_TIMEOUT = (2, 3)            # (conexión, lectura) en segundos
+INDICADORES_CIRCUITO_UMBRAL = 3         # Fallos seguidos antes de abrir el circuito
+INDICADORES_CIRCUITO_ENFRIAMIENTO = 60  # Segundos con el circuito abierto
+INDICADORES_ESPERA_ASYNC = 0.3          # Vistas async: espera máxima a la API con la caché vacía
+
+# Motor de relevancia (jobswipe/relevancia.py): el índice se reconstruye en la cola de tareas
+RELEVANCIA_REINDEXAR_CADA = 30        # Una reconstrucción por ventana de escrituras (segundos)
+RELEVANCIA_ATRASO_MAXIMO = 60 * 5     # Tras esto, sin reconstrucción, la hace el request
+
+# Sueldo normalizado en CLP (jobswipe/sueldos.py)
+SUELDOS_DOLAR_RESPALDO = 950    # Si la caché de indicadores está vacía
+SUELDOS_UMBRAL_CAMBIO = 0.005   # Variación del dólar (0.5%) que dispara el recálculo
+
+# Carga masiva de ofertas desde la web (jobswipe/importacion.py); archivos más grandes con el comando
+IMPORTACION_MAX_FILAS = 5000
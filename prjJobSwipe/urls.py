@@ -1,24 +1,29 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 
 # Importanciones para la API
-from rest_framework import routers, viewsets
-from jobswipe.models import OfertaDeEmpleo
-from jobswipe.serializers import OfertaSerializer
-
-# Config fde la vista
-class OfertaViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = OfertaDeEmpleo.objects.filter(estado='activa')
-    serializer_class = OfertaSerializer
+from rest_framework import routers
+from rest_framework.authtoken.views import obtain_auth_token
+from jobswipe.api import MatchViewSet, OfertaViewSet, SolicitudViewSet
+from jobswipe.imagenes import servir_media
+from jobswipe.metricas import metricas_view
 
 # Configdel router
 router = routers.DefaultRouter()
 router.register(r'ofertas', OfertaViewSet)
+router.register(r'solicitudes', SolicitudViewSet, basename='solicitud')
+router.register(r'matches', MatchViewSet, basename='match')
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metricas/', metricas_view, name='metricas'),  # Prometheus
+    path('api/token/', obtain_auth_token, name='api_token'),  # Token para la app móvil
     path('api/', include(router.urls)),
     path('', include('django.contrib.auth.urls')),
     path('', include('jobswipe.urls')),
-]
\ No newline at end of file
+]
+
+if settings.SERVIR_MEDIA:
+    urlpatterns.insert(0, re_path(r'^media/(?P<path>.*)$', servir_media))